@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+import pandas as pd
+
+from ..services import ingest, segments
+from ..services.executor import recommend_executor
+from ..services.registry import RegistryBusyError, model_registry
+from ..setting import startup
+from ..setting.config import INGEST_DIR, INGEST_MAX_ROWS
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+class ActivityRow(BaseModel):
+    industry: str = Field(..., title="산업군(업종)", example="발전/에너지")
+    facility: str = Field(..., title="대상설비", example="동력설비")
+    improvementType: Optional[str] = Field(None, title="개선구분", example="운전방법개선")
+    activity: str = Field(..., title="개선활동명", example="공기압축기 토출압력 조정")
+    investmentCost: float = Field(..., title="투자비(백 만원)", example=12.0)
+    costSaving: float = Field(..., title="절감액(백 만원)", example=8.5)
+    roiPeriod: float = Field(..., title="투자비회수기간(년)", example=1.4)
+    emissionReduction: float = Field(..., title="온실가스감축량(tCO2eq)", example=35.2)
+
+
+class IngestRequest(BaseModel):
+    activities: List[ActivityRow] = Field(..., title="새 개선활동 목록")
+
+
+# 요청 필드 → 카탈로그 컬럼
+ROW_COLUMNS = {
+    "activity": "개선활동명_요약",
+    "industry": "업종",
+    "facility": "대상설비",
+    "improvementType": "개선구분",
+    "investmentCost": "투자비",
+    "costSaving": "절감액",
+    "roiPeriod": "투자비회수기간",
+    "emissionReduction": "온실가스감축량",
+}
+
+
+def _busy():
+    return HTTPException(
+        status_code=409,
+        detail="모델 교체 또는 카탈로그 수집이 진행 중입니다. 잠시 후 다시 시도해주세요.",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def compact_catalog(min_segments: int = 1) -> dict:
+    """세그먼트를 기본 아티팩트에 합쳐 새 번들로 교체하고, 프로세스 워커도 새 버전으로 바꿉니다."""
+    result = await asyncio.to_thread(ingest.compact, min_segments)
+    if result["segments"]:
+        await recommend_executor.recycle()
+    return result
+
+
+@router.post(
+    "/catalog/ingest",
+    summary="개선활동 증분 수집",
+    description="새 개선활동을 현재 인코더로 인코딩하고 가장 가까운 기존 클러스터(없으면 노이즈 -1)를 배정해 "
+    "카탈로그와 유사도 인덱스에 추가합니다. 응답이 반환되면 이후 `/recommend` 요청부터 검색됩니다.",
+    tags=["Catalog"],
+)
+async def ingest_activities(request: IngestRequest):
+    if not startup.ready:
+        raise HTTPException(
+            status_code=503,
+            detail="모델을 불러오는 중입니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": "1"},
+        )
+    if not request.activities:
+        raise HTTPException(status_code=400, detail="activities 배열이 비어 있습니다.")
+    if len(request.activities) > INGEST_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"한 번에 최대 {INGEST_MAX_ROWS}개의 개선활동만 수집할 수 있습니다.",
+        )
+
+    frame = pd.DataFrame([row.dict() for row in request.activities]).rename(
+        columns=ROW_COLUMNS
+    )
+    try:
+        result = await asyncio.to_thread(ingest.ingest, frame)
+    except RegistryBusyError:
+        raise _busy()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await recommend_executor.recycle()
+    return result
+
+
+@router.post(
+    "/catalog/compact",
+    summary="수집 세그먼트 compaction",
+    description="수집 세그먼트를 기본 아티팩트(latent_vectors.npy, 카탈로그 parquet)에 합치고 새 모델 버전으로 교체합니다.",
+    tags=["Catalog"],
+)
+async def compact_segments():
+    try:
+        return await compact_catalog()
+    except RegistryBusyError:
+        raise _busy()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get(
+    "/catalog/segments",
+    summary="수집 세그먼트 목록",
+    description="아직 기본 아티팩트에 합쳐지지 않은 수집 세그먼트와 현재 카탈로그 크기를 반환합니다.",
+    tags=["Catalog"],
+)
+async def list_segments():
+    model = model_registry.current()
+    return {
+        "segments": segments.segment_names(INGEST_DIR),
+        "catalog_size": None if model is None else len(model.catalog),
+        "model_version": model_registry.version,
+    }
@@ -1,11 +1,21 @@
 # app/endpoints/comment.py
 
-from typing import List
-from fastapi import APIRouter, HTTPException, Body
+from typing import Dict, List, Literal, Optional
+from fastapi import APIRouter, HTTPException, Body, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import asyncio
+import json
+import time
 
-from app.services.gpt_client import generate_comparison_comment_async
+from app.services import timing
+from app.services.comment_cache import comment_cache
+from app.services.llm_client import llm_client
+from app.services.gpt_client import (
+    generate_comparison_comment_async,
+    stream_comparison_comment,
+)
+from app.setting.config import COMMENT_BATCH_TIMEOUT
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -41,6 +51,27 @@ class CommentResponse(BaseModel):
     comparison: str
 
 
+class SolutionItem(LLMParam):
+    # /recommend 응답의 solution 항목을 그대로 받을 수 있도록 id/bookmark는 생략 가능
+    id: Optional[int] = None
+    type: Literal["total_optimization", "emission_reduction", "cost_saving", "roi"]
+    bookmark: Optional[bool] = None
+
+
+class CommentBatchRequest(BaseModel):
+    solution: List[SolutionItem]
+
+
+class CommentError(BaseModel):
+    type: str
+    detail: str
+
+
+class CommentBatchResponse(BaseModel):
+    comments: List[CommentResponse]
+    errors: List[CommentError]
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 2) APIRouter 생성 및 엔드포인트 구현
 # ─────────────────────────────────────────────────────────────────────────────
@@ -110,18 +141,29 @@ default_body = {
 }
 
 
+def select_top_items(params: List[LLMParam]) -> List[LLMParam]:
+    """rank 순서대로 정렬해 (rank=1부터 차례대로) 최대 4개까지 반환합니다."""
+    return sorted(params, key=lambda x: x.rank)[:4]
+
+
 @router.post(
     "/comment",
     response_model=CommentResponse,
     summary="LLM 설명 생성",
     description="최대 4개의 개선 활동 데이터를 받아 비동기로 LLM 호출을 수행한 뒤, "
-    "`top1`/`comparison`을 반환합니다.",
+    "`top1`/`comparison`을 반환합니다. 같은 관점/항목의 응답은 캐시되며, "
+    "`cache=bypass`(캐시 미사용) 또는 `cache=refresh`(새로 생성해 캐시 갱신)로 요청별로 제어할 수 있습니다. "
+    "캐시 사용 결과는 `X-Comment-Cache` 헤더로 반환됩니다.",
 )
 async def comment_endpoint(
     request: CommentRequest = Body(
         default=default_body,
         example=default_body,  # Swagger UI에 ‘예시 값(example)’으로도 노출됩니다.
-    )
+    ),
+    cache: Literal["use", "bypass", "refresh"] = Query(
+        "use", description="LLM 응답 캐시 사용 방식"
+    ),
+    response: Response = None,
 ):
     """
     클라이언트로부터 llmParams(최대 4개 객체 리스트)를 입력받아,
@@ -137,11 +179,8 @@ async def comment_endpoint(
     if not params:
         raise HTTPException(status_code=400, detail="llmParams 배열이 비어 있습니다.")
 
-    # 2) rank 순서대로 정렬 (rank=1부터 차례대로)
-    sorted_params = sorted(params, key=lambda x: x.rank)
-
-    # 3) 최대 4개까지만 사용
-    top_items = sorted_params[:4]
+    # 2) rank 순서대로 정렬한 뒤 최대 4개까지만 사용
+    top_items = select_top_items(params)
 
     # 4) focus는 첫 번째 요소의 type
     focus_type = top_items[0].type
@@ -149,8 +188,19 @@ async def comment_endpoint(
     # 5) LLM 호출 유틸에 넘겨줄 때는 dict 형태로 변환
     top_items_dicts = [item.dict() for item in top_items]
 
-    # 6) 비동기 LLM 호출
-    result_dict = await generate_comparison_comment_async(focus_type, top_items_dicts)
+    # 6) 비동기 LLM 호출 (프롬프트 구성/LLM 호출/파싱 단계별 시간은 Server-Timing 헤더로 반환)
+    started = time.perf_counter()
+    with timing.traced("comment") as trace:
+        result_dict = await generate_comparison_comment_async(
+            focus_type, top_items_dicts, cache_mode=cache
+        )
+    response.headers["X-Comment-Cache"] = result_dict.get("cache", "bypass")
+    if trace is not None:
+        data = trace.export()
+        timing.record(data)
+        response.headers["Server-Timing"] = timing.server_timing(
+            data, total=time.perf_counter() - started
+        )
 
     # 7) result_dict에 "top1"과 "comparison" 키가 없는 경우 오류 처리
     if "top1" not in result_dict or "comparison" not in result_dict:
@@ -165,3 +215,148 @@ async def comment_endpoint(
         top1=result_dict["top1"],
         comparison=result_dict["comparison"],
     )
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Server-Sent Events 메시지 하나 (data는 한 줄짜리 JSON)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post(
+    "/comment/stream",
+    summary="LLM 설명 스트리밍 생성",
+    description="`/comment`와 같은 요청을 받아 `top1`/`comparison` 텍스트를 생성되는 대로 Server-Sent Events로 전송합니다.\n\n"
+    "- `event: cache` — `{\"cache\": \"memory|disk|miss|bypass|refresh|degraded\"}`\n"
+    "- `event: delta` — `{\"field\": \"top1|comparison\", \"text\": \"...\"}` (0회 이상)\n"
+    "- `event: done` — `CommentResponse`와 같은 형식의 최종 결과\n"
+    "- `event: error` — `{\"detail\": \"...\"}` (이 경우 done은 전송되지 않음)",
+)
+async def comment_stream_endpoint(
+    request: CommentRequest = Body(default=default_body, example=default_body),
+    cache: Literal["use", "bypass", "refresh"] = Query(
+        "use", description="LLM 응답 캐시 사용 방식"
+    ),
+):
+    if not request.llmParams:
+        raise HTTPException(status_code=400, detail="llmParams 배열이 비어 있습니다.")
+
+    top_items = select_top_items(request.llmParams)
+    focus_type = top_items[0].type
+    top_items_dicts = [item.dict() for item in top_items]
+
+    async def events():
+        # 헤더가 먼저 전송되므로 단계별 시간은 Server-Timing 대신 /metrics에만 기록합니다.
+        with timing.traced("comment_stream") as trace:
+            async for event, data in stream_comparison_comment(
+                focus_type, top_items_dicts, cache_mode=cache
+            ):
+                if event == "cache":
+                    yield sse_event("cache", {"cache": data})
+                elif event == "done":
+                    final = CommentResponse(
+                        id=None,
+                        type=focus_type,
+                        top1=data["top1"],
+                        comparison=data["comparison"],
+                    )
+                    yield sse_event("done", final.dict())
+                else:
+                    yield sse_event(event, data)
+        if trace is not None:
+            timing.record(trace.export())
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # 프록시(nginx 등)가 이벤트를 모아서 보내지 않도록 버퍼링을 끕니다.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def comment_for_focus(focus_type: str, params: List[LLMParam], cache: str):
+    """관점 하나의 코멘트를 생성합니다. 실패하거나 시간이 초과되면 예외를 발생시킵니다."""
+    top_items_dicts = [item.dict() for item in select_top_items(params)]
+    # 관점별 호출은 각자의 태스크에서 실행되므로 단계별 시간도 관점별로 기록합니다.
+    with timing.traced("comment") as trace:
+        result_dict = await asyncio.wait_for(
+            generate_comparison_comment_async(
+                focus_type, top_items_dicts, cache_mode=cache
+            ),
+            timeout=COMMENT_BATCH_TIMEOUT,
+        )
+    if trace is not None:
+        timing.record(trace.export())
+    if result_dict.get("cache") == "error":
+        raise RuntimeError(result_dict["top1"])
+    return CommentResponse(
+        id=None,
+        type=focus_type,
+        top1=result_dict["top1"],
+        comparison=result_dict["comparison"],
+    )
+
+
+@router.post(
+    "/comment/batch",
+    response_model=CommentBatchResponse,
+    summary="관점별 LLM 설명 일괄 생성",
+    description="`/recommend` 응답의 `solution` 배열을 받아 `type`(관점)별로 묶고, "
+    "관점별 LLM 호출을 동시에(`COMMENT_MAX_CONCURRENCY`, `COMMENT_RATE_LIMIT` 제한 내에서) 수행합니다. "
+    "실패하거나 시간이 초과된 관점은 `errors`로 반환하고 나머지 결과는 `comments`로 반환합니다.",
+)
+async def comment_batch_endpoint(
+    request: CommentBatchRequest,
+    cache: Literal["use", "bypass", "refresh"] = Query(
+        "use", description="LLM 응답 캐시 사용 방식"
+    ),
+):
+    if not request.solution:
+        raise HTTPException(status_code=400, detail="solution 배열이 비어 있습니다.")
+
+    # 1) type별로 묶기 (solution에 처음 나온 순서 유지)
+    groups: Dict[str, List[SolutionItem]] = {}
+    for item in request.solution:
+        groups.setdefault(item.type, []).append(item)
+
+    # 2) 관점별 LLM 호출을 동시에 실행 (동시 실행 수/호출 속도는 llm_client가 제한)
+    results = await asyncio.gather(
+        *(comment_for_focus(t, items, cache) for t, items in groups.items()),
+        return_exceptions=True,
+    )
+
+    comments, errors = [], []
+    for focus_type, result in zip(groups, results):
+        if isinstance(result, asyncio.TimeoutError):
+            errors.append(
+                CommentError(type=focus_type, detail="LLM 호출 시간이 초과되었습니다.")
+            )
+        elif isinstance(result, Exception):
+            errors.append(CommentError(type=focus_type, detail=str(result)))
+        else:
+            comments.append(result)
+
+    # 3) 모든 관점이 실패한 경우에만 오류로 응답
+    if not comments:
+        raise HTTPException(
+            status_code=502, detail="모든 관점의 LLM 코멘트 생성에 실패했습니다."
+        )
+    return CommentBatchResponse(comments=comments, errors=errors)
+
+
+@router.get(
+    "/comment/cache/stats",
+    summary="LLM 코멘트 캐시 통계",
+    description="/comment 응답 캐시의 메모리/디스크 hit, miss, bypass/refresh 카운터를 반환합니다.",
+)
+async def comment_cache_stats():
+    return comment_cache.stats()
+
+
+@router.get(
+    "/comment/llm/stats",
+    summary="LLM 클라이언트 상태",
+    description="회로 차단기 상태, 호출 결과별 횟수, 재시도 횟수, 동시 실행 제한 상태, "
+    "focus별 LLM 지연 시간 히스토그램(p50/p95/p99 추정값 포함)을 반환합니다.",
+)
+async def comment_llm_stats():
+    return llm_client.stats()
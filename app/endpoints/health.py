@@ -0,0 +1,43 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+from ..services.metrics import REGISTRY
+from ..services.registry import model_registry
+from ..setting import startup
+
+router = APIRouter()
+
+
+@router.get(
+    "/ready",
+    summary="준비 상태 확인",
+    description="모델/카탈로그 로딩이 끝났으면 200, 로딩 중이거나 실패했으면 503을 반환합니다.",
+    tags=["Health"],
+)
+async def ready():
+    if startup.ready:
+        return {
+            "status": "ready",
+            "model_version": model_registry.version,
+            "startup_seconds": startup.startup_seconds,
+            "timings": startup.startup_timings,
+        }
+    if startup.load_error is not None:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "failed", "error": str(startup.load_error)},
+        )
+    return JSONResponse(status_code=503, content={"status": "loading"})
+
+
+@router.get(
+    "/metrics",
+    summary="Prometheus 지표",
+    description="파이프라인 단계별 지연 시간 히스토그램, 단계별 후보 수, 추천 큐 깊이, "
+    "활성 모델 버전/교체 횟수, LLM 호출 지표를 Prometheus text 형식으로 반환합니다.",
+    tags=["Health"],
+    response_class=PlainTextResponse,
+)
+async def metrics():
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
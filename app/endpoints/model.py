@@ -0,0 +1,65 @@
+import asyncio
+import logging
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from ..services.executor import recommend_executor
+from ..services.registry import model_registry
+from ..setting.startup import reload_resources
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# 진행 중인 POST /model/reload 작업 (이벤트 루프는 task를 약한 참조로만 들고 있으므로 끝날 때까지 보관)
+_reload_tasks = set()
+
+
+async def reload_model(force: bool = False) -> bool:
+    """아티팩트로 새 모델 버전을 만들어 교체하고, 프로세스 워커도 새 버전으로 바꿉니다."""
+    swapped = await asyncio.to_thread(reload_resources, force)
+    if swapped:
+        await recommend_executor.recycle()
+    return swapped
+
+
+def _reload_done(task: asyncio.Task):
+    """백그라운드 reload 작업이 끝나면 목록에서 빼고, 실패했으면 로그를 남깁니다."""
+    _reload_tasks.discard(task)
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        logger.error(
+            "Model reload failed", exc_info=(type(error), error, error.__traceback__)
+        )
+
+
+@router.get(
+    "/model/version",
+    summary="활성 모델 버전",
+    description="현재 추천에 사용 중인 모델 버전과 교체 이력을 반환합니다.",
+    tags=["Model"],
+)
+async def model_version():
+    return model_registry.stats()
+
+
+@router.post(
+    "/model/reload",
+    summary="모델 다시 불러오기",
+    description="VEC_DIR/CLUSTERING_DIR(또는 ARTIFACT_BUNDLE)에서 새 모델 버전을 백그라운드로 만들어 교체합니다. "
+    "아티팩트가 바뀌지 않았으면 force=true일 때만 다시 만듭니다. 진행 중인 요청은 이전 버전으로 끝납니다.",
+    tags=["Model"],
+)
+async def model_reload(force: bool = False):
+    if model_registry.reloading:
+        return JSONResponse(
+            status_code=409,
+            content={"status": "reloading", "version": model_registry.version},
+        )
+    task = asyncio.create_task(reload_model(force))
+    _reload_tasks.add(task)
+    task.add_done_callback(_reload_done)
+    return JSONResponse(
+        status_code=202,
+        content={"status": "accepted", "version": model_registry.version},
+    )
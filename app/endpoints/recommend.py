@@ -1,7 +1,20 @@
-from fastapi import APIRouter, Body
+import asyncio
+import time
+from fastapi import APIRouter, Body, HTTPException
 from pydantic import BaseModel, Field
-from typing import List, Dict
-from ..services.inference import recommend_all
+from typing import Dict, List, Literal, Optional
+from ..services.cache import recommendation_cache
+from ..services.executor import (
+    QueueFullError,
+    recommend_batch as recommend_batch_job,
+    recommend_executor,
+    recommend_single,
+)
+from ..services.registry import model_registry
+from ..services.serialization import RecommendJSONResponse
+from ..services import timing
+from ..setting import startup
+from ..setting.config import RECOMMEND_BATCH_MAX_SIZE, RECOMMEND_BATCH_TIMEOUT
 
 router = APIRouter()
 
@@ -43,6 +56,21 @@ class RecommendRequest(BaseModel):
         description="투자 회수 목표 기간(단위: 년)",
         example=2.0,
     )
+    focuses: Optional[
+        List[Literal["total_optimization", "emission_reduction", "cost_saving", "roi"]]
+    ] = Field(
+        None,
+        title="추천 관점 목록",
+        description="계산할 관점(type) 목록. 생략하면 4개 관점을 모두 반환합니다.",
+        example=["total_optimization", "roi"],
+    )
+    constraints: Optional[Literal["off", "hard", "tolerance"]] = Field(
+        None,
+        title="예산/ROI 제약",
+        description="hard: 투자비 ≤ 투자가능금액, 투자비회수기간 ≤ 목표 ROI 기간인 활동만 검색합니다. "
+        "tolerance: 허용 비율만큼 넘는 활동까지 포함합니다. 생략하면 서버 설정(RECOMMEND_CONSTRAINTS)을 따릅니다.",
+        example="hard",
+    )
 
     class Config:
         schema_extra = {
@@ -57,11 +85,126 @@ class RecommendRequest(BaseModel):
         }
 
 
+class RecommendBatchRequest(BaseModel):
+    requests: List[RecommendRequest] = Field(
+        ...,
+        title="추천 요청 목록",
+        description="한 번의 행렬 연산으로 처리할 /recommend 요청 리스트",
+    )
+
+
+class RecommendItem(BaseModel):
+    # 필드 순서가 응답 JSON의 키 순서입니다 (inference.build_solution과 같은 순서).
+    id: Optional[int] = Field(None, description="저장 전에는 null")
+    type: Literal[
+        "total_optimization", "emission_reduction", "cost_saving", "roi"
+    ] = Field(..., title="추천 관점")
+    rank: int = Field(..., title="관점 내 순위", description="1부터 시작")
+    industry: Optional[str] = Field(None, title="산업군")
+    improvementType: Optional[str] = Field(None, title="개선구분")
+    facility: Optional[str] = Field(None, title="대상설비")
+    activity: Optional[str] = Field(None, title="개선활동명")
+    emissionReduction: Optional[float] = Field(None, title="온실가스감축량(tCO2eq)")
+    costSaving: Optional[float] = Field(None, title="절감액(백 만원)")
+    roiPeriod: Optional[float] = Field(None, title="투자비회수기간(년)")
+    investmentCost: Optional[float] = Field(None, title="투자비(백 만원)")
+    bookmark: Optional[bool] = Field(None, description="저장 전에는 null")
+
+
+class ConstraintReport(BaseModel):
+    mode: Literal["hard", "tolerance"] = Field(..., title="적용한 제약 방식")
+    limits: Dict[str, float] = Field(
+        ..., title="제약별 상한", description="investment(백 만원), roi(년)"
+    )
+    scanned: int = Field(..., title="제약 적용 전 검색 대상 행 수")
+    removed: Dict[str, int] = Field(
+        ...,
+        title="제약별 제외 행 수",
+        description="두 제약을 모두 넘는 행은 양쪽에 모두 셉니다.",
+    )
+    remaining: int = Field(..., title="유사도를 계산한 행 수")
+
+
+class RecommendResponse(BaseModel):
+    solution: List[RecommendItem]
+    constraints: Optional[ConstraintReport] = Field(
+        None, description="예산/ROI 제약을 적용한 경우에만 포함됩니다."
+    )
+
+
+class RecommendBatchResponse(BaseModel):
+    results: List[RecommendResponse]
+
+
+async def run_recommendation(fn, *args, timeout: float = None):
+    """추천 연산을 실행기에서 실행하고, 포화/시간 초과를 HTTP 오류로 변환합니다."""
+    if not startup.ready:
+        raise HTTPException(
+            status_code=503,
+            detail="모델을 불러오는 중입니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        return await recommend_executor.run(fn, *args, timeout=timeout)
+    except QueueFullError:
+        raise HTTPException(
+            status_code=429,
+            detail="추천 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": "1"},
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="추천 연산 시간이 초과되었습니다.")
+
+
+async def cached_recommendation(input_data: dict, per_k: int):
+    """
+    결과 캐시를 실행기 앞(이 프로세스)에서 확인하고, 없을 때만 실행기에서 계산합니다.
+    캐시 hit이면 실행기 슬롯을 쓰지 않으며, 단계 시간은 비어 있습니다.
+    반환값: (결과, 모델 버전, 단계별 시간)
+    """
+    traces = []
+
+    async def compute():
+        result, version, trace = await run_recommendation(
+            recommend_single, input_data, per_k
+        )
+        traces.append(trace)
+        return result, version
+
+    result, version = await recommendation_cache.get_or_compute(
+        input_data, per_k, compute, version=model_registry.version
+    )
+    if traces:
+        return result, version, traces[0]
+    with timing.traced("recommend") as trace:
+        return result, version, trace and trace.export()
+
+
+def render_recommendation(content: dict, version, trace, started: float):
+    """
+    추천 결과를 바로 JSON 응답으로 인코딩합니다.
+    결과는 build_solution이 RecommendItem 형식으로 만들므로 response_model 검증은 생략하고,
+    인코딩 시간은 render 단계로 추적 결과에 더합니다.
+    """
+    render_started = time.perf_counter()
+    response = RecommendJSONResponse(content)
+    response.headers["X-Model-Version"] = str(version)
+    if trace is not None:
+        trace["durations"]["render"] = time.perf_counter() - render_started
+        timing.record(trace)
+        response.headers["Server-Timing"] = timing.server_timing(
+            trace, total=time.perf_counter() - started
+        )
+    return response
+
+
 @router.post(
     "/recommend",
-    response_model=Dict[str, List[Dict]],
+    response_model=RecommendResponse,
+    response_class=RecommendJSONResponse,
     summary="ESG 개선활동 추천",
-    description="균형, ROI, 절감액, 온실가스 관점별로 Top-N 결과를 반환합니다.",
+    description="균형, ROI, 절감액, 온실가스 관점별로 Top-N 결과를 반환합니다. "
+    "`focuses`로 필요한 관점만 요청할 수 있습니다.",
     tags=["ESG 추천"],
 )
 async def recommend(
@@ -75,6 +218,51 @@ async def recommend(
             "targetEmission": 80.0,
             "targetRoiPeriod": 2.0,
         },
-    )
+    ),
 ):
-    return recommend_all(request.dict(), per_k=4)
+    # CPU 연산은 이벤트 루프 밖(스레드/프로세스 풀)에서 실행해 /comment 등 다른 요청을 막지 않습니다.
+    started = time.perf_counter()
+    result, version, trace = await cached_recommendation(request.dict(), 4)
+    return render_recommendation(result, version, trace, started)
+
+
+@router.post(
+    "/recommend/batch",
+    response_model=RecommendBatchResponse,
+    response_class=RecommendJSONResponse,
+    summary="ESG 개선활동 일괄 추천",
+    description="여러 추천 요청을 한 번의 인코더/유사도 행렬 연산으로 처리하고, "
+    "요청 순서대로 `/recommend`와 같은 형식의 `solution`을 반환합니다.",
+    tags=["ESG 추천"],
+)
+async def recommend_batch(request: RecommendBatchRequest):
+    if not request.requests:
+        raise HTTPException(status_code=400, detail="requests 배열이 비어 있습니다.")
+    if len(request.requests) > RECOMMEND_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"한 번에 최대 {RECOMMEND_BATCH_MAX_SIZE}개의 요청만 처리할 수 있습니다.",
+        )
+
+    inputs = [r.dict() for r in request.requests]
+    started = time.perf_counter()
+    results, version, trace = await run_recommendation(
+        recommend_batch_job, inputs, 4, timeout=RECOMMEND_BATCH_TIMEOUT
+    )
+    return render_recommendation({"results": results}, version, trace, started)
+
+
+@router.get(
+    "/recommend/cache/stats",
+    summary="추천 캐시 통계",
+    description="추천 결과 캐시의 hit/miss/eviction 카운터와 활성 모델 버전을 반환합니다. "
+    "캐시는 실행기 앞에 있으므로 프로세스 백엔드에서도 모든 추천 워커의 요청이 집계됩니다.",
+    tags=["ESG 추천"],
+)
+async def recommend_cache_stats():
+    stats = recommendation_cache.stats()
+    stats["executor"] = recommend_executor.backend
+    stats["queue_depth"] = recommend_executor.pending
+    stats["queue_capacity"] = recommend_executor.capacity
+    stats["model_version"] = model_registry.version
+    return stats
@@ -1,11 +1,25 @@
 # app/main.py
+import asyncio
+import time
 from fastapi import FastAPI
 from app.setting.startup import load_resources
-from app.endpoints import recommend, comment
+from app.endpoints import recommend, comment, health, model, catalog
+from app.services.executor import recommend_executor
+from app.services.registry import RegistryBusyError
+from app.setting.config import (
+    ARTIFACT_BUNDLE,
+    INGEST_COMPACT_INTERVAL,
+    INGEST_COMPACT_SEGMENTS,
+    MODEL_RELOAD_INTERVAL,
+    SHARED_MODEL,
+)
+from app.setting.log import RequestIdMiddleware, setup_logging
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 import os
 
+setup_logging()
+
 origins = ["*"]
 
 app = FastAPI(title="ESG 개선활동 추천 서비스", version="1.0")
@@ -19,13 +33,76 @@ app.add_middleware(
 
 app = FastAPI(title="ESG 개선활동 추천 서비스", version="1.0")
 
+app.add_middleware(RequestIdMiddleware)
+
 app.include_router(recommend.router, tags=["Recommendation"])
 app.include_router(comment.router, tags=["Comment Generation"])
+app.include_router(health.router)
+app.include_router(model.router)
+app.include_router(catalog.router)
+
+logger = logging.getLogger(__name__)
+_process_started = time.perf_counter()
+
+
+async def warm_up():
+    """모델/카탈로그를 한 번 로드하고 추천 실행기를 준비합니다 (완료 전까지 /ready는 503)."""
+    try:
+        await asyncio.to_thread(load_resources)
+        await recommend_executor.start()
+    except Exception:
+        logger.exception("Startup failed while loading recommendation resources")
+        return
+    logger.info(
+        "Server ready %.2fs after app import", time.perf_counter() - _process_started
+    )
+    tasks = []
+    if MODEL_RELOAD_INTERVAL > 0:
+        tasks.append(watch_artifacts())
+    if (
+        INGEST_COMPACT_INTERVAL > 0
+        and INGEST_COMPACT_SEGMENTS > 0
+        and not ARTIFACT_BUNDLE
+        and not SHARED_MODEL
+    ):
+        tasks.append(compact_segments())
+    await asyncio.gather(*tasks)
+
+
+async def watch_artifacts():
+    """아티팩트가 바뀌면 새 모델 버전을 만들어 교체합니다 (MODEL_RELOAD_INTERVAL 주기)."""
+    while True:
+        await asyncio.sleep(MODEL_RELOAD_INTERVAL)
+        try:
+            await model.reload_model()
+        except Exception:
+            logger.exception("Scheduled model reload failed")
+
+
+async def compact_segments():
+    """수집 세그먼트가 INGEST_COMPACT_SEGMENTS개 이상이면 기본 아티팩트에 합칩니다 (INGEST_COMPACT_INTERVAL 주기)."""
+    while True:
+        await asyncio.sleep(INGEST_COMPACT_INTERVAL)
+        try:
+            await catalog.compact_catalog(INGEST_COMPACT_SEGMENTS)
+        except RegistryBusyError:
+            logger.info("Segment compaction skipped: another update is in progress")
+        except Exception:
+            logger.exception("Scheduled segment compaction failed")
 
 
 @app.on_event("startup")
 async def startup_event():
-    load_resources()
+    # 로딩은 백그라운드에서 진행해 /ready 프로브가 바로 응답할 수 있도록 합니다.
+    app.state.warm_up = asyncio.create_task(warm_up())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    task = getattr(app.state, "warm_up", None)
+    if task is not None:
+        task.cancel()
+    recommend_executor.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,208 @@
+# app/services/bundle.py
+
+import json
+import os
+import struct
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+
+MAGIC = b"ZFBUNDL1"
+ALIGN = 64
+
+# 이 프로세스가 붙은 공유 메모리 (세그먼트 이름 → 가장 최근에 붙은 SharedMemory)
+_attached = {}
+# 닫기를 기다리는 매핑 (배열이 아직 버퍼를 참조해 close()가 실패한 매핑은 다음 attach/release 때 다시 닫습니다)
+_retired = []
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _layout(arrays: dict, meta: dict):
+    """
+    번들 형식의 배치를 계산합니다.
+    반환값: (C-order 배열, 배열별 헤더 항목, JSON 헤더, 데이터 영역 시작 위치, 전체 크기)
+    """
+    entries, offset = {}, 0
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+    for name, a in arrays.items():
+        if a.dtype.hasobject:
+            raise ValueError(f"object 배열은 번들에 저장할 수 없습니다: {name}")
+        offset = _align(offset)
+        entries[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+        offset += a.nbytes
+    header = json.dumps({"meta": meta, "arrays": entries}, ensure_ascii=False).encode()
+    data_start = _align(len(MAGIC) + 8 + len(header))
+    return arrays, entries, header, data_start, data_start + offset
+
+
+def _read_header(buf):
+    """번들 앞부분(MAGIC | 헤더 길이 | JSON 헤더)을 읽습니다. 반환값: (헤더, 데이터 영역 시작 위치)"""
+    if bytes(buf[: len(MAGIC)]) != MAGIC:
+        raise ValueError("아티팩트 번들 형식이 아닙니다.")
+    (header_len,) = struct.unpack("<Q", bytes(buf[len(MAGIC) : len(MAGIC) + 8]))
+    start = len(MAGIC) + 8
+    header = json.loads(bytes(buf[start : start + header_len]))
+    return header, _align(start + header_len)
+
+
+def write_bundle(path: str, arrays: dict, meta: dict):
+    """
+    여러 NumPy 배열과 JSON 메타데이터를 mmap 가능한 단일 파일로 저장합니다.
+    형식: MAGIC(8) | 헤더 길이(uint64 LE) | JSON 헤더 | 64바이트 정렬된 배열 데이터
+    헤더의 offset은 데이터 영역 시작 기준이며, 모든 배열은 C-order로 저장됩니다.
+    """
+    arrays, entries, header, data_start, total = _layout(arrays, meta)
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fp:
+        fp.write(MAGIC)
+        fp.write(struct.pack("<Q", len(header)))
+        fp.write(header)
+        for name, a in arrays.items():
+            fp.seek(data_start + entries[name]["offset"])
+            fp.write(a.tobytes())
+        fp.truncate(total)
+    os.replace(tmp, path)
+
+
+def read_bundle(path: str):
+    """
+    write_bundle로 만든 파일을 엽니다. 배열은 복사 없이 읽기 전용 np.memmap으로 반환합니다.
+    반환값: (arrays, meta)
+    """
+    with open(path, "rb") as fp:
+        if fp.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"아티팩트 번들 형식이 아닙니다: {path}")
+        (header_len,) = struct.unpack("<Q", fp.read(8))
+        header = json.loads(fp.read(header_len))
+    data_start = _align(len(MAGIC) + 8 + header_len)
+
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        shape = tuple(entry["shape"])
+        if int(np.prod(shape)) == 0:
+            arrays[name] = np.empty(shape, dtype=entry["dtype"])
+            continue
+        arrays[name] = np.memmap(
+            path,
+            dtype=entry["dtype"],
+            mode="r",
+            offset=data_start + entry["offset"],
+            shape=shape,
+        )
+    return arrays, header["meta"]
+
+
+def _open_shared(name: str):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # 3.12 이하에서는 붙기만 해도 resource_tracker에 등록됩니다. 워커는 게시한 프로세스에서 fork되어
+    # 같은 tracker를 쓰므로, tracker는 게시한 프로세스와 워커가 모두 끝난 뒤에만 세그먼트를 정리합니다.
+    return shared_memory.SharedMemory(name=name)
+
+
+def publish_shared(name: str, arrays: dict, meta: dict):
+    """
+    write_bundle과 같은 형식으로 배열과 메타데이터를 POSIX 공유 메모리 세그먼트 name에 올립니다.
+    같은 이름의 세그먼트가 남아 있으면 지우고 새로 만듭니다 (이미 붙어 있는 프로세스의 매핑은 유지됩니다).
+    반환값: SharedMemory — 게시한 프로세스가 가지고 있다가 unlink_shared()로 정리합니다.
+    """
+    arrays, entries, header, data_start, total = _layout(arrays, meta)
+    try:
+        shm = shared_memory.SharedMemory(name=name, create=True, size=total)
+    except FileExistsError:
+        unlink_shared(_open_shared(name))
+        shm = shared_memory.SharedMemory(name=name, create=True, size=total)
+    shm.buf[: len(MAGIC)] = MAGIC
+    shm.buf[len(MAGIC) : len(MAGIC) + 8] = struct.pack("<Q", len(header))
+    shm.buf[len(MAGIC) + 8 : len(MAGIC) + 8 + len(header)] = header
+    for key, a in arrays.items():
+        if a.size:
+            view = np.ndarray(
+                a.shape,
+                dtype=a.dtype,
+                buffer=shm.buf,
+                offset=data_start + entries[key]["offset"],
+            )
+            view[...] = a
+            del view
+    return shm
+
+
+def unlink_shared(shm):
+    """게시한 세그먼트의 이름을 지우고 이 프로세스의 매핑을 닫습니다 (붙어 있는 워커는 계속 사용합니다)."""
+    shm.unlink()
+    shm.close()
+
+
+def read_shared_meta(name: str) -> dict:
+    """공유 메모리 세그먼트 name의 메타데이터 (배열에는 붙지 않습니다)"""
+    shm = _open_shared(name)
+    try:
+        header, _ = _read_header(shm.buf)
+    finally:
+        shm.close()
+    return header["meta"]
+
+
+def attach_shared(name: str):
+    """
+    publish_shared로 올린 세그먼트에 붙습니다. 배열은 공유 메모리를 그대로 가리키는
+    읽기 전용 ndarray이며, 매핑은 release_shared(attached_segment(name))로 닫을 때까지 유지됩니다.
+    같은 이름으로 다시 게시된 세그먼트에 붙으면 이전 매핑은 닫기 대기 목록으로 옮깁니다.
+    반환값: (arrays, meta)
+    """
+    shm = _open_shared(name)
+    previous = _attached.get(name)
+    _attached[name] = shm
+    if previous is not None:
+        _retired.append(previous)
+    _close_retired()
+    header, data_start = _read_header(shm.buf)
+
+    arrays = {}
+    for key, entry in header["arrays"].items():
+        shape = tuple(entry["shape"])
+        if int(np.prod(shape)) == 0:
+            arrays[key] = np.empty(shape, dtype=entry["dtype"])
+            continue
+        a = np.ndarray(
+            shape,
+            dtype=entry["dtype"],
+            buffer=shm.buf,
+            offset=data_start + entry["offset"],
+        )
+        a.flags.writeable = False
+        arrays[key] = a
+    return arrays, header["meta"]
+
+
+def attached_segment(name: str):
+    """이 프로세스가 name에 가장 최근에 붙은 SharedMemory (붙지 않았으면 None)"""
+    return _attached.get(name)
+
+
+def release_shared(shm):
+    """
+    attach_shared로 붙은 매핑 shm을 닫습니다 (세그먼트 자체는 지우지 않습니다).
+    그 배열을 쓰는 객체가 아직 남아 있으면 닫기 대기 목록에 두고 다음 attach/release 때 다시 닫습니다.
+    """
+    for name, handle in list(_attached.items()):
+        if handle is shm:
+            del _attached[name]
+    if all(handle is not shm for handle in _retired):
+        _retired.append(shm)
+    _close_retired()
+
+
+def _close_retired():
+    for shm in list(_retired):
+        try:
+            shm.close()
+        except BufferError:
+            continue
+        _retired.remove(shm)
@@ -0,0 +1,176 @@
+# app/services/cache.py
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from ..setting.config import (
+    RECOMMEND_CACHE_SIZE,
+    RECOMMEND_CACHE_TTL,
+    RECOMMEND_CACHE_QUANTUM,
+)
+from .registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_FIELDS = (
+    "availableInvestment",
+    "currentEmission",
+    "targetEmission",
+    "targetRoiPeriod",
+)
+
+
+class RecommendationCache:
+    """
+    /recommend 결과를 위한 프로세스 내 LRU + TTL 캐시.
+    - 키: 업종, 정렬된 대상설비 목록, quantum 단위로 양자화한 수치 필드, 요청한 관점(focuses), per_k,
+      결과를 계산한 모델 버전
+    - 같은 키의 요청이 동시에 들어오면 한 번만 계산하고 나머지는 결과를 기다립니다.
+    - 실행기 앞(API 프로세스의 이벤트 루프)에서 확인하므로, 프로세스 백엔드에서도 모든 워커가 같은 캐시와 통계를 씁니다.
+    - fingerprint(활성 모델 버전)가 바뀌면 캐시 전체를 무효화합니다.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 600.0,
+        quantum: float = 0.01,
+        fingerprint=None,
+        check_interval: float = 5.0,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.quantum = quantum
+        self._fingerprint_fn = fingerprint
+        self._fingerprint = fingerprint() if fingerprint else None
+        self._check_interval = check_interval
+        self._checked_at = time.monotonic()
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def _quantize(self, value) -> int:
+        return round(float(value or 0.0) / self.quantum) if self.quantum > 0 else value
+
+    def make_key(self, input_data: dict, per_k: int, version=None) -> tuple:
+        return (
+            input_data.get("industry", ""),
+            tuple(sorted(input_data.get("targetFacilities", []))),
+            tuple(self._quantize(input_data.get(f)) for f in NUMERIC_FIELDS),
+            tuple(sorted(input_data.get("focuses") or ())),
+            input_data.get("constraints"),
+            per_k,
+            version,
+        )
+
+    def _check_artifacts(self, now: float):
+        """check_interval마다 fingerprint를 확인하고, 바뀌었으면 캐시를 비웁니다."""
+        if (
+            self._fingerprint_fn is None
+            or now - self._checked_at < self._check_interval
+        ):
+            return
+        self._checked_at = now
+        current = self._fingerprint_fn()
+        if current != self._fingerprint:
+            logger.info("Model version changed, invalidating recommendation cache")
+            self._fingerprint = current
+            self._entries.clear()
+            self.invalidations += 1
+
+    async def get_or_compute(self, input_data: dict, per_k: int, compute, version=None):
+        """
+        캐시에 있으면 반환하고, 없으면 compute()를 한 번만 실행해 저장합니다.
+        compute는 코루틴 함수이며, 예외가 발생하면 저장하지 않고 기다리던 요청에도 같은 예외를 전달합니다.
+        계산하던 요청이 취소되면 기다리던 요청은 취소되지 않고 다시 조회해 그중 하나가 계산합니다.
+        """
+        if not self.enabled:
+            return await compute()
+
+        key = self.make_key(input_data, per_k, version)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._check_artifacts(now)
+                entry = self._entries.get(key)
+                if entry is not None:
+                    expires_at, value = entry
+                    if expires_at > now:
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        return value
+                    del self._entries[key]
+                flight = self._inflight.get(key)
+                if flight is None:
+                    flight = asyncio.get_running_loop().create_future()
+                    self._inflight[key] = flight
+                    self.misses += 1
+                    break
+                self.coalesced += 1
+            # 먼저 계산하던 요청이 취소되면 그 취소를 이어받지 않고 처음부터 다시 조회합니다.
+            await asyncio.wait((flight,))
+            if not flight.cancelled():
+                return flight.result()
+
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            # 이 요청만 취소된 것이므로 기다리던 요청에는 예외 대신 취소된 future를 넘겨 다시 조회하게 합니다.
+            flight.cancel()
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            # 기다리는 요청이 없으면 "exception was never retrieved" 경고가 나지 않도록 소비합니다.
+            flight.exception()
+            raise
+        else:
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            flight.set_result(value)
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+recommendation_cache = RecommendationCache(
+    maxsize=RECOMMEND_CACHE_SIZE,
+    ttl=RECOMMEND_CACHE_TTL,
+    quantum=RECOMMEND_CACHE_QUANTUM,
+    fingerprint=lambda: model_registry.version,
+    check_interval=0.0,
+)
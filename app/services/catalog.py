@@ -0,0 +1,314 @@
+# app/services/catalog.py
+
+import numpy as np
+import pandas as pd
+
+NUMERIC_COLUMNS = ["투자비", "절감액", "투자비회수기간", "온실가스감축량"]
+STRING_COLUMNS = ["개선활동명_요약", "업종", "대상설비", "개선구분"]
+
+# recommend_improvements가 반환하는 후보 DataFrame의 컬럼 순서
+# (기존 groupby("cluster", as_index=False).agg(...) 결과와 동일)
+CANDIDATE_COLUMNS = (
+    ["cluster", "similarity"] + NUMERIC_COLUMNS + STRING_COLUMNS + ["facility"]
+)
+
+
+def sort_desc(values: np.ndarray) -> np.ndarray:
+    """
+    `DataFrame.sort_values(col, ascending=False)`(pandas nargsort, kind="quicksort")와
+    같은 순서를 내는 내림차순 정렬 인덱스 (NaN 없는 배열 기준).
+    """
+    n = values.shape[0]
+    rev_idx = np.arange(n)[::-1]
+    return rev_idx[values[::-1].argsort(kind="quicksort")][::-1]
+
+
+def group_mean(values: np.ndarray, group: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    그룹별 평균 (NaN 제외). pandas groupby mean과 같은 Kahan 보정 합을 같은 dtype,
+    같은 순서로 계산하므로 결과가 비트 단위로 일치합니다.
+    그룹 내 위치별로 한 번씩, 모든 그룹을 동시에 갱신합니다.
+    """
+    dtype = values.dtype
+    order = np.argsort(group, kind="stable")
+    g_sorted = group[order]
+    v_sorted = values[order]
+    starts = np.searchsorted(g_sorted, np.arange(n_groups))
+    pos = np.arange(order.size) - starts[g_sorted]
+
+    sumx = np.zeros(n_groups, dtype=dtype)
+    comp = np.zeros(n_groups, dtype=dtype)
+    nobs = np.zeros(n_groups, dtype=np.int64)
+    for p in range(int(pos.max()) + 1 if pos.size else 0):
+        sel = pos == p
+        g = g_sorted[sel]
+        val = v_sorted[sel]
+        ok = ~np.isnan(val)
+        g, val = g[ok], val[ok]
+        nobs[g] += 1
+        y = val - comp[g]
+        t = sumx[g] + y
+        c = t - sumx[g] - y
+        c[np.isnan(c)] = 0
+        comp[g] = c
+        sumx[g] = t
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = sumx / nobs.astype(dtype)
+    out[nobs == 0] = np.nan
+    return out
+
+
+def group_first(valid: np.ndarray, group: np.ndarray, n_groups: int) -> np.ndarray:
+    """그룹별로 valid가 True인 첫 위치 (없으면 -1)."""
+    first = np.full(n_groups, -1, dtype=np.intp)
+    positions = np.flatnonzero(valid)[::-1]
+    first[group[positions]] = positions
+    return first
+
+
+class ActivityCatalog:
+    """
+    개선활동 카탈로그(parquet)의 컬럼형 표현.
+    - 수치 컬럼: 연속된 float 배열
+    - 문자열 컬럼: 사전 인코딩된 정수 코드 (결측은 -1) + 카테고리 배열
+    - cluster: 원래 라벨과 밀집 코드(cluster_code, 노이즈는 -1), 클러스터별 행 인덱스(CSR)
+    """
+
+    def __init__(self, numeric: dict, codes: dict, categories: dict, cluster):
+        self.numeric = {
+            c: np.ascontiguousarray(numeric[c], dtype=np.float64)
+            for c in NUMERIC_COLUMNS
+        }
+        self.codes = {c: np.ascontiguousarray(codes[c]) for c in STRING_COLUMNS}
+        # 마지막 원소(None)는 결측 코드(-1)가 가리키는 값
+        self.categories = {
+            c: np.append(np.asarray(categories[c], dtype=object), None)
+            for c in STRING_COLUMNS
+        }
+        self.cluster = np.ascontiguousarray(cluster)
+        self.size = self.cluster.shape[0]
+
+        member = self.cluster != -1
+        self.cluster_labels = np.unique(self.cluster[member])
+        self.cluster_code = np.full(self.size, -1, dtype=np.intp)
+        self.cluster_code[member] = np.searchsorted(
+            self.cluster_labels, self.cluster[member]
+        )
+        self.cluster_rows = np.flatnonzero(member)[
+            np.argsort(self.cluster_code[member], kind="stable")
+        ]
+        self.cluster_offsets = np.searchsorted(
+            self.cluster_code[self.cluster_rows],
+            np.arange(self.cluster_labels.size + 1),
+        )
+        self._code_of = {
+            c: {v: i for i, v in enumerate(categories[c])} for c in STRING_COLUMNS
+        }
+
+    @classmethod
+    def from_dataframe(cls, frame: pd.DataFrame):
+        numeric = {c: frame[c].to_numpy(dtype=np.float64) for c in NUMERIC_COLUMNS}
+        codes, categories = {}, {}
+        for c in STRING_COLUMNS:
+            codes[c], categories[c] = pd.factorize(frame[c], use_na_sentinel=True)
+            codes[c] = codes[c].astype(np.int32)
+            categories[c] = np.asarray(categories[c], dtype=object)
+        return cls(numeric, codes, categories, frame["cluster"].to_numpy())
+
+    def append(self, frame: pd.DataFrame):
+        """
+        frame의 행(NUMERIC_COLUMNS, STRING_COLUMNS, cluster)을 뒤에 이어 붙인 SegmentedCatalog를 반환합니다.
+        이 카탈로그의 배열은 복사하지 않습니다.
+        """
+        return SegmentedCatalog(self).append(frame)
+
+    def __len__(self):
+        return self.size
+
+    def code_of(self, column: str, value) -> int:
+        """문자열 값의 코드 (카탈로그에 없으면 -2: 어떤 행과도 일치하지 않음)"""
+        return self._code_of[column].get(value, -2)
+
+    def decode(self, column: str, rows: np.ndarray) -> np.ndarray:
+        return self.categories[column][self.codes[column][rows]]
+
+    @property
+    def base(self):
+        return self
+
+    def members(self, label) -> np.ndarray:
+        """클러스터 라벨에 속한 행 인덱스"""
+        i = np.searchsorted(self.cluster_labels, label)
+        if i >= self.cluster_labels.size or self.cluster_labels[i] != label:
+            return np.empty(0, dtype=np.intp)
+        return self.cluster_rows[self.cluster_offsets[i] : self.cluster_offsets[i + 1]]
+
+    def aggregate(
+        self,
+        rows: np.ndarray,
+        sims: np.ndarray,
+        facility_codes: np.ndarray,
+        facilities: list,
+        industry: str,
+    ) -> pd.DataFrame:
+        """
+        후보 행(rows, 유사도 sims, 후보를 만든 대상설비 facility_codes)을 클러스터 단위로 집계합니다.
+        - cluster != -1: 클러스터별 similarity/수치 컬럼 평균, 문자열/facility는 첫 값
+        - cluster == -1(노이즈): 그대로 유지
+        - similarity 내림차순 정렬 후 업종 필터
+        기존 pandas groupby/concat/sort_values 로직과 같은 행/값을 반환합니다.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        facility_codes = np.asarray(facility_codes, dtype=np.intp)
+        codes = self.cluster_code[rows]
+        valid = codes != -1
+        noise = ~valid
+
+        # — 클러스터별 집계 (그룹은 클러스터 라벨 오름차순) —
+        vcodes = codes[valid]
+        uniq, group = np.unique(vcodes, return_inverse=True)
+        n_groups = uniq.size
+        vrows = rows[valid]
+        nrows = rows[noise]
+
+        columns = {
+            "cluster": np.concatenate([self.cluster_labels[uniq], self.cluster[nrows]]),
+            "similarity": np.concatenate(
+                [group_mean(sims[valid], group, n_groups), sims[noise]]
+            ),
+        }
+        for c in NUMERIC_COLUMNS:
+            col = self.numeric[c]
+            columns[c] = np.concatenate(
+                [group_mean(col[vrows], group, n_groups), col[nrows]]
+            )
+        string_codes = {}
+        for c in STRING_COLUMNS:
+            vc = self.codes[c][vrows]
+            first = group_first(vc != -1, group, n_groups)
+            agg_codes = np.where(first >= 0, vc[first], -1)
+            string_codes[c] = np.concatenate([agg_codes, self.codes[c][nrows]])
+        vfac = facility_codes[valid]
+        first = group_first(np.ones(vfac.size, dtype=bool), group, n_groups)
+        fac_codes = np.concatenate([vfac[first], facility_codes[noise]])
+
+        # — similarity 내림차순 정렬 + 업종 필터 —
+        order = sort_desc(columns["similarity"])
+        if industry:
+            code = self.code_of("업종", industry)
+            order = order[string_codes["업종"][order] == code]
+
+        out = {"cluster": columns["cluster"][order]}
+        out["similarity"] = columns["similarity"][order]
+        for c in NUMERIC_COLUMNS:
+            out[c] = columns[c][order]
+        for c in STRING_COLUMNS:
+            out[c] = self.categories[c][string_codes[c][order]]
+        out["facility"] = np.asarray(facilities, dtype=object)[fac_codes[order]]
+        return pd.DataFrame(out, columns=CANDIDATE_COLUMNS)
+
+
+class ChainedColumn:
+    """
+    여러 배열을 순서대로 이어 붙인 것처럼 행 번호 배열로 읽는 읽기 전용 열입니다 (배열은 복사하지 않음).
+    np.asarray()로 변환하면 그때 이어 붙인 사본을 만듭니다.
+    """
+
+    def __init__(self, parts):
+        self.parts = tuple(parts)
+        self.offsets = np.cumsum([0] + [len(p) for p in self.parts])
+        self.dtype = self.parts[0].dtype
+        self.shape = (int(self.offsets[-1]),)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, rows):
+        rows = np.asarray(rows, dtype=np.intp)
+        if rows.size == 0 or rows.max() < self.offsets[1]:
+            return self.parts[0][rows]
+        part = np.searchsorted(self.offsets, rows, side="right") - 1
+        out = np.empty(rows.shape, dtype=self.dtype)
+        for i in np.unique(part):
+            sel = part == i
+            out[sel] = self.parts[i][rows[sel] - self.offsets[i]]
+        return out
+
+    def __array__(self, dtype=None, copy=None):
+        return np.concatenate(self.parts).astype(dtype or self.dtype, copy=False)
+
+
+class SegmentedCatalog:
+    """
+    기본 카탈로그(base) 뒤에 수집 세그먼트 행(parts, 세그먼트마다 ActivityCatalog 하나)을 복사 없이 이어 붙인 카탈로그.
+    - 행 번호는 기본 카탈로그 → 세그먼트 순이며, 컬럼은 ChainedColumn이라 aggregate()가 그대로 동작합니다.
+    - 세그먼트의 문자열 코드는 기본 카탈로그와 같은 코드 공간을 쓰고, 처음 보는 값은 등장 순서대로 카테고리 끝에
+      추가합니다 (두 parquet을 이어 붙여 from_dataframe으로 읽은 것과 같은 코드).
+    - 클러스터 라벨은 기본 카탈로그의 라벨을 그대로 씁니다. 수집 행은 기존 클러스터(또는 노이즈 -1)에만 배정되며,
+      기본 카탈로그에 없는 라벨은 노이즈로 집계합니다.
+    """
+
+    def __init__(self, base: ActivityCatalog, parts=(), part_cluster_codes=()):
+        self.base = base
+        self.parts = tuple(parts)
+        self._part_cluster_codes = tuple(part_cluster_codes)
+        catalogs = (base,) + self.parts
+        self.numeric = {
+            c: ChainedColumn([p.numeric[c] for p in catalogs]) for c in NUMERIC_COLUMNS
+        }
+        self.codes = {
+            c: ChainedColumn([p.codes[c] for p in catalogs]) for c in STRING_COLUMNS
+        }
+        self.categories = catalogs[-1].categories
+        self._code_of = catalogs[-1]._code_of
+        self.cluster = ChainedColumn([p.cluster for p in catalogs])
+        self.cluster_labels = base.cluster_labels
+        self.cluster_code = ChainedColumn(
+            (base.cluster_code,) + self._part_cluster_codes
+        )
+        self.size = sum(p.size for p in catalogs)
+
+    def append(self, frame: pd.DataFrame):
+        """frame의 행을 세그먼트 하나로 붙인 새 SegmentedCatalog (비용은 frame 행 수와 카테고리 수에 비례)"""
+        codes, categories = {}, {}
+        for c in STRING_COLUMNS:
+            lookup = dict(self._code_of[c])
+            known = list(self.categories[c][:-1])
+            new_codes = np.empty(len(frame), dtype=self.base.codes[c].dtype)
+            for i, value in enumerate(frame[c].tolist()):
+                if pd.isna(value):
+                    new_codes[i] = -1
+                    continue
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(known)
+                    known.append(value)
+                new_codes[i] = code
+            codes[c] = new_codes
+            categories[c] = np.asarray(known, dtype=object)
+        cluster = frame["cluster"].to_numpy().astype(self.base.cluster.dtype)
+        part = ActivityCatalog(
+            {c: frame[c].to_numpy(dtype=np.float64) for c in NUMERIC_COLUMNS},
+            codes,
+            categories,
+            cluster,
+        )
+
+        labels = self.cluster_labels
+        cluster_code = np.searchsorted(labels, cluster)
+        found = cluster_code < labels.size
+        found[found] = labels[cluster_code[found]] == cluster[found]
+        cluster_code[~found] = -1
+        return type(self)(
+            self.base,
+            self.parts + (part,),
+            self._part_cluster_codes + (cluster_code.astype(np.intp),),
+        )
+
+    def __len__(self):
+        return self.size
+
+    code_of = ActivityCatalog.code_of
+    decode = ActivityCatalog.decode
+    aggregate = ActivityCatalog.aggregate
@@ -0,0 +1,282 @@
+# app/services/comment_cache.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from ..setting.config import COMMENT_CACHE_SIZE, COMMENT_CACHE_TTL, COMMENT_CACHE_PATH
+
+logger = logging.getLogger(__name__)
+
+# 프롬프트에 들어가는 항목 필드 (이 값들과 순서가 같으면 같은 프롬프트가 만들어집니다)
+ITEM_FIELDS = (
+    "industry",
+    "facility",
+    "improvementType",
+    "activity",
+    "investmentCost",
+    "costSaving",
+    "roiPeriod",
+    "emissionReduction",
+)
+
+# 캐시 모드: use(조회 후 없으면 생성/저장), bypass(조회/저장 안 함), refresh(조회하지 않고 새로 생성해 덮어씀)
+CACHE_MODES = ("use", "bypass", "refresh")
+
+
+def comment_key(focus: str, items: list, model: str, prompt_version: str) -> str:
+    """
+    LLM 코멘트 캐시 키 (content-addressed).
+    focus, 순위 순서의 항목 필드(프롬프트에 쓰이는 문자열 그대로), 모델 이름, 프롬프트 템플릿 버전의 SHA-256입니다.
+    id/bookmark처럼 프롬프트에 들어가지 않는 필드는 키에 포함하지 않습니다.
+    """
+    payload = {
+        "prompt_version": prompt_version,
+        "model": model,
+        "focus": focus,
+        "items": [[str(item.get(f, "N/A")) for f in ITEM_FIELDS] for item in items],
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _SQLiteTier:
+    """재시작 후에도 유지되는 디스크 캐시 (key -> JSON 값, 저장 시각)."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        with self._lock:
+            # 여러 워커 프로세스가 같은 파일을 공유할 수 있도록 WAL 모드를 사용합니다.
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS comments ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str, min_created_at: float):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM comments WHERE key = ? AND created_at >= ?",
+                (key, min_created_at),
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, key: str, value: dict, created_at: float):
+        raw = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO comments (key, value, created_at) VALUES (?, ?, ?)",
+                (key, raw, created_at),
+            )
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM comments").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM comments")
+            self._conn.commit()
+
+
+class CommentCache:
+    """
+    /comment LLM 응답 캐시.
+    - 1단계: 프로세스 내 LRU (maxsize개)
+    - 2단계: 선택적 SQLite 파일 (path가 있으면 사용, 재시작 후에도 유지)
+    - ttl초가 지난 항목은 두 단계 모두에서 무시합니다 (0이면 만료 없음).
+    - 같은 키의 요청이 동시에 들어오면 LLM을 한 번만 호출하고 나머지는 결과를 기다립니다.
+      먼저 호출한 요청이 취소되면 기다리던 요청 중 하나가 이어서 호출합니다.
+    - LLM 호출이 실패(예외)하면 저장하지 않습니다.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 0.0, path: str = ""):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._disk = None
+        if path:
+            try:
+                self._disk = _SQLiteTier(path)
+            except sqlite3.Error as e:
+                logger.warning("Comment disk cache unavailable (%s): %s", path, e)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.bypasses = 0
+        self.refreshes = 0
+        self.disk_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 or self._disk is not None
+
+    def _fresh_since(self) -> float:
+        return time.time() - self.ttl if self.ttl > 0 else 0.0
+
+    def _remember(self, key: str, value: dict, created_at: float):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (created_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _memory_get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created_at, value = entry
+        if created_at < self._fresh_since():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def _disk_get(self, key: str):
+        if self._disk is None:
+            return None
+        try:
+            return await asyncio.to_thread(self._disk.get, key, self._fresh_since())
+        except sqlite3.Error as e:
+            self.disk_errors += 1
+            logger.warning("Comment disk cache read failed: %s", e)
+            return None
+
+    async def _store(self, key: str, value: dict):
+        created_at = time.time()
+        self._remember(key, value, created_at)
+        if self._disk is None:
+            return
+        try:
+            await asyncio.to_thread(self._disk.put, key, value, created_at)
+        except sqlite3.Error as e:
+            self.disk_errors += 1
+            logger.warning("Comment disk cache write failed: %s", e)
+
+    async def lookup(self, key: str):
+        """
+        메모리 → 디스크 순으로 조회합니다 (스트리밍 응답처럼 get_or_generate를 쓸 수 없는 경우).
+        반환값: (값, "memory" | "disk") 또는 (None, "miss")
+        """
+        value = self._memory_get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value, "memory"
+        value = await self._disk_get(key)
+        if value is not None:
+            self.disk_hits += 1
+            self._remember(key, value, time.time())
+            return value, "disk"
+        self.misses += 1
+        return None, "miss"
+
+    async def store(self, key: str, value: dict):
+        """생성이 끝난 값을 두 단계 모두에 저장합니다."""
+        await self._store(key, value)
+
+    async def get_or_generate(self, key: str, generate, mode: str = "use"):
+        """
+        캐시 모드에 따라 값을 반환합니다. generate는 코루틴 함수이며 실패 시 예외를 발생시켜야 합니다.
+        반환값: (값, 상태) — 상태는 "memory" | "disk" | "miss" | "bypass" | "refresh"
+        """
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown comment cache mode: {mode}")
+        if mode == "bypass" or not self.enabled:
+            self.bypasses += 1
+            return await generate(), "bypass"
+
+        if mode == "use":
+            while True:
+                value = self._memory_get(key)
+                if value is not None:
+                    self.memory_hits += 1
+                    return value, "memory"
+                flight = self._inflight.get(key)
+                if flight is None:
+                    break
+                self.coalesced += 1
+                # 먼저 생성하던 요청이 취소되면 그 취소를 이어받지 않고 처음부터 다시 조회합니다.
+                await asyncio.wait((flight,))
+                if not flight.cancelled():
+                    return flight.result(), "miss"
+            value = await self._disk_get(key)
+            if value is not None:
+                self.disk_hits += 1
+                self._remember(key, value, time.time())
+                return value, "disk"
+            self.misses += 1
+            status = "miss"
+        else:
+            self.refreshes += 1
+            status = "refresh"
+
+        flight = asyncio.get_running_loop().create_future()
+        self._inflight[key] = flight
+        try:
+            value = await generate()
+        except asyncio.CancelledError:
+            # 이 요청만 취소된 것이므로 기다리던 요청에는 예외 대신 취소된 future를 넘겨 다시 조회하게 합니다.
+            flight.cancel()
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            # 기다리는 요청이 없으면 "exception was never retrieved" 경고가 나지 않도록 소비합니다.
+            flight.exception()
+            raise
+        else:
+            flight.set_result(value)
+            await self._store(key, value)
+        finally:
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+        return value, status
+
+    async def clear(self):
+        self._entries.clear()
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.clear)
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        disk_size = None
+        if self._disk is not None:
+            try:
+                disk_size = self._disk.count()
+            except sqlite3.Error:
+                self.disk_errors += 1
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "disk_path": None if self._disk is None else self._disk.path,
+            "disk_size": disk_size,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "coalesced": self.coalesced,
+            "bypasses": self.bypasses,
+            "refreshes": self.refreshes,
+            "disk_errors": self.disk_errors,
+        }
+
+
+comment_cache = CommentCache(
+    maxsize=COMMENT_CACHE_SIZE, ttl=COMMENT_CACHE_TTL, path=COMMENT_CACHE_PATH
+)
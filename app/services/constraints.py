@@ -0,0 +1,169 @@
+# app/services/constraints.py
+"""
+예산(투자가능금액)과 목표 투자비회수기간 제약을 유사도 계산 전에 적용합니다.
+카탈로그의 투자비/투자비회수기간 컬럼마다 로드 시 정렬 인덱스(RangeIndex)를 만들어 두고,
+검색할 후보 행 중 제약을 넘는 행을 미리 빼서 유사도/집계는 남은 행에만 계산합니다.
+
+- off: 제약 없음 (기존 동작 — 예산/회수기간은 인코더 입력으로만 사용)
+- hard: 투자비 ≤ 투자가능금액, 투자비회수기간 ≤ 목표 ROI 기간
+- tolerance: 상한에 (1 + 허용 비율)을 곱해 조금 넘는 활동까지 허용
+
+요청 값이 0 이하인 제약은 적용하지 않으며, 값이 없는(NaN) 카탈로그 행은 해당 제약을 만족하지 않는 것으로 봅니다.
+"""
+
+import numpy as np
+
+from ..setting.config import (
+    CONSTRAINT_INVESTMENT_TOLERANCE,
+    CONSTRAINT_ROI_TOLERANCE,
+    RECOMMEND_CONSTRAINTS,
+)
+
+MODES = ("off", "hard", "tolerance")
+
+# 제약 이름 → 카탈로그 컬럼 (요청 단위와 같음: 백 만원, 년)
+CONSTRAINT_COLUMNS = {"investment": "투자비", "roi": "투자비회수기간"}
+
+# 전체 카탈로그에서 찾을 때 남는 행이 이 비율보다 많으면 정렬 인덱스 구간을 정렬하는 대신
+# 컬럼 전체를 비교합니다 (1M 행 기준 약 10%부터 비교가 빠름).
+SLICE_FRACTION = 0.1
+
+
+class RangeIndex:
+    """수치 컬럼 하나의 정렬 인덱스. 값이 limit 이하인 행을 이분 탐색으로 찾습니다."""
+
+    def __init__(self, values: np.ndarray):
+        self.values = np.asarray(values, dtype=np.float64)
+        # argsort는 NaN을 맨 뒤로 보내므로 앞쪽 valid개만 이분 탐색합니다.
+        self.order = np.argsort(self.values, kind="stable")
+        self.sorted = self.values[self.order]
+        self.valid = int(np.count_nonzero(~np.isnan(self.values)))
+
+    def count_le(self, limit: float) -> int:
+        return int(np.searchsorted(self.sorted[: self.valid], limit, side="right"))
+
+    def rows_le(self, limit: float) -> np.ndarray:
+        """값 ≤ limit인 행 번호 (값 순서)"""
+        return self.order[: self.count_le(limit)]
+
+
+class ConstraintIndex:
+    """카탈로그의 제약 컬럼별 RangeIndex (모델 번들을 만들 때 함께 만듭니다)."""
+
+    def __init__(self, catalog):
+        self.size = len(catalog)
+        self.columns = {
+            name: RangeIndex(catalog.numeric[column])
+            for name, column in CONSTRAINT_COLUMNS.items()
+        }
+
+    def restrict(self, limits: tuple, rows: np.ndarray = None) -> tuple:
+        """
+        limits((제약 이름, 상한), ...)을 모두 만족하는 행과 제약별로 제외된 행 수.
+        rows=None이면 전체 카탈로그에서 가장 선택적인 제약의 정렬 인덱스 구간만 읽어 찾고
+        (행 번호 오름차순 — 구간이 SLICE_FRACTION보다 크면 전체를 비교하는 편이 빠름),
+        rows가 있으면 그 순서를 유지한 채 거릅니다.
+        제외 수는 제약마다 따로 센 값이라 두 제약을 모두 넘는 행은 양쪽에 다 들어갑니다.
+        반환값: (남은 행 번호, {제약 이름: 제외된 행 수})
+        """
+        if rows is None:
+            counts = {
+                name: self.columns[name].count_le(limit) for name, limit in limits
+            }
+            removed = {name: self.size - n for name, n in counts.items()}
+            name, limit = min(limits, key=lambda item: counts[item[0]])
+            if counts[name] > SLICE_FRACTION * self.size:
+                return self._compare(limits)[0], removed
+            kept = np.sort(self.columns[name].rows_le(limit))
+            for other, other_limit in limits:
+                if other != name:
+                    kept = kept[self.columns[other].values[kept] <= other_limit]
+            return kept, removed
+        return self._compare(limits, rows)
+
+    def _compare(self, limits: tuple, rows: np.ndarray = None) -> tuple:
+        """rows(기본: 전체)의 값을 직접 비교해 거릅니다 (rows 순서 유지)."""
+        n = self.size if rows is None else len(rows)
+        keep = np.ones(n, dtype=bool)
+        removed = {}
+        for name, limit in limits:
+            values = self.columns[name].values
+            ok = (values if rows is None else values[rows]) <= limit
+            removed[name] = int(n - np.count_nonzero(ok))
+            keep &= ok
+        return (np.flatnonzero(keep) if rows is None else rows[keep]), removed
+
+
+def constraint_mode(input_data: dict) -> str:
+    """요청의 constraints 값 (없으면 RECOMMEND_CONSTRAINTS)"""
+    mode = input_data.get("constraints") or RECOMMEND_CONSTRAINTS
+    if mode not in MODES:
+        raise ValueError(f"Unknown constraint mode: {mode}")
+    return mode
+
+
+def constraint_limits(mode: str, investment: float, roi_period: float) -> tuple:
+    """
+    요청의 투자가능금액/목표 ROI 기간으로 ((제약 이름, 상한), ...)을 만듭니다.
+    mode가 off이거나 요청 값이 0 이하이면 해당 제약은 빠집니다.
+    """
+    if mode == "off":
+        return ()
+    tolerances = {"investment": 0.0, "roi": 0.0}
+    if mode == "tolerance":
+        tolerances = {
+            "investment": CONSTRAINT_INVESTMENT_TOLERANCE,
+            "roi": CONSTRAINT_ROI_TOLERANCE,
+        }
+    values = {"investment": investment, "roi": roi_period}
+    return tuple(
+        (name, values[name] * (1.0 + tolerances[name]))
+        for name in CONSTRAINT_COLUMNS
+        if values[name] > 0
+    )
+
+
+class ConstraintFilter:
+    """
+    한 요청의 제약으로 검색 후보 행을 거르는 함수 객체 (LatentIndex / PartitionedIndex의 restrict).
+    호출될 때마다(검색 범위와 수집 세그먼트마다) 검색 대상 행 수와 제약별 제외 수를 누적해 report()로 돌려줍니다.
+    """
+
+    def __init__(self, index: ConstraintIndex, mode: str, limits: tuple):
+        self.index = index
+        self.mode = mode
+        self.limits = limits
+        self.scanned = 0
+        self.remaining = 0
+        self.removed = {name: 0 for name, _ in limits}
+
+    def __call__(
+        self, rows: np.ndarray = None, index: ConstraintIndex = None
+    ) -> np.ndarray:
+        """index: 수집 세그먼트의 ConstraintIndex (기본: 기본 카탈로그, rows는 그 인덱스 기준 행 번호)"""
+        index = self.index if index is None else index
+        kept, removed = index.restrict(self.limits, rows)
+        self.scanned += index.size if rows is None else len(rows)
+        self.remaining += len(kept)
+        for name, n in removed.items():
+            self.removed[name] += n
+        return kept
+
+    def report(self) -> dict:
+        """응답의 constraints 항목 (ConstraintReport 형식)"""
+        return {
+            "mode": self.mode,
+            "limits": {name: limit for name, limit in self.limits},
+            "scanned": self.scanned,
+            "removed": dict(self.removed),
+            "remaining": self.remaining,
+        }
+
+
+def constraint_filter(model, input_data: dict, numeric: list):
+    """요청에 적용할 ConstraintFilter (적용할 제약이 없으면 None). numeric은 parse_input의 수치 입력입니다."""
+    mode = constraint_mode(input_data)
+    limits = constraint_limits(mode, numeric[0], numeric[2])
+    if not limits:
+        return None
+    return ConstraintFilter(model.constraint_index, mode, limits)
@@ -0,0 +1,123 @@
+# app/services/encoder.py
+
+import json
+import logging
+import zipfile
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_ACTIVATIONS = {
+    None: lambda x: x,
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "sigmoid": lambda x: 1.0 / (1.0 + np.exp(-x)),
+    "tanh": np.tanh,
+}
+
+
+class NumpyEncoder:
+    """
+    Dense 레이어만으로 구성된 Keras 인코더의 순전파를 NumPy 행렬곱으로 수행합니다.
+    - layers: (kernel, bias, activation) 튜플 리스트 (입력 → 출력 순서)
+    """
+
+    def __init__(self, layers):
+        if not layers:
+            raise ValueError("NumpyEncoder에는 최소 1개의 Dense 레이어가 필요합니다.")
+        self.layers = []
+        for kernel, bias, activation in layers:
+            if activation not in _ACTIVATIONS:
+                raise ValueError(f"지원하지 않는 activation: {activation}")
+            kernel = np.ascontiguousarray(kernel, dtype=np.float32)
+            bias = (
+                np.zeros(kernel.shape[1], dtype=np.float32)
+                if bias is None
+                else np.ascontiguousarray(bias, dtype=np.float32)
+            )
+            self.layers.append((kernel, bias, activation))
+        self.input_dim = self.layers[0][0].shape[0]
+        self.output_dim = self.layers[-1][0].shape[1]
+
+    @classmethod
+    def from_keras_model(cls, model):
+        """이미 로드된 Keras 모델에서 Dense 가중치를 추출합니다."""
+        layers = []
+        for layer in model.layers:
+            name = type(layer).__name__
+            if name == "InputLayer":
+                continue
+            if name != "Dense":
+                raise ValueError(f"Dense 이외의 레이어는 지원하지 않습니다: {name}")
+            weights = layer.get_weights()
+            bias = weights[1] if len(weights) > 1 else None
+            activation = layer.get_config().get("activation")
+            layers.append((weights[0], bias, activation))
+        return cls(layers)
+
+    @classmethod
+    def from_keras_file(cls, path: str):
+        """
+        `.keras` 아카이브(config.json + model.weights.h5)를 직접 읽어 가중치를 추출합니다.
+        TensorFlow/Keras를 import하지 않으므로 요청 경로에서 TF 없이 서빙할 수 있습니다.
+        """
+        import h5py
+
+        with zipfile.ZipFile(path) as archive:
+            config = json.loads(archive.read("config.json"))
+            with archive.open("model.weights.h5") as fp:
+                with h5py.File(fp, "r") as h5:
+                    weights_by_name = {}
+                    ordered = []
+                    for group_name in h5["layers"]:
+                        vars_group = h5["layers"][group_name].get("vars")
+                        if vars_group is None or len(vars_group) == 0:
+                            continue
+                        arrays = [
+                            vars_group[str(i)][()] for i in range(len(vars_group))
+                        ]
+                        layer_name = vars_group.attrs.get("name")
+                        if layer_name is not None:
+                            weights_by_name[str(layer_name)] = arrays
+                        ordered.append(arrays)
+
+        layers = []
+        dense_configs = []
+        for layer in config["config"]["layers"]:
+            if layer["class_name"] == "InputLayer":
+                continue
+            if layer["class_name"] != "Dense":
+                raise ValueError(f"Dense 이외의 레이어는 지원하지 않습니다: {layer['class_name']}")
+            dense_configs.append(layer["config"])
+
+        if len(ordered) != len(dense_configs):
+            raise ValueError("가중치 그룹 수와 Dense 레이어 수가 일치하지 않습니다.")
+
+        for i, layer_config in enumerate(dense_configs):
+            arrays = weights_by_name.get(layer_config["name"], ordered[i])
+            bias = arrays[1] if layer_config.get("use_bias", True) else None
+            layers.append((arrays[0], bias, layer_config.get("activation")))
+        return cls(layers)
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        """(n, input_dim) 행렬을 한 번의 순전파로 (n, output_dim) latent 행렬로 변환합니다."""
+        h = np.asarray(x, dtype=np.float32)
+        if h.ndim == 1:
+            h = h[np.newaxis, :]
+        for kernel, bias, activation in self.layers:
+            h = _ACTIVATIONS[activation](h @ kernel + bias)
+        return h.astype(np.float32, copy=False)
+
+
+def check_parity(numpy_encoder, keras_encoder, n_samples: int = 64, seed: int = 0):
+    """
+    NumpyEncoder와 Keras 인코더의 출력을 같은 입력으로 비교하여 최대 절대 오차를 반환합니다.
+    입력은 실제 user_vec 분포와 비슷하도록 0/1 one-hot 부분과 연속값 부분을 섞어 만듭니다.
+    """
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=(n_samples, numpy_encoder.input_dim)).astype(np.float32)
+    x[: n_samples // 2] = (x[: n_samples // 2] > 0.5).astype(np.float32)
+    expected = np.asarray(keras_encoder.predict_on_batch(x), dtype=np.float32)
+    actual = numpy_encoder.predict(x)
+    return float(np.max(np.abs(expected - actual)))
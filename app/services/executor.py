@@ -0,0 +1,203 @@
+# app/services/executor.py
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from ..setting.config import (
+    RECOMMEND_EXECUTOR,
+    RECOMMEND_WORKERS,
+    RECOMMEND_MAX_QUEUE,
+    RECOMMEND_TIMEOUT,
+)
+from ..setting.log import request_id_var
+from .metrics import REGISTRY, CallbackMetric
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """실행 중 + 대기 중인 작업 수가 한도에 도달했을 때 발생합니다."""
+
+
+def _init_worker():
+    # 프로세스 워커마다 로깅을 설정하고 모델/카탈로그를 한 번만 로드합니다.
+    from ..setting.log import setup_logging
+    from ..setting.startup import load_resources
+
+    setup_logging()
+    load_resources()
+
+
+def _ping():
+    return multiprocessing.current_process().name
+
+
+def _with_request_id(request_id, fn, *args):
+    # run_in_executor/프로세스 풀은 contextvars를 넘기지 않으므로 요청 ID를 직접 전달합니다.
+    token = request_id_var.set(request_id)
+    try:
+        return fn(*args)
+    finally:
+        request_id_var.reset(token)
+
+
+def recommend_single(input_data: dict, per_k: int):
+    """
+    워커(스레드/프로세스)에서 실행되는 /recommend 작업 (결과 캐시는 API 프로세스가 실행기 앞에서 확인합니다).
+    반환값: (결과, 계산에 사용한 모델 버전, 단계별 시간 — timing.record()에 넘길 dict 또는 None)
+    단계 시간은 워커 안에서 재야 하므로 (run_in_executor는 context를 넘기지 않음) 여기서 추적을 시작합니다.
+    """
+    from .inference import recommend_all
+    from .registry import model_registry
+    from .timing import traced
+
+    model = model_registry.current()
+    with traced("recommend") as trace:
+        result = recommend_all(input_data, per_k=per_k, model=model)
+    return result, model.version, trace and trace.export()
+
+
+def recommend_batch(inputs: list, per_k: int):
+    """/recommend/batch 작업 — 모든 요청을 같은 모델 버전으로 계산합니다. 반환값: (결과, 모델 버전, 단계별 시간)"""
+    from .inference import recommend_all_batch
+    from .registry import model_registry
+    from .timing import traced
+
+    model = model_registry.current()
+    with traced("recommend_batch") as trace:
+        results = recommend_all_batch(inputs, per_k, model=model)
+    return results, model.version, trace and trace.export()
+
+
+class RecommendationExecutor:
+    """
+    CPU 바운드 추천 연산을 asyncio 이벤트 루프 밖에서 실행하는 실행기.
+    - backend="thread": GIL을 해제하는 NumPy/TF 구간을 스레드 풀에서 실행
+    - backend="process": 워커 프로세스가 시작 시 모델을 한 번 로드한 뒤 요청을 처리
+    - 실행 중 + 대기 중 작업이 workers + max_queue 이상이면 QueueFullError (429)
+    - 요청별 timeout 초과 시 asyncio.TimeoutError (504)
+    """
+
+    def __init__(
+        self,
+        backend: str = "thread",
+        workers: int = 4,
+        max_queue: int = 32,
+        timeout: float = 30.0,
+    ):
+        if backend not in ("thread", "process"):
+            raise ValueError(f"Unknown executor backend: {backend}")
+        self.backend = backend
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pool = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _new_pool(self):
+        if self.backend == "process":
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="recommend"
+        )
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            self._pool = self._new_pool()
+        return self._pool
+
+    async def _warm(self, pool):
+        loop = asyncio.get_running_loop()
+        names = await asyncio.gather(
+            *(loop.run_in_executor(pool, _ping) for _ in range(self.workers))
+        )
+        logger.info("Recommendation process pool warmed: %s", sorted(set(names)))
+
+    async def start(self):
+        """풀을 만들고 워커를 미리 띄워 첫 요청의 콜드 스타트를 없앱니다."""
+        pool = self._ensure_pool()
+        if self.backend == "process":
+            await self._warm(pool)
+
+    async def recycle(self):
+        """
+        모델 교체 후 프로세스 워커를 새 버전으로 바꿉니다.
+        새 풀의 워커가 모델을 로드한 뒤에 교체하고, 이전 풀은 진행 중인 작업을 마친 뒤 종료합니다.
+        스레드 백엔드는 레지스트리를 공유하므로 아무것도 하지 않습니다.
+        """
+        if self.backend != "process" or self._pool is None:
+            return
+        pool = self._new_pool()
+        await self._warm(pool)
+        old, self._pool = self._pool, pool
+        old.shutdown(wait=False)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn, *args, timeout: float = None):
+        """fn(*args)를 풀에서 실행하고 결과를 기다립니다."""
+        with self._lock:
+            if self._pending >= self.capacity:
+                raise QueueFullError(
+                    f"recommendation queue is full ({self._pending}/{self.capacity})"
+                )
+            self._pending += 1
+        try:
+            future = self._ensure_pool().submit(
+                _with_request_id, request_id_var.get(), fn, *args
+            )
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout or self.timeout
+            )
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise
+
+
+recommend_executor = RecommendationExecutor(
+    backend=RECOMMEND_EXECUTOR,
+    workers=RECOMMEND_WORKERS,
+    max_queue=RECOMMEND_MAX_QUEUE,
+    timeout=RECOMMEND_TIMEOUT,
+)
+
+REGISTRY.register(
+    CallbackMetric(
+        "recommend_queue_depth",
+        "실행 중 + 대기 중인 추천 작업 수",
+        lambda: recommend_executor.pending,
+    ),
+    CallbackMetric(
+        "recommend_queue_capacity",
+        "추천 실행기가 받을 수 있는 최대 작업 수 (초과 시 429)",
+        lambda: recommend_executor.capacity,
+    ),
+)
@@ -1,26 +1,32 @@
 # service/gpt_client.py
 
-import os
-from ..setting.config import OPENAI_API_KEY
-import time
 import json
+import logging
+import os
 from typing import List
-from openai import AsyncOpenAI
 
-# 1) AsyncOpenAI 클라이언트 생성 (config.py에서 OPENAI_API_KEY 사용)
-client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+from .comment_cache import comment_cache, comment_key
+from .llm_client import LLMUnavailableError, llm_client
+from .stream_parser import CommentStreamParser
+from .timing import stage
+
+logger = logging.getLogger(__name__)
+
+# 1) LLM 호출은 llm_client(연결 풀, 제한 시간, 재시도, 회로 차단기, 동시 실행 제한)를 거칩니다.
+#    캐시 hit은 LLM 호출 제한을 거치지 않습니다.
 
+# 프롬프트 템플릿 버전 — 프롬프트나 시스템 메시지를 바꾸면 올려서 이전 캐시 항목을 쓰지 않도록 합니다.
+PROMPT_VERSION = "1"
 
-async def generate_comparison_comment_async(focus: str, top_items: List[dict]) -> dict:
+# LLM을 사용할 수 없을 때 대체 응답 끝에 붙이는 안내 문구
+DEGRADED_NOTICE = "현재 AI 설명을 생성할 수 없어 주요 수치만 표시합니다. 잠시 후 다시 시도해주세요."
+
+
+def build_comparison_messages(focus: str, top_items: List[dict]) -> list:
     """
-    비동기로 ChatGPT API를 호출하여 상위 4개 개선 활동의 숫자 데이터를 비교한 JSON 응답을 반환합니다.
-    - focus: "balanced" | "ghg" | "saving" | "roi" 등의 문자열
-    - top_items: 개선 활동 딕셔너리 리스트 (최대 4개)
-    반환값: {"top1": "...", "comparison": "..."} 형태의 파싱된 JSON
+    상위 4개 개선 활동 비교 코멘트를 요청하는 chat 메시지 목록을 만듭니다.
+    프롬프트나 시스템 메시지를 바꾸면 PROMPT_VERSION을 올려주세요.
     """
-    if not top_items:
-        return {"top1": "", "comparison": ""}
-
     if focus == "total_optimization":
         focuskor = "최적의 종합 솔루션"
     elif focus == "emission_reduction":
@@ -102,35 +108,179 @@ async def generate_comparison_comment_async(focus: str, top_items: List[dict]) -
 
     full_prompt = "\n".join(prompt_lines)
 
+    return [
+        {
+            "role": "system",
+            "content": "친절하고 간결하게 설명해주세요. 응답 형식을 지켜 순수한 json으로만 응답해주세요",
+        },
+        {"role": "user", "content": full_prompt},
+    ]
+
+
+async def generate_comparison_comment_async(
+    focus: str, top_items: List[dict], cache_mode: str = "use"
+) -> dict:
+    """
+    비동기로 ChatGPT API를 호출하여 상위 4개 개선 활동의 숫자 데이터를 비교한 JSON 응답을 반환합니다.
+    - focus: "balanced" | "ghg" | "saving" | "roi" 등의 문자열
+    - top_items: 개선 활동 딕셔너리 리스트 (최대 4개)
+    - cache_mode: "use" | "bypass" | "refresh" (comment_cache 참고)
+    반환값: {"top1": "...", "comparison": "...", "cache": "memory" | "disk" | "miss" | "bypass" | "refresh" | "degraded" | "error"}
+    LLM을 사용할 수 없으면(재시도 실패, 제한 시간 초과, 회로 열림) degraded_comment의 대체 응답을 반환합니다.
+    """
+    if not top_items:
+        return {"top1": "", "comparison": ""}
+
+    with stage("prompt_build"):
+        messages = build_comparison_messages(focus, top_items)
+
+    async def request_comment() -> dict:
+        with stage("llm_call"):
+            raw = await llm_client.complete(
+                messages, focus=focus, max_tokens=1000, temperature=0.1
+            )
+        with stage("parse"):
+            parsed = json.loads(raw)
+
+        # JSON에 "top1", "comparison" 키가 없으면 빈 문자열로 반환
+        return {
+            "top1": parsed.get("top1", ""),
+            "comparison": parsed.get("comparison", ""),
+        }
+
     try:
-        start_ts = time.time()
-        response = await client.chat.completions.create(
-            model="gpt-4o-mini",  # 원하시는 모델로 교체
-            messages=[
-                {
-                    "role": "system",
-                    "content": "친절하고 간결하게 설명해주세요. 응답 형식을 지켜 순수한 json으로만 응답해주세요",
-                },
-                {"role": "user", "content": full_prompt},
-            ],
-            max_tokens=1000,
-            temperature=0.1,
+        # 같은 focus/항목/모델/프롬프트 버전이면 캐시된 응답을 사용합니다 (실패한 호출은 저장하지 않음).
+        key = comment_key(focus, top_items, llm_client.model, PROMPT_VERSION)
+        result, status = await comment_cache.get_or_generate(
+            key, request_comment, cache_mode
         )
-        elapsed = time.time() - start_ts
-        print(f"[LLM] focus={focus} 응답 시간: {elapsed:.2f}초")
-
-        raw = response.choices[0].message.content.strip()
-        parsed = json.loads(raw)
-
-        # JSON에 "top1", "comparison" 키가 있는지 확인
-        if "top1" in parsed and "comparison" in parsed:
-            return {"top1": parsed["top1"], "comparison": parsed["comparison"]}
-        else:
-            # 키 누락 시 빈 문자열로 반환
-            return {
-                "top1": parsed.get("top1", ""),
-                "comparison": parsed.get("comparison", ""),
-            }
+        return {**result, "cache": status}
+    except LLMUnavailableError as e:
+        logger.warning("[LLM UNAVAILABLE] focus=%s 대체 응답 반환: %s", focus, e)
+        return {**degraded_comment(top_items), "cache": "degraded"}
     except Exception as e:
-        print(f"[LLM ERROR] focus={focus} 예외: {e}")
-        return {"top1": "LLM 호출 중 오류가 발생했습니다.", "comparison": ""}
+        logger.error("[LLM ERROR] focus=%s 예외: %s", focus, e)
+        return {
+            "top1": "LLM 호출 중 오류가 발생했습니다.",
+            "comparison": "",
+            "cache": "error",
+        }
+
+
+def degraded_comment(top_items: List[dict]) -> dict:
+    """
+    LLM 없이 항목 수치만으로 만든 대체 응답 ({"top1", "comparison"}).
+    캐시하지 않으며, 프롬프트와 같은 단위 표기를 사용합니다.
+    """
+
+    def figures(item: dict) -> str:
+        return (
+            f"투자비 {item.get('investmentCost', 'N/A')} (백만원), "
+            f"절감액 {item.get('costSaving', 'N/A')} (백만원), "
+            f"투자비회수기간 {item.get('roiPeriod', 'N/A')} (년), "
+            f"온실가스감축량 {item.get('emissionReduction', 'N/A')} (tCO2/년)"
+        )
+
+    top = top_items[0]
+    top1 = (
+        f"**{top.get('activity', 'N/A')}** "
+        f"({top.get('facility', 'N/A')}, {top.get('improvementType', 'N/A')})\n\n"
+        f"- {figures(top)}\n\n{DEGRADED_NOTICE}"
+    )
+    comparison = "\n".join(
+        f"- **Top {idx}**: {item.get('activity', 'N/A')} — {figures(item)}"
+        for idx, item in enumerate(top_items, start=1)
+    )
+    return {"top1": top1, "comparison": comparison}
+
+
+async def stream_comparison_comment(
+    focus: str, top_items: List[dict], cache_mode: str = "use"
+):
+    """
+    generate_comparison_comment_async의 스트리밍 버전 (async generator).
+    OpenAI 스트리밍 API의 토큰을 CommentStreamParser로 파싱해 아래 이벤트를 순서대로 내보냅니다.
+    - ("cache", "memory" | "disk" | "miss" | "bypass" | "refresh" | "degraded")
+    - ("delta", {"field": "top1" | "comparison", "text": "..."}) — 0회 이상
+    - ("done", {"top1": "...", "comparison": "..."}) 또는 ("error", {"detail": "..."})
+    캐시 hit이면 저장된 값을 필드별 delta 한 번씩으로 보냅니다. 응답 JSON이 끝까지 완성된 경우에만 캐시에 저장합니다.
+    첫 조각을 받기 전에 LLM을 사용할 수 없게 되면 ("cache", "degraded")와 대체 응답을 보냅니다.
+    """
+    if not top_items:
+        yield "cache", "bypass"
+        yield "done", {"top1": "", "comparison": ""}
+        return
+
+    key = comment_key(focus, top_items, llm_client.model, PROMPT_VERSION)
+    if cache_mode == "use" and comment_cache.enabled:
+        cached, status = await comment_cache.lookup(key)
+        if cached is not None:
+            yield "cache", status
+            for field in ("top1", "comparison"):
+                if cached.get(field):
+                    yield "delta", {"field": field, "text": cached[field]}
+            yield "done", cached
+            return
+    elif cache_mode == "refresh":
+        comment_cache.refreshes += 1
+        status = "refresh"
+    else:
+        comment_cache.bypasses += 1
+        status = "bypass"
+
+    parser = CommentStreamParser()
+    with stage("prompt_build"):
+        messages = build_comparison_messages(focus, top_items)
+    stream = llm_client.stream(messages, focus=focus, max_tokens=1000, temperature=0.1)
+    try:
+        # 첫 조각을 받은 뒤에 캐시 상태를 보냅니다 (그 전에 실패하면 대체 응답으로 바뀝니다).
+        with stage("llm_first_token"):
+            first = await stream.__anext__()
+    except StopAsyncIteration:
+        first = ""
+    except LLMUnavailableError as e:
+        await stream.aclose()
+        logger.warning("[LLM UNAVAILABLE] focus=%s 대체 응답 반환: %s", focus, e)
+        degraded = degraded_comment(top_items)
+        yield "cache", "degraded"
+        for field in ("top1", "comparison"):
+            yield "delta", {"field": field, "text": degraded[field]}
+        yield "done", degraded
+        return
+    except Exception as e:
+        await stream.aclose()
+        logger.error("[LLM ERROR] focus=%s 예외: %s", focus, e)
+        yield "cache", status
+        yield "error", {"detail": "LLM 호출 중 오류가 발생했습니다."}
+        return
+    yield "cache", status
+
+    try:
+        with stage("parse"):
+            deltas = parser.feed(first)
+        for field, delta in deltas:
+            yield "delta", {"field": field, "text": delta}
+        async for text in stream:
+            with stage("parse"):
+                deltas = parser.feed(text)
+            for field, delta in deltas:
+                yield "delta", {"field": field, "text": delta}
+    except Exception as e:
+        logger.error("[LLM ERROR] focus=%s 예외: %s", focus, e)
+        yield "error", {"detail": "LLM 호출 중 오류가 발생했습니다."}
+        return
+    finally:
+        # 클라이언트 연결이 끊겨 중단되어도 업스트림 스트림과 limiter 슬롯을 바로 반환합니다.
+        await stream.aclose()
+
+    if not parser.complete:
+        logger.error(
+            "[LLM ERROR] focus=%s 스트리밍 응답 JSON이 완성되지 않았습니다.", focus
+        )
+        yield "error", {"detail": "LLM 응답 형식이 올바르지 않습니다."}
+        return
+
+    result = parser.result()
+    if status != "bypass":
+        await comment_cache.store(key, result)
+    yield "done", result
@@ -1,35 +1,118 @@
+import functools
 import logging
 import numpy as np
 import pandas as pd
-from sklearn.metrics.pairwise import cosine_similarity
-from kneed import KneeLocator
-
-from ..setting.startup import (
-    encoder,
-    latent_vectors,
-    df,
-    ohe,
-    scaler,
-    categorical_cols,
-    numeric_cols,
-)
 
-# Logging configuration
-logging.basicConfig(level=logging.INFO, format="%(message)s")
+from ..setting.config import KNEE_PREFIX, SEARCH_PARTITION, SIMILARITY_BLOCK_BYTES
+from .ranking import FOCUSES, rank_candidates, rank_columns
+
+from ..setting import startup
+from ..setting.log import log_payload
+from .constraints import constraint_filter
+from .registry import model_registry
+from .similarity import merge_top_k
+from .timing import count, stage
+
+# Log arguments are passed %-style so disabled levels skip formatting entirely
+# (handlers are configured by the application, see app/setting/log.py).
 logger = logging.getLogger(__name__)
 
 
-def recommend_improvements(input_data: dict, per_k: int = 10):
+def build_user_vectors(model, pairs: list, numeric_rows) -> np.ndarray:
     """
-    1) AutoEncoder + cosine similarity to generate candidate recommendations
-       Determine Top-K using the elbow point; if not detected, fall back to per_k
-       2) Aggregate by cluster to remove duplicates and average metrics
+    Vectorize (industry, facility) pairs and their numeric inputs
+    ([invest, reduction, roi_months, ghg_reduction] per row) into one
+    (n_pairs, n_features) float32 matrix so the encoder can run a single
+    batched forward pass.
+    Uses the compiled FeatureVectorizer when available, otherwise the sklearn
+    OHE/scaler transforms on DataFrames.
     """
-    logger.info(
-        f"recommend_improvements called - input_data: {input_data}, per_k: {per_k} (AI-driven recommendation)"
+    if model.vectorizer is not None:
+        return model.vectorizer.transform(pairs, numeric_rows)
+
+    input_cat = pd.DataFrame(
+        [list(pair) for pair in pairs], columns=model.categorical_cols
+    )
+    user_cat = model.ohe.transform(input_cat)
+    logger.debug("One-hot encoding of categorical data shape: %s", user_cat.shape)
+
+    input_num = pd.DataFrame(
+        np.broadcast_to(np.asarray(numeric_rows, dtype=np.float64), (len(pairs), 4)),
+        columns=model.numeric_cols,
     )
+    user_num = model.scaler.transform(input_num)
+    logger.debug("Scaled numerical data shape: %s", user_num.shape)
+
+    return np.hstack([user_cat, user_num]).astype("float32")
+
 
-    # — Parse input and compute numeric values —
+def encode(model, user_vecs: np.ndarray) -> np.ndarray:
+    """
+    Encode a batch of user vectors in one forward pass.
+    Uses the NumPy engine when it is enabled (ENCODER_BACKEND=numpy), otherwise Keras
+    via predict_on_batch to skip the per-call predict machinery.
+    """
+    if model.numpy_encoder is not None:
+        return model.numpy_encoder.predict(user_vecs)
+    return np.asarray(model.encoder.predict_on_batch(user_vecs))
+
+
+def find_knee(y: np.ndarray, S: float = 1.0):
+    """
+    Vectorized Kneedle elbow detection on a convex, decreasing curve.
+    Same semantics as
+    `KneeLocator(np.arange(1, len(y) + 1), y, S=S, curve="convex", direction="decreasing").knee`
+    (interp1d smoothing, offline mode), without the per-point Python loop.
+    Returns the 1-based rank of the elbow, or None if no elbow is detected.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = y.shape[0]
+    if n < 2:
+        return None
+
+    # interp1d evaluated at the sample points: y[i-1] + (y[i] - y[i-1])
+    ds_y = y.copy()
+    ds_y[1:] = (y[1:] - y[:-1]) + y[:-1]
+
+    x_norm = np.arange(n) / (n - 1)
+    y_min, y_max = ds_y.min(), ds_y.max()
+    if y_max == y_min:
+        return None
+    y_norm = (ds_y - y_min) / (y_max - y_min)
+    y_norm = y_norm.max() - y_norm
+    diff = y_norm - x_norm
+
+    # Local extrema of the difference curve (argrelextrema, order=1, mode="clip")
+    prev = np.concatenate((diff[:1], diff[:-1]))
+    nxt = np.concatenate((diff[1:], diff[-1:]))
+    is_max = (diff >= prev) & (diff >= nxt)
+    is_min = (diff <= prev) & (diff <= nxt)
+    maxima = np.flatnonzero(is_max)
+    if maxima.size == 0:
+        return None
+
+    tmx = np.zeros(n)
+    tmx[maxima] = diff[maxima] - S * np.abs(np.diff(x_norm).mean())
+
+    # Threshold in effect at each point: Tmx of the last local maximum,
+    # reset to 0 once a local minimum is reached after it
+    pos = np.arange(maxima[0], n - 1)
+    idx = np.arange(n)
+    last_max = np.maximum.accumulate(np.where(is_max, idx, -1))[pos]
+    last_min = np.maximum.accumulate(np.where(is_min, idx, -1))[pos]
+    threshold = np.where(last_min >= last_max, 0.0, tmx[last_max])
+
+    hits = np.flatnonzero(diff[pos + 1] < threshold)
+    if hits.size == 0:
+        return None
+    return int(last_max[hits[0]]) + 1
+
+
+def parse_input(input_data: dict):
+    """
+    Parse a recommendation request into (industry, facilities, numeric) where
+    numeric is [invest, reduction, roi_months, ghg_reduction].
+    """
     industry = input_data.get("industry", "")
     facilities = input_data.get("targetFacilities", [])
     invest = float(input_data.get("availableInvestment") or 0.0)
@@ -40,84 +123,317 @@ def recommend_improvements(input_data: dict, per_k: int = 10):
     # Calculate savings and GHG reduction
     reduction = invest / roi_months if roi_months > 0 else 0.0
     ghg_reduction = current_em - target_em
-    logger.debug(f"Calculated reduction: {reduction}, GHG reduction: {ghg_reduction}")
+    logger.debug(
+        "Calculated reduction: %s, GHG reduction: %s", reduction, ghg_reduction
+    )
+
+    return industry, facilities, [invest, reduction, roi_months, ghg_reduction]
 
-    all_cands = []
 
-    for facility in facilities:
-        logger.info(
-            f"AI generating recommendation candidates - processing facility: {facility}"
+def search_depth(model, per_k: int) -> tuple:
+    """(knee prefix length, number of neighbours to retrieve per facility)"""
+    prefix = KNEE_PREFIX if KNEE_PREFIX > 0 else len(model.catalog)
+    return prefix, max(prefix, per_k)
+
+
+def search_neighbours(
+    model,
+    pairs: list,
+    user_latents: np.ndarray,
+    depth: int,
+    partition: str = None,
+    filters: list = None,
+) -> list:
+    """
+    Retrieve the `depth` nearest catalog rows for each (industry, facility) query.
+    partition: "global" scans the whole catalog (the industry filter is applied
+    after aggregation); "industry" / "industry_facility" only scan the matching
+    partition. Defaults to SEARCH_PARTITION. Queries without an industry are
+    always searched globally.
+    filters: optional per-query ConstraintFilter (None = unconstrained). Queries
+    sharing a filter are searched together and only the rows it keeps are scored.
+    """
+    if filters is None or all(f is None for f in filters):
+        return _search_scoped(model, pairs, user_latents, depth, partition)
+
+    groups = {}
+    for i, constraint in enumerate(filters):
+        groups.setdefault(constraint, []).append(i)
+    hits = [None] * len(pairs)
+    for constraint, members in groups.items():
+        group_hits = _search_scoped(
+            model,
+            [pairs[i] for i in members],
+            user_latents[members],
+            depth,
+            partition,
+            constraint,
         )
-        input_cat = pd.DataFrame([[industry, facility]], columns=categorical_cols)
-        user_cat = ohe.transform(input_cat)
-        logger.debug(f"One-hot encoding of categorical data shape: {user_cat.shape}")
+        for i, hit in zip(members, group_hits):
+            hits[i] = hit
+    return hits
+
+
+def _search_scoped(
+    model,
+    pairs: list,
+    user_latents: np.ndarray,
+    depth: int,
+    partition: str = None,
+    restrict=None,
+) -> list:
+    """
+    Search the base catalog and every ingested segment (ModelBundle.segments)
+    separately and merge the per-part top-`depth` lists. Segment row ids are
+    offset past the rows before them, so the merged hits index model.catalog.
+    """
+    partition = SEARCH_PARTITION if partition is None else partition
+    parts = (model,) + model.segments
+    indexes = [startup.partition_index_for(part, partition) for part in parts]
+    keys = None
+    if partition != "global":
+        keys = [
+            _resolve_partition(
+                indexes,
+                model.catalog.code_of("업종", industry),
+                model.catalog.code_of("대상설비", facility),
+            )
+            for industry, facility in pairs
+        ]
 
-        input_num = pd.DataFrame(
-            [[invest, reduction, roi_months, ghg_reduction]], columns=numeric_cols
+    part_hits = []
+    for part, index in zip(parts, indexes):
+        part_restrict = restrict
+        if restrict is not None and part is not model:
+            part_restrict = functools.partial(restrict, index=part.constraint_index)
+        hits = _search_part(
+            part, index, pairs, user_latents, depth, keys, part_restrict
         )
-        user_num = scaler.transform(input_num)
-        logger.debug(f"Scaled numerical data shape: {user_num.shape}")
+        if part is not model:
+            hits = [(row_ids + part.offset, sims) for row_ids, sims in hits]
+        part_hits.append(hits)
+    if len(part_hits) == 1:
+        return part_hits[0]
+    return [merge_top_k(hits, depth) for hits in zip(*part_hits)]
 
-        user_vec = np.hstack([user_cat, user_num]).astype("float32")
-        logger.debug(f"Combined user vector shape: {user_vec.shape}")
 
-        user_latent = encoder.predict(user_vec)
-        logger.debug(f"User latent vector shape: {user_latent.shape}")
+def _resolve_partition(indexes: list, industry_code: int, facility_code: int):
+    """
+    The partition key to search in every part: the most specific key any part
+    resolves to, so an (industry, facility) partition that only exists in an
+    ingested segment is searched the same way as after compaction.
+    """
+    resolved = [index.resolve(industry_code, facility_code) for index in indexes]
+    return max(resolved, key=lambda key: -1 if key is None else int(key[1] is not None))
 
-        cos_sim = cosine_similarity(user_latent, latent_vectors)[0]
-        logger.debug(f"Sample similarities (top 5): {np.sort(cos_sim)[-5:][::-1]}")
 
-        sims_sorted = np.sort(cos_sim)[::-1]
-        ranks = np.arange(1, len(cos_sim) + 1)
-        kneedle = KneeLocator(
-            ranks, sims_sorted, curve="convex", direction="decreasing"
+def _search_part(part, index, pairs: list, user_latents, depth: int, keys, restrict):
+    """Search one part (the bundle or a SegmentBundle); index is its partition index (None = global)."""
+    if index is None:
+        return part.latent_index.top_k_batch(
+            user_latents, depth, SIMILARITY_BLOCK_BYTES, restrict
         )
-        k = kneedle.knee or per_k
-        logger.info(
-            f"[recommend_improvements] facility={facility}, determined elbow_k={k} (AI inference)"
+
+    hits = index.top_k_batch(
+        user_latents, keys, depth, SIMILARITY_BLOCK_BYTES, restrict
+    )
+
+    unscoped = [i for i, (industry, _) in enumerate(pairs) if not industry]
+    if unscoped:
+        global_hits = part.latent_index.top_k_batch(
+            user_latents[unscoped], depth, SIMILARITY_BLOCK_BYTES, restrict
         )
+        for i, hit in zip(unscoped, global_hits):
+            hits[i] = hit
+    return hits
 
-        idxs = np.argsort(cos_sim)[-k:][::-1]
-        logger.info(f"Number of candidates for facility: {len(idxs)}")
-        cand = df.iloc[idxs].copy()
-        cand["similarity"] = cos_sim[idxs]
-        cand["facility"] = facility
-        all_cands.append(cand)
-
-    combined = pd.concat(all_cands, ignore_index=True)
-    logger.info(f"After combining all candidates, shape: {combined.shape}")
-
-    noise = combined[combined["cluster"] == -1]
-    valid = combined[combined["cluster"] != -1]
-
-    if not valid.empty:
-        agg_funcs = {
-            "similarity": "mean",
-            "투자비": "mean",
-            "절감액": "mean",
-            "투자비회수기간": "mean",
-            "온실가스감축량": "mean",
-        }
-        first_funcs = {
-            "개선활동명_요약": "first",
-            "업종": "first",
-            "대상설비": "first",
-            "개선구분": "first",
-            "facility": "first",
-            "cluster": "first",
-        }
-        aggregated = valid.groupby("cluster", as_index=False).agg(
-            {**agg_funcs, **first_funcs}
+
+def facility_candidates(
+    facility: str, row_ids: np.ndarray, sims_sorted: np.ndarray, per_k: int, prefix: int
+) -> tuple:
+    """
+    Cut the retrieved neighbours of one facility at the elbow point
+    (fall back to per_k) and return them as (row_ids, similarities).
+    """
+    logger.debug("Sample similarities (top 5): %s", sims_sorted[:5])
+
+    # Elbow detection only needs the head of the curve: use the top-M prefix
+    k = find_knee(sims_sorted[:prefix]) or per_k
+    idxs = row_ids[:k]
+    logger.debug(
+        "[recommend_improvements] facility=%s, determined elbow_k=%d, candidates=%d",
+        facility,
+        k,
+        len(idxs),
+    )
+    return idxs, sims_sorted[:k]
+
+
+def aggregate_candidates(
+    model, all_cands: list, facilities: list, industry: str
+) -> pd.DataFrame:
+    """
+    Aggregate the (row_ids, similarities) candidates of all facilities by cluster
+    (noise rows are kept as is), sort by similarity and apply the industry filter.
+    Runs on the columnar catalog with array gathers and per-cluster reductions.
+    """
+    if all_cands:
+        rows = np.concatenate([c[0] for c in all_cands])
+        sims = np.concatenate([c[1] for c in all_cands])
+    else:
+        rows = np.empty(0, dtype=np.intp)
+        sims = np.empty(0, dtype=np.float32)
+    facility_codes = np.repeat(
+        np.arange(len(all_cands)), [len(c[0]) for c in all_cands]
+    )
+    logger.debug("After combining all candidates, count: %d", len(rows))
+
+    combined = model.catalog.aggregate(rows, sims, facility_codes, facilities, industry)
+    logger.debug("After applying industry filter, candidates shape: %s", combined.shape)
+    return combined
+
+
+def recommend_improvements(
+    input_data: dict, per_k: int = 10, partition: str = None, model=None
+):
+    """
+    1) AutoEncoder + cosine similarity to generate candidate recommendations
+       (within the industry partition unless partition="global")
+       Determine Top-K using the elbow point; if not detected, fall back to per_k
+       2) Aggregate by cluster to remove duplicates and average metrics
+    model: ModelBundle to use (defaults to the active registry version)
+    With budget/ROI constraints enabled (see app/services/constraints.py) rows
+    over the limits are dropped before the similarity scan, and the constraint
+    report is attached to the returned frame as `attrs["constraints"]`.
+    """
+    model = model or model_registry.current()
+    industry, facilities, numeric = parse_input(input_data)
+    constraint = constraint_filter(model, input_data, numeric)
+    logger.info(
+        "recommend_improvements called - industry: %s, facilities: %d, per_k: %d",
+        industry,
+        len(facilities),
+        per_k,
+    )
+    log_payload(logger, "recommend_improvements input_data", input_data)
+
+    all_cands = []
+
+    # — Vectorize all facilities and encode them in one batched forward pass —
+    if facilities:
+        pairs = [(industry, f) for f in facilities]
+        with stage("vectorize"):
+            user_vecs = build_user_vectors(model, pairs, numeric)
+        logger.debug("Combined user vectors shape: %s", user_vecs.shape)
+        with stage("encode"):
+            user_latents = encode(model, user_vecs)
+        logger.debug("User latent vectors shape: %s", user_latents.shape)
+
+        prefix, depth = search_depth(model, per_k)
+        with stage("similarity"):
+            hits = search_neighbours(
+                model, pairs, user_latents, depth, partition, [constraint] * len(pairs)
+            )
+        if constraint is not None:
+            count("constraints", constraint.remaining)
+        count("similarity", sum(len(row_ids) for row_ids, _ in hits))
+        with stage("knee"):
+            for facility, (row_ids, sims_sorted) in zip(facilities, hits):
+                all_cands.append(
+                    facility_candidates(facility, row_ids, sims_sorted, per_k, prefix)
+                )
+        count("knee", sum(len(c[0]) for c in all_cands))
+
+    with stage("aggregation"):
+        combined = aggregate_candidates(model, all_cands, facilities, industry)
+    count("aggregation", len(combined))
+    if constraint is not None:
+        combined.attrs["constraints"] = log_constraints(constraint)
+    return combined
+
+
+def recommend_improvements_batch(
+    inputs: list, per_k: int = 10, partition: str = None, model=None
+) -> list:
+    """
+    Batched recommend_improvements: all requests x facilities are vectorized into
+    one matrix, encoded in a single forward pass and scored against the catalog
+    with one (chunked) similarity matrix, then split back per request.
+    Returns one candidate frame per request (None for requests without facilities).
+    """
+    logger.info(
+        "recommend_improvements_batch called - %d requests, per_k: %d",
+        len(inputs),
+        per_k,
+    )
+    model = model or model_registry.current()
+    parsed = [parse_input(input_data) for input_data in inputs]
+    constraints = [
+        constraint_filter(model, input_data, numeric)
+        for input_data, (_, _, numeric) in zip(inputs, parsed)
+    ]
+
+    pairs, numeric_rows, owners = [], [], []
+    for i, (industry, facilities, numeric) in enumerate(parsed):
+        for facility in facilities:
+            pairs.append((industry, facility))
+            numeric_rows.append(numeric)
+            owners.append(i)
+    if not pairs:
+        return [None] * len(inputs)
+
+    with stage("vectorize"):
+        user_vecs = build_user_vectors(model, pairs, numeric_rows)
+    with stage("encode"):
+        user_latents = encode(model, user_vecs)
+    prefix, depth = search_depth(model, per_k)
+    with stage("similarity"):
+        hits = search_neighbours(
+            model,
+            pairs,
+            user_latents,
+            depth,
+            partition,
+            [constraints[owner] for owner in owners],
         )
-        logger.info(f"Cluster aggregation result shape: {aggregated.shape}")
-        combined = pd.concat([aggregated, noise], ignore_index=True)
+    active = [c for c in constraints if c is not None]
+    if active:
+        count("constraints", sum(c.remaining for c in active))
+    count("similarity", sum(len(row_ids) for row_ids, _ in hits))
+
+    all_cands = [[] for _ in inputs]
+    with stage("knee"):
+        for (industry, facility), owner, (row_ids, sims_sorted) in zip(
+            pairs, owners, hits
+        ):
+            all_cands[owner].append(
+                facility_candidates(facility, row_ids, sims_sorted, per_k, prefix)
+            )
+    count("knee", sum(len(c[0]) for cands in all_cands for c in cands))
+
+    with stage("aggregation"):
+        results = [
+            aggregate_candidates(model, cands, facilities, industry) if cands else None
+            for cands, (industry, facilities, _) in zip(all_cands, parsed)
+        ]
+    count("aggregation", sum(len(df) for df in results if df is not None))
+    for df, constraint in zip(results, constraints):
+        if df is not None and constraint is not None:
+            df.attrs["constraints"] = log_constraints(constraint)
+    return results
 
-    combined = combined.sort_values("similarity", ascending=False)
-    if industry:
-        combined = combined[combined["업종"] == industry]
-    logger.info(f"After applying industry filter, candidates shape: {combined.shape}")
 
-    return combined.reset_index(drop=True)
+def log_constraints(constraint) -> dict:
+    """Log how many rows each budget/ROI constraint pruned and return the report."""
+    report = constraint.report()
+    logger.info(
+        "Constraints (%s) pruned candidates: scanned=%d, removed=%s, remaining=%d",
+        report["mode"],
+        report["scanned"],
+        report["removed"],
+        report["remaining"],
+    )
+    return report
 
 
 def recommend_by_focus(cand_df: pd.DataFrame, focus: str, k: int):
@@ -126,115 +442,170 @@ def recommend_by_focus(cand_df: pd.DataFrame, focus: str, k: int):
     focus: "similarity" (sort by similarity) | "balanced" (sort by composite score) |
            "roi" | "saving" | "ghg"
     """
-    if focus == "similarity":
-        sorted_df = cand_df.sort_values("similarity", ascending=False)
-    elif focus == "balanced":
-        dfc = cand_df.copy()
-        feats = ["투자비", "절감액", "투자비회수기간", "온실가스감축량"]
-
-        means = {f: dfc[f].mean() for f in feats}
-        logger.debug(f"Mean values for metrics: {means}")
-
-        norm_means = {}
-        for f, m in means.items():
-            col = dfc[f]
-            mn, mx = col.min(), col.max()
-            if mx > mn:
-                norm = (m - mn) / (mx - mn)
-            else:
-                norm = 0
-            if f in ["투자비", "투자비회수기간"]:
-                norm = 1 - norm
-            norm_means[f] = norm
-        total = sum(norm_means.values())
-        weights = {
-            f: (norm_means[f] / total if total > 0 else 1 / len(feats)) for f in feats
-        }
-        logger.debug(f"Computed weights: {weights}")
-
-        for f in feats:
-            mn, mx = dfc[f].min(), dfc[f].max()
-            if mx > mn:
-                norm_col = (dfc[f] - mn) / (mx - mn)
-            else:
-                norm_col = 0
-            if f in ["투자비", "투자비회수기간"]:
-                dfc[f + "_norm"] = 1 - norm_col
-            else:
-                dfc[f + "_norm"] = norm_col
-
-        dfc["balanced_score"] = sum(dfc[f + "_norm"] * w for f, w in weights.items())
-        sorted_df = dfc.sort_values("balanced_score", ascending=False)
-    elif focus == "roi":
-        sorted_df = cand_df.assign(roi=lambda d: d["절감액"] / d["투자비"]).sort_values(
-            "roi", ascending=False
-        )
-    elif focus == "saving":
-        sorted_df = cand_df.sort_values("절감액", ascending=False)
-    elif focus == "ghg":
-        sorted_df = cand_df.sort_values("온실가스감축량", ascending=False)
-    else:
-        logger.error(f"Unknown focus: {focus} (AI cannot proceed)")
+    if focus not in FOCUSES:
+        logger.error("Unknown focus: %s", focus)
         raise ValueError(f"Unknown focus: {focus}")
+    with stage("ranking"):
+        ranked = rank_candidates(cand_df, [focus], k)[focus]
+    count("ranking", len(ranked))
+    return ranked
+
+
+TYPE_MAPPING = {
+    "balanced": "total_optimization",
+    "ghg": "emission_reduction",
+    "saving": "cost_saving",
+    "roi": "roi",
+}
+
+
+SOLUTION_FOCUSES = ["balanced", "ghg", "saving", "roi"]
+
+# Ranking columns read into each `solution` item, in the order of the item
+# fields industry .. investmentCost (see RecommendItem in endpoints/recommend.py).
+SOLUTION_COLUMNS = (
+    "업종",
+    "개선구분",
+    "대상설비",
+    "개선활동명_요약",
+    "온실가스감축량",
+    "절감액",
+    "투자비회수기간",
+    "투자비",
+)
 
-    cols = ["cluster", "개선활동명_요약", "업종", "대상설비", "개선구분"]
-    if focus == "balanced":
-        cols += ["balanced_score"]
-    cols += ["similarity", "투자비", "절감액", "투자비회수기간", "온실가스감축량"]
-    result = sorted_df[cols].head(k).copy()
-
-    round_cols = [
-        c
-        for c in [
-            "투자비",
-            "절감액",
-            "투자비회수기간",
-            "온실가스감축량",
-        ]
-        if c in result.columns
-    ]
-    result[round_cols] = result[round_cols].round(1)
 
-    if "balanced_score" in result.columns:
-        result["balanced_score"] = result["balanced_score"].round(3)
-    return result.to_dict(orient="records")
+def solution_focuses(types=None) -> list:
+    """Map requested API `type` names to focuses (None means all four, in the default order)."""
+    if not types:
+        return SOLUTION_FOCUSES
+    requested = set(types)
+    unknown = requested - set(TYPE_MAPPING.values())
+    if unknown:
+        raise ValueError(f"Unknown solution type: {sorted(unknown)}")
+    return [f for f in SOLUTION_FOCUSES if TYPE_MAPPING[f] in requested]
 
 
-def recommend_all(input_data: dict, per_k: int):
-    logger.info(
-        f"recommend_all called - input_data: {input_data}, per_k: {per_k} (AI-driven summary)"
-    )
-    df_cand = recommend_improvements(input_data, per_k)
+def build_solution(df_cand: pd.DataFrame, per_k: int, focuses=None) -> list:
+    """
+    Rank the candidates for the requested focuses (default: all four) in a
+    single pass and map the ranked columns straight to the API `solution`
+    items, without building the intermediate Korean-keyed records.
+    """
     solution = []
-
-    type_mapping = {
-        "balanced": "total_optimization",
-        "ghg": "emission_reduction",
-        "saving": "cost_saving",
-        "roi": "roi",
-    }
-
-    for focus in ["balanced", "ghg", "saving", "roi"]:
-        recs = recommend_by_focus(df_cand, focus, per_k)
-
-        for idx, item in enumerate(recs, start=1):
-            solution_item = {
-                "id": None,
-                "type": type_mapping[focus],
-                "rank": idx,
-                "industry": item.get("업종"),
-                "improvementType": item.get("개선구분"),
-                "facility": item.get("대상설비"),
-                "activity": item.get("개선활동명_요약"),
-                "emissionReduction": item.get("온실가스감축량"),
-                "costSaving": item.get("절감액"),
-                "roiPeriod": item.get("투자비회수기간"),
-                "investmentCost": item.get("투자비"),
-                "bookmark": None,
-            }
-            solution.append(solution_item)
+    focuses = SOLUTION_FOCUSES if focuses is None else focuses
+    with stage("ranking"):
+        ranked = rank_columns(df_cand, focuses, per_k, columns=SOLUTION_COLUMNS)
+
+    with stage("serialization"):
+        for focus in focuses:
+            solution_type = TYPE_MAPPING[focus]
+            columns = ranked[focus]
+            rows = zip(*(columns[c] for c in SOLUTION_COLUMNS))
+
+            for idx, row in enumerate(rows, start=1):
+                (
+                    industry,
+                    improvement_type,
+                    facility,
+                    activity,
+                    emission_reduction,
+                    cost_saving,
+                    roi_period,
+                    investment_cost,
+                ) = row
+                solution.append(
+                    {
+                        "id": None,
+                        "type": solution_type,
+                        "rank": idx,
+                        "industry": industry,
+                        "improvementType": improvement_type,
+                        "facility": facility,
+                        "activity": activity,
+                        "emissionReduction": emission_reduction,
+                        "costSaving": cost_saving,
+                        "roiPeriod": roi_period,
+                        "investmentCost": investment_cost,
+                        "bookmark": None,
+                    }
+                )
+    count("ranking", len(solution))
+
+    return solution
+
+
+def recommend_all(input_data: dict, per_k: int, model=None):
+    logger.debug("recommend_all called - per_k: %d", per_k)
+    focuses = solution_focuses(input_data.get("focuses"))
+    df_cand = recommend_improvements(input_data, per_k, model=model)
+    solution = build_solution(df_cand, per_k, focuses)
 
     logger.info(
-        f"recommend_all returning total number of solution items: {len(solution)}"
+        "recommend_all returning total number of solution items: %d", len(solution)
     )
-    return {"solution": solution}
+    return solution_result(solution, df_cand)
+
+
+def solution_result(solution: list, df_cand) -> dict:
+    """API result body; includes the constraint report when constraints were applied."""
+    result = {"solution": solution}
+    if df_cand is not None and "constraints" in df_cand.attrs:
+        result["constraints"] = df_cand.attrs["constraints"]
+    return result
+
+
+def recommend_all_batch(inputs: list, per_k: int, model=None) -> list:
+    """
+    Batched recommend_all: one encoder pass and one similarity matrix for all
+    requests. Returns a list of {"solution": [...]} in the same order as inputs;
+    requests without target facilities get an empty solution.
+    """
+    focuses = [solution_focuses(d.get("focuses")) for d in inputs]
+    results = []
+    candidates = recommend_improvements_batch(inputs, per_k, model=model)
+    for df_cand, fs in zip(candidates, focuses):
+        solution = [] if df_cand is None else build_solution(df_cand, per_k, fs)
+        results.append(solution_result(solution, df_cand))
+
+    logger.info("recommend_all_batch returning %d results", len(results))
+    return results
+
+
+def compare_search_partitions(
+    inputs: list, per_k: int = 4, partition: str = "industry"
+):
+    """
+    Compare candidate quality of the global-then-filter search against a
+    partitioned search on the same requests. For each mode it reports the mean
+    number of candidates that survive the industry filter, how many requests end
+    up with fewer than per_k candidates, and the mean similarity of the top per_k;
+    `overlap_at_k` is the mean share of top-per_k clusters both modes agree on.
+    """
+    model = model_registry.current()
+    modes = ("global", partition)
+    stats = {m: {"candidates": [], "short": 0, "top_similarity": []} for m in modes}
+    overlaps = []
+    for input_data in inputs:
+        tops = {}
+        for mode in modes:
+            cand = recommend_improvements(input_data, per_k, mode, model)
+            top = cand.head(per_k)
+            stats[mode]["candidates"].append(len(cand))
+            stats[mode]["short"] += int(len(cand) < per_k)
+            if len(top):
+                stats[mode]["top_similarity"].append(float(top["similarity"].mean()))
+            tops[mode] = set(top["cluster"].tolist())
+        union = tops["global"] | tops[partition]
+        if union:
+            overlaps.append(len(tops["global"] & tops[partition]) / len(union))
+
+    report = {"requests": len(inputs), "per_k": per_k}
+    for mode in modes:
+        report[mode] = {
+            "mean_candidates": float(np.mean(stats[mode]["candidates"] or [0])),
+            "short_requests": stats[mode]["short"],
+            "mean_top_similarity": float(np.mean(stats[mode]["top_similarity"] or [0])),
+        }
+    report["overlap_at_k"] = float(np.mean(overlaps or [0]))
+    return report
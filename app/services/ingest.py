@@ -0,0 +1,248 @@
+# app/services/ingest.py
+"""
+개선활동 카탈로그 증분 수집.
+새 행을 활성 번들의 인코더/OHE/Scaler로 인코딩하고, 가장 가까운 기존 클러스터(또는 노이즈 -1)를 배정해
+INGEST_DIR에 append-only 세그먼트로 저장한 뒤, 세그먼트 검색 리소스를 붙인 새 번들로 원자적으로 교체합니다.
+기본 아티팩트(메모리 매핑/공유 메모리 latent 벡터 포함)와 그 인덱스는 수집 중에 다시 만들거나 복사하지 않으며,
+compact()만 세그먼트를 기본 아티팩트(latent_vectors.npy, 카탈로그 parquet)에 합쳐 다시 씁니다.
+
+    python -m app.services.ingest new_activities.csv    # 실행 중인 서버는 MODEL_RELOAD_INTERVAL 또는 POST /model/reload로 반영
+    python -m app.services.ingest --compact
+"""
+
+import dataclasses
+import logging
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from ..setting import startup
+from ..setting.config import (
+    ARTIFACT_BUNDLE,
+    CLUSTERING_DIR,
+    INGEST_DIR,
+    SHARED_MODEL,
+    VEC_DIR,
+)
+from . import segments
+from .catalog import NUMERIC_COLUMNS, STRING_COLUMNS
+from .inference import build_user_vectors, encode
+from .registry import RegistryBusyError, model_registry, version_of
+from .similarity import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+# 카탈로그별 ClusterAssigner (카탈로그가 교체되면 함께 사라집니다)
+_assigners = weakref.WeakKeyDictionary()
+
+
+class ClusterAssigner:
+    """
+    기존 클러스터의 latent centroid(정규화 벡터 합의 방향)와 반경(멤버-centroid 최소 코사인 유사도).
+    새 행은 가장 가까운 centroid의 클러스터에 배정하되, 그 클러스터의 반경 밖이면 노이즈(-1)로 둡니다.
+    """
+
+    def __init__(self, labels: np.ndarray, sums: np.ndarray, radius: np.ndarray):
+        self.labels = labels
+        self.sums = sums
+        self.radius = radius
+        self.centroids = normalize_rows(sums)
+
+    @classmethod
+    def build(cls, store, catalog, chunk_size: int = 65536):
+        # cluster_rows는 클러스터 코드 순으로 정렬되어 있으므로 청크 안의 같은 클러스터는
+        # 연속 구간입니다 — 구간별 reduceat 결과를 클러스터에 합칩니다.
+        labels = catalog.cluster_labels
+        rows = catalog.cluster_rows
+        codes = catalog.cluster_code[rows]
+        chunks = []
+        for start in range(0, rows.size, chunk_size):
+            chunk_codes = codes[start : start + chunk_size]
+            starts = np.flatnonzero(np.r_[True, chunk_codes[1:] != chunk_codes[:-1]])
+            chunks.append((slice(start, start + chunk_size), chunk_codes, starts))
+
+        sums = np.zeros((labels.size, store.dim), dtype=np.float64)
+        for sel, chunk_codes, starts in chunks:
+            block = store.gather(rows[sel]).astype(np.float64)
+            sums[chunk_codes[starts]] += np.add.reduceat(block, starts, axis=0)
+        centroids = normalize_rows(sums)
+
+        radius = np.full(labels.size, np.inf, dtype=np.float32)
+        for sel, chunk_codes, starts in chunks:
+            sims = np.einsum(
+                "ij,ij->i", store.gather(rows[sel]), centroids[chunk_codes]
+            )
+            group = chunk_codes[starts]
+            radius[group] = np.minimum(radius[group], np.minimum.reduceat(sims, starts))
+        return cls(labels, sums, radius)
+
+    def assign(self, latents: np.ndarray) -> np.ndarray:
+        """latents(정규화 전) 행별 클러스터 라벨 (반경 밖이면 -1)"""
+        if self.labels.size == 0:
+            return np.full(len(latents), -1, dtype=np.int64)
+        sims = normalize_rows(latents) @ self.centroids.T
+        best = sims.argmax(axis=1)
+        best_sims = sims[np.arange(len(best)), best]
+        return np.where(best_sims >= self.radius[best], self.labels[best], -1)
+
+    def extend(self, latents: np.ndarray, clusters: np.ndarray):
+        """배정된 새 행을 centroid에 반영한 ClusterAssigner (반경은 그대로)"""
+        member = clusters != -1
+        sums = self.sums.copy()
+        codes = np.searchsorted(self.labels, clusters[member])
+        np.add.at(sums, codes, normalize_rows(latents[member]))
+        return type(self)(self.labels, sums, self.radius)
+
+
+def cluster_assigner(model) -> ClusterAssigner:
+    """기본 카탈로그로 만든 ClusterAssigner에 수집 세그먼트의 배정 결과를 반영한 것 (카탈로그별로 한 번)"""
+    assigner = _assigners.get(model.catalog)
+    if assigner is None:
+        assigner = ClusterAssigner.build(model.latent_store, model.catalog.base)
+        for segment in model.segments:
+            assigner = assigner.extend(
+                segment.latent_store.vectors, segment.catalog.cluster
+            )
+        _assigners[model.catalog] = assigner
+    return assigner
+
+
+def encode_rows(model, frame: pd.DataFrame) -> np.ndarray:
+    """카탈로그 행을 번들의 OHE/Scaler와 인코더로 latent 벡터(정규화 전)로 만듭니다."""
+    pairs = list(zip(*(frame[c].tolist() for c in model.categorical_cols)))
+    numeric = frame[model.numeric_cols].to_numpy(dtype=np.float64)
+    return encode(model, build_user_vectors(model, pairs, numeric))
+
+
+def ingest(frame: pd.DataFrame) -> dict:
+    """
+    frame(STRING_COLUMNS, NUMERIC_COLUMNS 컬럼)을 인코딩/클러스터 배정해 세그먼트로 저장하고,
+    그 세그먼트의 검색 리소스(SegmentBundle)를 붙인 새 번들로 교체합니다. 기본 latent 저장소와 인덱스는
+    그대로 공유하므로 비용은 수집한 행 수에 비례합니다. 진행 중인 요청은 이전 번들로 끝나고,
+    교체 직후의 요청부터 새 행이 검색됩니다.
+    다른 reload/ingest/compaction이 진행 중이면 RegistryBusyError.
+    공유 메모리 모드에서는 한 워커의 번들만 바뀌므로 지원하지 않습니다 (ValueError).
+    """
+    if SHARED_MODEL:
+        raise ValueError(
+            "공유 메모리 모드(SHARED_MODEL)에서는 증분 수집을 지원하지 않습니다. "
+            "CLI로 세그먼트를 추가한 뒤 gunicorn에 HUP을 보내 다시 게시해주세요."
+        )
+    missing = [c for c in STRING_COLUMNS + NUMERIC_COLUMNS if c not in frame]
+    if missing:
+        raise ValueError(f"필수 컬럼이 없습니다: {missing}")
+    frame = frame[STRING_COLUMNS + NUMERIC_COLUMNS].reset_index(drop=True)
+    result = {}
+
+    def build(current):
+        started = time.perf_counter()
+        latents = encode_rows(current, frame)
+        assigner = cluster_assigner(current)
+        clusters = assigner.assign(latents)
+        rows = frame.assign(cluster=clusters)
+
+        name = segments.write_segment(INGEST_DIR, rows, latents)
+        catalog = current.catalog.append(rows)
+        segment = startup.build_segment(
+            name, len(current.catalog), catalog.parts[-1], latents
+        )
+        _assigners[catalog] = assigner.extend(latents, clusters)
+
+        fingerprint = current.fingerprint + startup.artifact_fingerprint(
+            segments.segment_paths(INGEST_DIR, name)
+        )
+        result.update(
+            segment=name,
+            rows=len(rows),
+            assigned=int((clusters != -1).sum()),
+            noise=int((clusters == -1).sum()),
+        )
+        return dataclasses.replace(
+            current,
+            version=version_of(fingerprint),
+            fingerprint=fingerprint,
+            catalog=catalog,
+            segments=current.segments + (segment,),
+            loaded_at=time.time(),
+            load_seconds=round(time.perf_counter() - started, 3),
+        )
+
+    bundle = model_registry.update(build)
+    result.update(version=bundle.version, catalog_size=len(bundle.catalog))
+    logger.info(
+        "Ingested %d rows into %s (assigned=%d, noise=%d, version=%s, %.3fs)",
+        result["rows"],
+        result["segment"],
+        result["assigned"],
+        result["noise"],
+        bundle.version,
+        bundle.load_seconds,
+    )
+    return result
+
+
+def compact(min_segments: int = 1) -> dict:
+    """
+    세그먼트가 min_segments개 이상이면 기본 아티팩트에 합치고, 합친 파일에서 새 번들을 만들어 교체합니다.
+    ARTIFACT_BUNDLE 사용 중에는 번들 파일을 다시 만들어야 하므로 지원하지 않습니다 (ValueError).
+    공유 메모리 모드에서는 CLI로 compaction한 뒤 마스터가 다시 게시합니다 (ValueError).
+    """
+    if ARTIFACT_BUNDLE:
+        raise ValueError("ARTIFACT_BUNDLE 사용 중에는 compaction을 지원하지 않습니다. 번들을 다시 만들어주세요.")
+    if SHARED_MODEL:
+        raise ValueError(
+            "공유 메모리 모드(SHARED_MODEL)에서는 서버에서 compaction을 지원하지 않습니다. "
+            "CLI로 compaction한 뒤 gunicorn에 HUP을 보내 다시 게시해주세요."
+        )
+    pending = len(segments.segment_names(INGEST_DIR))
+    if pending == 0 or pending < min_segments:
+        return {"segments": 0, "pending": pending, "version": model_registry.version}
+    result = {}
+
+    def build(current):
+        with segments.compaction_lock(INGEST_DIR) as acquired:
+            if not acquired:
+                raise RegistryBusyError("compaction in progress in another process")
+            names = segments.compact(
+                INGEST_DIR,
+                f"{VEC_DIR}/latent_vectors.npy",
+                f"{CLUSTERING_DIR}/final_upscaled_with_clusters.parquet",
+            )
+        bundle = startup.build_model()
+        if current is not None and current.catalog in _assigners:
+            _assigners[bundle.catalog] = _assigners[current.catalog]
+        result.update(segments=len(names), pending=0)
+        return bundle
+
+    bundle = model_registry.update(build)
+    result["version"] = bundle.version
+    return result
+
+
+def read_rows(path: str) -> pd.DataFrame:
+    if path.endswith(".csv"):
+        return pd.read_csv(path)
+    return pd.read_parquet(path)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from ..setting.log import setup_logging
+
+    parser = argparse.ArgumentParser(description="개선활동 카탈로그 증분 수집")
+    parser.add_argument("path", nargs="?", help="새 개선활동 행 파일 (.csv 또는 .parquet)")
+    parser.add_argument("--compact", action="store_true", help="세그먼트를 기본 아티팩트에 합칩니다")
+    args = parser.parse_args()
+    if not args.path and not args.compact:
+        parser.error("path 또는 --compact가 필요합니다")
+
+    setup_logging(fmt="text")
+    startup.load_resources()
+    if args.path:
+        print(json.dumps(ingest(read_rows(args.path)), ensure_ascii=False))
+    if args.compact:
+        print(json.dumps(compact(), ensure_ascii=False))
@@ -0,0 +1,192 @@
+# app/services/latent_store.py
+
+import logging
+import os
+
+import numpy as np
+
+from .similarity import normalize_rows, select_top_k
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATIONS = ("none", "float16", "int8")
+
+
+class LatentStore:
+    """
+    정규화된 latent 벡터 저장소.
+    - vectors: 정규화된 float32 행렬 (메모리 배열 또는 np.memmap)
+    - quantization="float16" | "int8": 1차 유사도 계산용 양자화 사본을 메모리에 두고,
+      상위 후보(shortlist)만 float32 원본으로 정확히 다시 계산(re-rank)합니다.
+      int8은 행마다 scale(= max|v| / 127)을 따로 둡니다.
+    - quantization="none": float32 원본으로 바로 계산합니다 (기존과 동일한 결과).
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        quantization: str = "none",
+        rerank_factor: float = 2.0,
+        chunk_rows: int = 65536,
+    ):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown latent quantization: {quantization}")
+        self.vectors = vectors
+        self.size, self.dim = vectors.shape
+        self.mmap = isinstance(vectors, np.memmap)
+        self.quantization = quantization
+        self.rerank_factor = rerank_factor
+        self.chunk_rows = chunk_rows
+        self.approx = None
+        self.scales = None
+        if quantization == "float16":
+            self.approx = self._chunked(lambda v: v.astype(np.float16), np.float16)
+        elif quantization == "int8":
+            self.scales = np.empty(self.size, dtype=np.float32)
+            self.approx = np.empty((self.size, self.dim), dtype=np.int8)
+            for start in range(0, self.size, chunk_rows):
+                v = np.asarray(self.vectors[start : start + chunk_rows])
+                scale = np.abs(v).max(axis=1) / 127.0
+                scale[scale == 0.0] = 1.0
+                self.scales[start : start + len(v)] = scale
+                self.approx[start : start + len(v)] = np.rint(v / scale[:, np.newaxis])
+
+    def _chunked(self, fn, dtype):
+        out = np.empty((self.size, self.dim), dtype=dtype)
+        for start in range(0, self.size, self.chunk_rows):
+            out[start : start + self.chunk_rows] = fn(
+                np.asarray(self.vectors[start : start + self.chunk_rows])
+            )
+        return out
+
+    @classmethod
+    def open(
+        cls,
+        path: str,
+        mmap: bool = False,
+        cache_dir: str = None,
+        quantization: str = "none",
+        rerank_factor: float = 2.0,
+    ):
+        """
+        latent_vectors.npy를 읽어 정규화된 저장소를 만듭니다.
+        mmap=True이면 정규화된 float32 사본(`*.normalized.npy`)을 cache_dir에 한 번 만들어 두고
+        np.load(mmap_mode="r")로 열어, 여러 워커가 같은 페이지 캐시를 공유합니다.
+        사본을 쓸 수 없으면 메모리에 정규화합니다.
+        """
+        if mmap:
+            try:
+                normalized = cls._normalized_copy(path, cache_dir)
+                vectors = np.load(normalized, mmap_mode="r")
+                return cls(vectors, quantization, rerank_factor)
+            except OSError as e:
+                logger.warning("Memory-mapped latent store unavailable: %s", e)
+        vectors = normalize_rows(np.load(path))
+        return cls(vectors, quantization, rerank_factor)
+
+    @staticmethod
+    def _normalized_copy(path: str, cache_dir: str = None) -> str:
+        """원본보다 오래되지 않은 정규화 사본이 있으면 그 경로를, 없으면 새로 만들어 반환합니다."""
+        stem = os.path.splitext(os.path.basename(path))[0]
+        target = os.path.join(
+            cache_dir or os.path.dirname(path), f"{stem}.normalized.npy"
+        )
+        if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(
+            path
+        ):
+            return target
+        source = np.load(path, mmap_mode="r")
+        tmp = f"{target}.{os.getpid()}.tmp"
+        out = np.lib.format.open_memmap(
+            tmp, mode="w+", dtype=np.float32, shape=source.shape
+        )
+        for start in range(0, source.shape[0], 65536):
+            out[start : start + 65536] = normalize_rows(source[start : start + 65536])
+        out.flush()
+        del out
+        os.replace(tmp, target)
+        logger.info("Normalized latent vectors written to %s", target)
+        return target
+
+    @property
+    def quantized(self) -> bool:
+        return self.approx is not None
+
+    def gather(self, rows: np.ndarray) -> np.ndarray:
+        """rows 순서의 정규화된 float32 벡터 (mmap이면 해당 행만 읽습니다)"""
+        return np.asarray(self.vectors[rows])
+
+    def scores(self, queries: np.ndarray, rows: np.ndarray = None) -> np.ndarray:
+        """
+        (정규화된) queries와 rows(기본: 전체) 사이의 1차 유사도 행렬.
+        양자화 저장소에서는 근사값이며, chunk_rows 단위로 float32로 풀어 계산합니다.
+        """
+        if not self.quantized:
+            block = self.vectors if rows is None else self.gather(rows)
+            return queries @ np.asarray(block).T
+
+        n = self.size if rows is None else len(rows)
+        out = np.empty((len(queries), n), dtype=np.float32)
+        for start in range(0, n, self.chunk_rows):
+            sel = slice(start, start + self.chunk_rows)
+            idx = sel if rows is None else rows[sel]
+            block = self.approx[idx].astype(np.float32)
+            out[:, sel] = queries @ block.T
+            if self.scales is not None:
+                out[:, sel] *= self.scales[idx]
+        return out
+
+    def select(self, query: np.ndarray, sims: np.ndarray, k: int, rows=None):
+        """
+        1차 유사도 sims에서 상위 k개를 골라 (positions, exact sims)를 내림차순으로 반환합니다.
+        positions는 rows(기본: 전체) 안에서의 위치입니다.
+        양자화 저장소에서는 상위 k * rerank_factor개를 float32로 다시 계산한 뒤 고릅니다.
+        """
+        if not self.quantized:
+            top = select_top_k(sims, k)
+            return top, sims[top]
+
+        n = sims.shape[0]
+        depth = min(n, max(int(k), int(np.ceil(k * self.rerank_factor))))
+        # 원래 위치 순으로 정렬해 두면 동점 처리가 exact 경로와 같아집니다.
+        shortlist = np.sort(select_top_k(sims, depth))
+        row_ids = shortlist if rows is None else rows[shortlist]
+        exact = self.gather(row_ids) @ query
+        top = select_top_k(exact, k)
+        return shortlist[top], exact[top]
+
+    def memory_report(self) -> dict:
+        """float32 전체를 메모리에 올리는 경우 대비 프로세스 전용 메모리 사용량"""
+        float32_bytes = self.size * self.dim * 4
+        resident = 0 if self.mmap else float32_bytes
+        if self.quantized:
+            resident += self.approx.nbytes
+            resident += 0 if self.scales is None else self.scales.nbytes
+        return {
+            "rows": self.size,
+            "dim": self.dim,
+            "mmap": self.mmap,
+            "quantization": self.quantization,
+            "float32_bytes": float32_bytes,
+            "resident_bytes": resident,
+            "saved_bytes": float32_bytes - resident,
+        }
+
+
+def measure_recall(store: LatentStore, k: int = 10, n_queries: int = 64, seed: int = 0):
+    """
+    카탈로그 벡터에 잡음을 더한 query로 저장소 경로와 float32 전체 스캔의 top-k를 비교해
+    평균 recall@k를 반환합니다 (양자화하지 않은 저장소는 1.0).
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(store.size, size=min(n_queries, store.size), replace=False)
+    base = store.gather(np.sort(rows))
+    queries = normalize_rows(base + rng.normal(scale=0.05, size=base.shape))
+
+    hits = 0
+    approx = store.scores(queries)
+    for query, sims in zip(queries, approx):
+        top, _ = store.select(query, sims, k)
+        exact = select_top_k(store.vectors @ query, k)
+        hits += np.intersect1d(top, exact).size
+    return hits / (len(queries) * min(k, store.size))
@@ -0,0 +1,365 @@
+# app/services/llm_client.py
+
+import asyncio
+import logging
+import random
+import time
+
+import httpx
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI
+
+from ..setting.config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    OPENAI_MODEL,
+    COMMENT_MAX_CONCURRENCY,
+    COMMENT_RATE_LIMIT,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE,
+    LLM_CONNECT_TIMEOUT,
+    LLM_READ_TIMEOUT,
+    LLM_DEADLINE,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BACKOFF,
+    LLM_RETRY_BACKOFF_MAX,
+    LLM_BREAKER_THRESHOLD,
+    LLM_BREAKER_RESET,
+)
+from .metrics import REGISTRY, CallbackMetric, Counter, Histogram
+from .rate_limit import AsyncLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class LLMUnavailableError(Exception):
+    """재시도를 모두 실패했거나, 제한 시간을 넘겼거나, 회로가 열려 LLM을 사용할 수 없을 때 발생합니다."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """회로 차단기가 열려 있어 호출하지 않고 바로 실패했을 때 발생합니다."""
+
+
+def is_retryable(error: Exception) -> bool:
+    """연결/시간 초과, 408/409/429, 5xx 응답만 재시도합니다 (그 외 4xx와 응답 파싱 오류는 재시도하지 않음)."""
+    if isinstance(error, (APIConnectionError, asyncio.TimeoutError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+def _retry_after(error: Exception):
+    """429/503 응답의 Retry-After 헤더 (초), 없으면 None"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold번이면 회로를 열고(open) reset_timeout초 동안 호출을 바로 실패시킵니다.
+    그 뒤 half-open 상태에서 시험 호출 하나만 허용해, 성공하면 닫고(closed) 실패하면 다시 엽니다.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.opens = 0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        if self.failure_threshold <= 0:
+            return True
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or (
+            self.failure_threshold > 0 and self.failures >= self.failure_threshold
+        ):
+            if self.opened_at is None or self._probing:
+                self.opens += 1
+            self.opened_at = time.monotonic()
+            self._probing = False
+            logger.warning(
+                "LLM circuit opened after %d consecutive failures (retry in %.0fs)",
+                self.failures,
+                self.reset_timeout,
+            )
+
+    def release_probe(self):
+        """시험 호출이 업스트림 상태와 무관한 이유(잘못된 요청 등)로 끝났을 때 다음 시험을 허용합니다."""
+        self._probing = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opens": self.opens,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout": self.reset_timeout,
+        }
+
+
+class LLMClient:
+    """
+    chat completions 호출 관리 계층.
+    - 연결 풀(max_connections/max_keepalive)과 연결/읽기 timeout을 가진 httpx 클라이언트
+    - 호출당 전체 제한 시간(deadline, 재시도와 대기 시간 포함)
+    - 재시도 가능한 오류에 대한 jitter 지수 백오프 재시도 (Retry-After 헤더가 있으면 우선)
+    - 회로 차단기: 업스트림이 불안정하면 호출하지 않고 LLMUnavailableError를 발생시킵니다.
+    - focus별 지연 시간 히스토그램과 결과별 카운터
+    시도마다 limiter(동시 실행 수/초당 호출 수 제한)를 거치며, 백오프 대기 중에는 슬롯을 잡지 않습니다.
+    """
+
+    def __init__(
+        self,
+        api_key: str = "",
+        base_url: str = None,
+        model: str = "gpt-4o-mini",
+        max_connections: int = 20,
+        max_keepalive: int = 10,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 20.0,
+        deadline: float = 30.0,
+        max_retries: int = 2,
+        backoff: float = 0.5,
+        backoff_max: float = 4.0,
+        breaker: CircuitBreaker = None,
+        limiter: AsyncLimiter = None,
+    ):
+        self.model = model
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.limiter = limiter or AsyncLimiter()
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        # SDK 자체 재시도는 끄고 이 계층에서 재시도합니다.
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,
+            timeout=self.timeout,
+            http_client=httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive,
+                ),
+            ),
+        )
+        self.latency = Histogram(
+            "llm_request_seconds",
+            "LLM 호출 지연 시간 (재시도 포함)",
+            labelnames=("focus", "mode", "outcome"),
+        )
+        self.calls = Counter(
+            "llm_requests_total", "LLM 호출 결과별 횟수", labelnames=("outcome",)
+        )
+        self.retries = Counter("llm_retries_total", "LLM 재시도 횟수")
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        # full jitter: 0 ~ min(backoff_max, backoff * 2^attempt)
+        return random.uniform(0.0, min(self.backoff_max, self.backoff * (2**attempt)))
+
+    async def _call(self, focus: str, mode: str, attempt_fn, started: float = None):
+        """
+        attempt_fn(timeout)을 재시도/회로 차단기/제한 시간 정책으로 실행합니다.
+        반환값: attempt_fn의 반환값
+        """
+        if not self.breaker.allow():
+            self.calls.inc(outcome="short_circuit")
+            raise CircuitOpenError("LLM circuit is open")
+
+        loop = asyncio.get_running_loop()
+        started = loop.time() if started is None else started
+        deadline = started + self.deadline
+        attempt = 0
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                try:
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    result = await asyncio.wait_for(attempt_fn(remaining), remaining)
+                    break
+                except Exception as e:
+                    retryable = is_retryable(e)
+                    wait = self._backoff(attempt, e) if retryable else 0.0
+                    if (
+                        retryable
+                        and attempt < self.max_retries
+                        and loop.time() + wait < deadline
+                    ):
+                        attempt += 1
+                        self.retries.inc()
+                        logger.warning(
+                            "LLM call failed (focus=%s, attempt=%d): %r; retrying in %.2fs",
+                            focus,
+                            attempt,
+                            e,
+                            wait,
+                        )
+                        await asyncio.sleep(wait)
+                        continue
+                    elapsed = loop.time() - started
+                    self.latency.observe(
+                        elapsed, focus=focus, mode=mode, outcome="error"
+                    )
+                    if retryable:
+                        self.breaker.record_failure()
+                        self.calls.inc(outcome="unavailable")
+                        raise LLMUnavailableError(
+                            f"LLM unavailable after {attempt + 1} attempt(s): {e!r}"
+                        ) from e
+                    self.calls.inc(outcome="error")
+                    raise
+        except BaseException:
+            # 취소되거나 업스트림과 무관한 오류로 끝난 시험 호출은 다음 시험을 허용합니다.
+            self.breaker.release_probe()
+            raise
+        self.breaker.record_success()
+        elapsed = loop.time() - started
+        self.latency.observe(elapsed, focus=focus, mode=mode, outcome="ok")
+        self.calls.inc(outcome="ok")
+        return result
+
+    async def complete(self, messages: list, focus: str = "", **params) -> str:
+        """응답 전체 텍스트를 반환합니다."""
+
+        async def attempt(timeout: float) -> str:
+            async with self.limiter:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    timeout=min(timeout, self.timeout.read),
+                    **params,
+                )
+            return response.choices[0].message.content.strip()
+
+        return await self._call(focus, "complete", attempt)
+
+    async def stream(self, messages: list, focus: str = "", **params):
+        """
+        응답 텍스트 조각을 생성되는 대로 내보내는 async generator.
+        첫 조각을 받기 전의 실패만 재시도하며, 이후의 실패는 그대로 전달합니다.
+        스트림 전체가 호출 시작부터 deadline 안에 끝나야 하고, 스트림이 끝날 때까지 limiter 슬롯을 잡습니다.
+        """
+        limiter = self.limiter
+
+        async def attempt(timeout: float):
+            await limiter.__aenter__()
+            stream = None
+            try:
+                stream = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    timeout=min(timeout, self.timeout.read),
+                    stream=True,
+                    **params,
+                )
+                # 첫 내용 조각까지 받아야 연결 성공으로 봅니다.
+                chunks = stream.__aiter__()
+                async for chunk in chunks:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        return stream, chunks, chunk.choices[0].delta.content
+                return stream, None, ""
+            except BaseException:
+                if stream is not None:
+                    await stream.close()
+                await limiter.__aexit__(None, None, None)
+                raise
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        stream, chunks, first = await self._call(
+            focus, "stream", attempt, started=started
+        )
+        try:
+            if chunks is None:
+                return
+            yield first
+            async for chunk in chunks:
+                if loop.time() - started > self.deadline:
+                    raise asyncio.TimeoutError("LLM stream exceeded the deadline")
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+            await limiter.__aexit__(None, None, None)
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "deadline": self.deadline,
+            "max_retries": self.max_retries,
+            "breaker": self.breaker.stats(),
+            "limiter": self.limiter.stats(),
+            "calls": {
+                s["labels"]["outcome"]: s["value"] for s in self.calls.snapshot()
+            },
+            "retries": sum(s["value"] for s in self.retries.snapshot()),
+            "latency": self.latency.snapshot(),
+        }
+
+
+llm_client = LLMClient(
+    api_key=OPENAI_API_KEY,
+    base_url=OPENAI_BASE_URL,
+    model=OPENAI_MODEL,
+    max_connections=LLM_MAX_CONNECTIONS,
+    max_keepalive=LLM_MAX_KEEPALIVE,
+    connect_timeout=LLM_CONNECT_TIMEOUT,
+    read_timeout=LLM_READ_TIMEOUT,
+    deadline=LLM_DEADLINE,
+    max_retries=LLM_MAX_RETRIES,
+    backoff=LLM_RETRY_BACKOFF,
+    backoff_max=LLM_RETRY_BACKOFF_MAX,
+    breaker=CircuitBreaker(LLM_BREAKER_THRESHOLD, LLM_BREAKER_RESET),
+    limiter=AsyncLimiter(COMMENT_MAX_CONCURRENCY, COMMENT_RATE_LIMIT),
+)
+
+REGISTRY.register(
+    llm_client.latency,
+    llm_client.calls,
+    llm_client.retries,
+    CallbackMetric(
+        "llm_circuit_state",
+        "LLM 회로 차단기 상태 (현재 상태만 1)",
+        lambda: {
+            (state,): int(llm_client.breaker.state == state)
+            for state in ("closed", "half_open", "open")
+        },
+        labelnames=("state",),
+    ),
+)
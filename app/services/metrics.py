@@ -0,0 +1,212 @@
+# app/services/metrics.py
+
+import bisect
+import threading
+
+# 초 단위 지연 시간 bucket 상한 (LLM 호출처럼 수 초~수십 초 걸리는 작업 기준)
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0, 60.0)
+# 추천 파이프라인 단계처럼 수 ms~수백 ms 걸리는 작업 기준
+STAGE_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+class Counter:
+    """라벨별 누적 카운터."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def snapshot(self) -> list:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            {"labels": dict(zip(self.labelnames, key)), "value": value}
+            for key, value in items
+        ]
+
+
+class Histogram:
+    """
+    라벨별 bucket 히스토그램 (Prometheus histogram과 같은 의미).
+    bucket 개수만큼의 카운터만 유지하므로 관측 수와 관계없이 메모리가 일정합니다.
+    분위수(p50/p95/p99)는 bucket 안에서 선형 보간한 추정값입니다.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [bucket별 개수 (마지막은 +Inf), 합계, 최댓값]
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0.0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] = max(series[2], value)
+
+    def _quantile(self, counts: list, maximum: float, q: float) -> float:
+        total = sum(counts)
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = 0.0 if i == 0 else self.buckets[i - 1]
+                upper = self.buckets[i] if i < len(self.buckets) else maximum
+                upper = min(upper, maximum)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return maximum
+
+    def snapshot(self) -> list:
+        with self._lock:
+            items = [(k, list(s[0]), s[1], s[2]) for k, s in self._series.items()]
+        out = []
+        for key, counts, total, maximum in items:
+            count = sum(counts)
+            cumulative, running = {}, 0
+            for bound, c in zip(self.buckets, counts):
+                running += c
+                cumulative[str(bound)] = running
+            cumulative["+Inf"] = count
+            out.append(
+                {
+                    "labels": dict(zip(self.labelnames, key)),
+                    "count": count,
+                    "sum": round(total, 6),
+                    "max": round(maximum, 6),
+                    "p50": round(self._quantile(counts, maximum, 0.50), 6),
+                    "p95": round(self._quantile(counts, maximum, 0.95), 6),
+                    "p99": round(self._quantile(counts, maximum, 0.99), 6),
+                    "buckets": cumulative,
+                }
+            )
+        return out
+
+
+class CallbackMetric:
+    """
+    수집 시점에 fn()을 호출해 값을 읽는 지표 (큐 깊이, 캐시 카운터처럼 다른 객체가 가진 값).
+    fn은 숫자 또는 {라벨 튜플: 값} dict를 반환합니다.
+    """
+
+    def __init__(self, name: str, help: str, fn, kind: str = "gauge", labelnames=()):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+
+    def snapshot(self) -> list:
+        value = self.fn()
+        if not isinstance(value, dict):
+            return [{"labels": {}, "value": value}]
+        return [
+            {"labels": dict(zip(self.labelnames, key)), "value": v}
+            for key, v in value.items()
+        ]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: dict, extra: dict = None) -> str:
+    items = list(labels.items()) + list((extra or {}).items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _number(value) -> str:
+    if value is None:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """/metrics에서 내보낼 지표 목록 (같은 이름으로 다시 등록하면 교체합니다)."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, *metrics):
+        with self._lock:
+            for metric in metrics:
+                self._metrics[metric.name] = metric
+        return metrics[0] if len(metrics) == 1 else metrics
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                samples = metric.snapshot()
+            except Exception:
+                # 한 지표의 수집 실패가 /metrics 전체를 막지 않도록 건너뜁니다.
+                continue
+            lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample in samples:
+                labels = sample["labels"]
+                if metric.kind != "histogram":
+                    lines.append(
+                        f"{metric.name}{_labels(labels)} {_number(sample['value'])}"
+                    )
+                    continue
+                for bound, count in sample["buckets"].items():
+                    lines.append(
+                        f"{metric.name}_bucket{_labels(labels, {'le': bound})} {count}"
+                    )
+                lines.append(
+                    f"{metric.name}_sum{_labels(labels)} {_number(sample['sum'])}"
+                )
+                lines.append(f"{metric.name}_count{_labels(labels)} {sample['count']}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
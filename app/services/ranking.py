@@ -0,0 +1,149 @@
+# app/services/ranking.py
+
+import numpy as np
+import pandas as pd
+
+METRICS = ["투자비", "절감액", "투자비회수기간", "온실가스감축량"]
+# 값이 작을수록 좋은 지표 (정규화 시 1 - norm)
+LOWER_IS_BETTER = ("투자비", "투자비회수기간")
+FOCUSES = ("similarity", "balanced", "roi", "saving", "ghg")
+INFO_COLUMNS = ["cluster", "개선활동명_요약", "업종", "대상설비", "개선구분"]
+
+
+def top_k_desc(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    values 상위 k개의 위치를 내림차순으로 반환합니다 (전체 정렬 대신 argpartition).
+    동점은 원래 순서(후보 frame의 similarity 순서)를 유지하고, NaN은 가장 뒤로 보냅니다.
+    기존 구현의 `sort_values(ascending=False)`(기본 quicksort)는 동점 순서가 정해져 있지 않았으므로,
+    점수가 같은 항목은 이전 응답과 순서가 다를 수 있습니다 (동점이 아닌 항목의 순서는 같음).
+    """
+    n = values.shape[0]
+    k = min(int(k), n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    keys = np.where(np.isnan(values), -np.inf, values)
+    if k < n:
+        cand = np.argpartition(-keys, k - 1)[:k]
+        threshold = keys[cand].min()
+        above = cand[keys[cand] > threshold]
+        ties = np.flatnonzero(keys == threshold)
+        if threshold == -np.inf:
+            # 실제 -inf 값이 NaN보다 앞에 오도록
+            ties = ties[np.argsort(np.isnan(values[ties]), kind="stable")]
+        cand = np.concatenate([above, ties[: k - above.size]])
+    else:
+        cand = np.arange(n)
+    order = np.lexsort((cand, np.isnan(values[cand]), -keys[cand]))
+    return cand[order]
+
+
+def _nanmean(col: np.ndarray) -> float:
+    """pandas Series.mean()과 같은 방식 (NaN을 0으로 채운 합 / 유효 개수)"""
+    mask = np.isnan(col)
+    count = col.size - mask.sum()
+    if count == 0:
+        return np.nan
+    return np.where(mask, 0.0, col).sum() / np.float64(count)
+
+
+def _nanmin_max(col: np.ndarray):
+    if col.size == 0 or np.isnan(col).all():
+        return np.nan, np.nan
+    return np.nanmin(col), np.nanmax(col)
+
+
+def balanced_scores(metrics: np.ndarray) -> np.ndarray:
+    """
+    metrics: (4, n) — METRICS 순서의 지표 행렬 (각 행이 연속 메모리)
+    지표별 min-max 정규화(투자비/투자비회수기간은 1 - norm)에
+    정규화된 평균값 비율로 만든 가중치를 곱해 합한 종합 점수를 반환합니다.
+    """
+    stats = [(_nanmean(col),) + _nanmin_max(col) for col in metrics]
+
+    norm_means = []
+    for f, (m, mn, mx) in zip(METRICS, stats):
+        norm = (m - mn) / (mx - mn) if mx > mn else 0
+        if f in LOWER_IS_BETTER:
+            norm = 1 - norm
+        norm_means.append(norm)
+    total = sum(norm_means)
+    weights = [(nm / total if total > 0 else 1 / len(METRICS)) for nm in norm_means]
+
+    score = 0
+    for f, col, (_, mn, mx), w in zip(METRICS, metrics, stats, weights):
+        norm_col = (col - mn) / (mx - mn) if mx > mn else np.zeros_like(col)
+        if f in LOWER_IS_BETTER:
+            norm_col = 1 - norm_col
+        score = score + norm_col * w
+    return np.asarray(score, dtype=np.float64)
+
+
+def rank_columns(cand_df: pd.DataFrame, focuses, k: int, columns=None) -> dict:
+    """
+    후보 frame을 한 번만 읽어 요청된 focus별 상위 k개 행을 컬럼 단위로 반환합니다.
+    - 지표 정규화, balanced 가중치, ROI(절감액/투자비)를 벡터 연산으로 한 번에 계산
+    - focus별 정렬은 전체 정렬 대신 argpartition 기반 부분 선택
+    columns: 꺼낼 컬럼 목록 (기본값: INFO_COLUMNS, balanced_score, similarity, METRICS 전체)
+    반환값: {focus: {컬럼: [값, ...]}} (지표는 소수 첫째 자리로 반올림)
+    """
+    for focus in focuses:
+        if focus not in FOCUSES:
+            raise ValueError(f"Unknown focus: {focus}")
+
+    metrics = np.ascontiguousarray(
+        np.vstack([cand_df[f].to_numpy(dtype=np.float64) for f in METRICS])
+        if len(cand_df)
+        else np.empty((len(METRICS), 0))
+    )
+    invest, saving, _, ghg = metrics
+    similarity = cand_df["similarity"].to_numpy()
+
+    keys = {}
+    for focus in focuses:
+        if focus == "similarity":
+            keys[focus] = similarity
+        elif focus == "balanced":
+            keys[focus] = balanced_scores(metrics)
+        elif focus == "roi":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                keys[focus] = saving / invest
+        elif focus == "saving":
+            keys[focus] = saving
+        elif focus == "ghg":
+            keys[focus] = ghg
+
+    # 선택된 행의 필요한 컬럼 값만 꺼냅니다.
+    info = {
+        c: cand_df[c].to_numpy()
+        for c in INFO_COLUMNS
+        if columns is None or c in columns
+    }
+    rounded = {
+        f: row
+        for f, row in zip(METRICS, np.round(metrics, 1))
+        if columns is None or f in columns
+    }
+    results = {}
+    for focus in focuses:
+        top = top_k_desc(np.asarray(keys[focus], dtype=np.float64), k)
+        selected = {c: values[top].tolist() for c, values in info.items()}
+        if focus == "balanced" and (columns is None or "balanced_score" in columns):
+            selected["balanced_score"] = np.round(keys[focus][top], 3).tolist()
+        if columns is None or "similarity" in columns:
+            selected["similarity"] = similarity[top].tolist()
+        for f, row in rounded.items():
+            selected[f] = row[top].tolist()
+        results[focus] = selected
+    return results
+
+
+def rank_candidates(cand_df: pd.DataFrame, focuses, k: int) -> dict:
+    """
+    rank_columns의 결과를 레코드로 바꿔 반환합니다.
+    반환값: {focus: [record, ...]} (recommend_by_focus와 같은 레코드 형식)
+    """
+    results = {}
+    for focus, columns in rank_columns(cand_df, focuses, k).items():
+        names = list(columns)
+        results[focus] = [dict(zip(names, values)) for values in zip(*columns.values())]
+    return results
@@ -0,0 +1,69 @@
+# app/services/rate_limit.py
+
+import asyncio
+import time
+
+
+class AsyncLimiter:
+    """
+    외부 API 호출용 동시 실행 수 + 초당 호출 수 제한 (async with로 사용).
+    - max_concurrency: 동시에 진행할 수 있는 호출 수 (0이면 제한 없음)
+    - rate: 초당 시작할 수 있는 호출 수 (0이면 제한 없음). 호출 시작 간격을 1/rate초 이상으로 맞춥니다.
+    asyncio 객체는 처음 사용할 때 만들어 현재 이벤트 루프에 묶습니다.
+    """
+
+    def __init__(self, max_concurrency: int = 0, rate: float = 0.0):
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self._semaphore = None
+        self._rate_lock = None
+        self._next_start = 0.0
+        self.active = 0
+        self.waiting = 0
+
+    def _ensure(self):
+        if self._rate_lock is None:
+            self._rate_lock = asyncio.Lock()
+            if self.max_concurrency > 0:
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def _wait_for_slot(self):
+        if self.rate <= 0:
+            return
+        async with self._rate_lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + 1.0 / self.rate
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def __aenter__(self):
+        self._ensure()
+        self.waiting += 1
+        try:
+            if self._semaphore is not None:
+                await self._semaphore.acquire()
+            try:
+                await self._wait_for_slot()
+            except BaseException:
+                if self._semaphore is not None:
+                    self._semaphore.release()
+                raise
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        self.active -= 1
+        if self._semaphore is not None:
+            self._semaphore.release()
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "rate": self.rate,
+            "active": self.active,
+            "waiting": self.waiting,
+        }
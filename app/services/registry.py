@@ -0,0 +1,205 @@
+# app/services/registry.py
+
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from .metrics import REGISTRY, CallbackMetric
+
+logger = logging.getLogger(__name__)
+
+
+class RegistryBusyError(Exception):
+    """다른 reload/update가 새 번들을 만드는 중일 때 발생합니다."""
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """
+    추천 요청 하나가 처음부터 끝까지 사용하는 불변 리소스 묶음 (한 버전).
+    요청은 시작 시 registry.current()로 번들을 한 번 가져와 끝까지 같은 번들을 사용하므로,
+    교체(hot-swap) 중에도 진행 중인 요청은 이전 버전으로 끝납니다.
+    """
+
+    version: str
+    fingerprint: tuple
+    encoder: Any
+    numpy_encoder: Any
+    latent_store: Any
+    latent_index: Any
+    partition_index: Any
+    catalog: Any
+    ohe: Any
+    scaler: Any
+    vectorizer: Any
+    categorical_cols: list
+    numeric_cols: list
+    constraint_index: Any = None
+    # 기본 아티팩트 뒤에 붙은 수집 세그먼트별 검색 리소스 (SegmentBundle, 만든 순서)
+    segments: tuple = ()
+    loaded_at: float = field(default_factory=time.time)
+    load_seconds: float = 0.0
+    timings: dict = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class SegmentBundle:
+    """
+    수집 세그먼트 하나의 검색 리소스. 기본 latent 저장소/인덱스는 그대로 두고 세그먼트마다 따로 만들며,
+    검색 결과는 기본 카탈로그 결과와 합칩니다 (inference._search_scoped).
+    행 번호는 세그먼트 안의 위치이고, 번들 카탈로그(SegmentedCatalog)에서는 offset을 더한 행입니다.
+    catalog는 세그먼트 행만 담은 ActivityCatalog이며 문자열 코드는 번들 카탈로그와 같은 코드 공간입니다.
+    """
+
+    name: str
+    offset: int
+    latent_store: Any
+    latent_index: Any
+    partition_index: Any
+    catalog: Any
+    constraint_index: Any
+
+
+def version_of(fingerprint: tuple) -> str:
+    """아티팩트 fingerprint로 만든 짧은 버전 문자열 (같은 파일이면 재시작해도 같은 값)"""
+    return hashlib.sha1(repr(fingerprint).encode("utf-8")).hexdigest()[:12]
+
+
+class ModelRegistry:
+    """
+    활성 ModelBundle을 보관하고 원자적으로 교체합니다.
+    - current(): 현재 번들 (참조 하나를 읽으므로 잠금 없이 일관된 번들을 얻습니다)
+    - activate(bundle): 새 번들로 교체하고 리스너(캐시 비우기, 워커 재시작 등)를 호출
+    - reload(build, ...): 새 번들을 만들어 교체 (동시에 하나만 실행)
+    - update(build): 현재 번들에서 파생한 새 번들로 교체 (reload와 같은 잠금, 예외는 그대로 전달)
+    """
+
+    def __init__(self, history_size: int = 5):
+        self._active = None
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._listeners = []
+        self.history = []
+        self.history_size = history_size
+        self.swaps = 0
+        self.last_error = None
+
+    def current(self):
+        return self._active
+
+    @property
+    def version(self):
+        active = self._active
+        return None if active is None else active.version
+
+    @property
+    def reloading(self) -> bool:
+        return self._reload_lock.locked()
+
+    def add_listener(self, fn):
+        """번들이 교체될 때 fn(old, new)를 호출합니다."""
+        self._listeners.append(fn)
+
+    def activate(self, bundle: ModelBundle):
+        with self._lock:
+            old, self._active = self._active, bundle
+            if old is not None:
+                self.swaps += 1
+            self.history.append(
+                {
+                    "version": bundle.version,
+                    "activated_at": time.time(),
+                    "load_seconds": bundle.load_seconds,
+                }
+            )
+            del self.history[: -self.history_size]
+        if old is None:
+            logger.info("Model version %s activated", bundle.version)
+        else:
+            logger.info(
+                "Model version %s activated (replaced %s)", bundle.version, old.version
+            )
+        for fn in self._listeners:
+            try:
+                fn(old, bundle)
+            except Exception:
+                logger.exception("Model registry listener failed")
+        return old
+
+    def reload(self, build, fingerprint_fn=None, force: bool = False) -> bool:
+        """
+        build()로 새 번들을 만들어 교체합니다. 다른 reload가 진행 중이면 바로 False를 반환하고,
+        force=False이면 아티팩트 fingerprint가 현재 번들과 같을 때 건너뜁니다.
+        새 번들을 만드는 동안 요청은 기존 번들로 계속 처리됩니다.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            active = self._active
+            if (
+                not force
+                and active is not None
+                and fingerprint_fn is not None
+                and fingerprint_fn() == active.fingerprint
+            ):
+                return False
+            try:
+                bundle = build()
+            except Exception as e:
+                self.last_error = e
+                logger.exception("Model reload failed; keeping the active version")
+                return False
+            self.last_error = None
+            self.activate(bundle)
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def update(self, build):
+        """
+        build(current)가 만든 번들로 교체하고 새 번들을 반환합니다 (증분 수집 등).
+        reload와 같은 잠금을 쓰므로 동시에 하나만 실행되며, 진행 중이면 RegistryBusyError.
+        build의 예외는 그대로 전달되고 활성 번들은 바뀌지 않습니다.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            raise RegistryBusyError("model reload or update in progress")
+        try:
+            bundle = build(self._active)
+            self.activate(bundle)
+            return bundle
+        finally:
+            self._reload_lock.release()
+
+    def stats(self) -> dict:
+        active = self._active
+        return {
+            "version": None if active is None else active.version,
+            "loaded_at": None if active is None else active.loaded_at,
+            "swaps": self.swaps,
+            "reloading": self.reloading,
+            "last_error": None if self.last_error is None else str(self.last_error),
+            "history": list(self.history),
+        }
+
+
+model_registry = ModelRegistry()
+
+REGISTRY.register(
+    CallbackMetric(
+        "model_info",
+        "활성 모델 번들 버전 (활성 버전만 1, 로딩 전에는 없음)",
+        lambda: {}
+        if model_registry.version is None
+        else {(model_registry.version,): 1},
+        labelnames=("version",),
+    ),
+    CallbackMetric(
+        "model_swaps_total",
+        "프로세스 시작 후 모델 번들이 교체된 횟수 (reload, 증분 수집, compaction)",
+        lambda: model_registry.swaps,
+        kind="counter",
+    ),
+)
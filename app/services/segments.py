@@ -0,0 +1,180 @@
+# app/services/segments.py
+
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from .catalog import NUMERIC_COLUMNS, STRING_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# 세그먼트 parquet에 저장하는 카탈로그 컬럼
+SEGMENT_COLUMNS = STRING_COLUMNS + NUMERIC_COLUMNS + ["cluster"]
+PREFIX = "segment-"
+JOURNAL = "compaction.json"
+LOCK = "compaction.lock"
+
+
+def segment_paths(directory: str, name: str) -> tuple:
+    """(latent 벡터 .npy, 카탈로그 행 .parquet) 경로"""
+    base = os.path.join(directory, name)
+    return f"{base}.npy", f"{base}.parquet"
+
+
+def segment_names(directory: str) -> list:
+    """
+    완성된 세그먼트 이름 목록 (만든 순서).
+    parquet을 마지막에 쓰므로 parquet이 있는 세그먼트만 완성된 것으로 봅니다.
+    """
+    try:
+        files = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return sorted(
+        f[: -len(".parquet")]
+        for f in files
+        if f.startswith(PREFIX) and f.endswith(".parquet")
+    )
+
+
+def _write_atomic(path: str, write):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fp:
+        write(fp)
+    os.replace(tmp, path)
+
+
+def write_segment(directory: str, frame: pd.DataFrame, latents: np.ndarray) -> str:
+    """
+    새 카탈로그 행(frame, cluster 포함)과 인코더 출력(latents, 정규화 전)을 append-only 세그먼트로 저장합니다.
+    이름은 시각 + pid라 여러 프로세스가 동시에 써도 겹치지 않습니다.
+    """
+    if len(frame) != len(latents):
+        raise ValueError("세그먼트의 카탈로그 행 수와 latent 벡터 수가 다릅니다.")
+    os.makedirs(directory, exist_ok=True)
+    name = f"{PREFIX}{time.time_ns():020d}-{os.getpid()}"
+    latent_path, frame_path = segment_paths(directory, name)
+    _write_atomic(latent_path, lambda fp: np.save(fp, np.asarray(latents)))
+    _write_atomic(
+        frame_path,
+        lambda fp: frame[SEGMENT_COLUMNS].to_parquet(fp, index=False),
+    )
+    return name
+
+
+def read_segment(directory: str, name: str) -> tuple:
+    """(카탈로그 행 DataFrame, 정규화 전 latent 벡터)"""
+    latent_path, frame_path = segment_paths(directory, name)
+    latents = np.load(latent_path)
+    frame = pd.read_parquet(frame_path)
+    if len(frame) != len(latents):
+        raise ValueError(f"세그먼트 {name}의 행 수가 맞지 않습니다.")
+    return frame, latents
+
+
+def recover(directory: str) -> bool:
+    """
+    중단된 compaction이 남긴 journal을 끝까지 적용합니다
+    (스테이징 파일로 기본 아티팩트 교체 → 합친 세그먼트 삭제 → journal 삭제).
+    적용할 journal이 있었으면 True를 반환합니다.
+    """
+    path = os.path.join(directory, JOURNAL)
+    try:
+        with open(path, encoding="utf-8") as fp:
+            journal = json.load(fp)
+    except FileNotFoundError:
+        return False
+    for staged, target in journal["files"].items():
+        try:
+            os.replace(staged, target)
+        except FileNotFoundError:
+            pass
+    for name in journal["segments"]:
+        # parquet(완성 표시)을 먼저 지워 반쯤 지워진 세그먼트가 읽히지 않도록 합니다.
+        for segment_path in reversed(segment_paths(directory, name)):
+            try:
+                os.remove(segment_path)
+            except FileNotFoundError:
+                pass
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    return True
+
+
+@contextmanager
+def compaction_lock(directory: str, stale_after: float = 3600.0):
+    """
+    프로세스 간 compaction 잠금 (잠금 파일 O_EXCL). 다른 프로세스가 잡고 있으면 False를 내보냅니다.
+    stale_after초보다 오래된 잠금 파일은 중단된 프로세스가 남긴 것으로 보고 지웁니다.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, LOCK)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) < stale_after:
+                    yield False
+                    return
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    else:
+        yield False
+        return
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        yield True
+    finally:
+        os.remove(path)
+
+
+def compact(directory: str, latent_path: str, catalog_path: str) -> list:
+    """
+    모든 세그먼트를 기본 아티팩트(latent_vectors.npy, 카탈로그 parquet) 뒤에 합치고 세그먼트를 지웁니다.
+    합친 파일을 스테이징한 뒤 journal을 남기고 교체하므로, 중간에 중단되어도 recover()가 마저 끝냅니다.
+    반환값: 합친 세그먼트 이름 목록
+    """
+    recover(directory)
+    names = segment_names(directory)
+    if not names:
+        return []
+
+    latents = [np.load(latent_path)]
+    frames = [pd.read_parquet(catalog_path)]
+    for name in names:
+        frame, segment_latents = read_segment(directory, name)
+        frames.append(frame)
+        latents.append(segment_latents.astype(latents[0].dtype, copy=False))
+    merged_latents = np.concatenate(latents)
+    merged_frame = pd.concat(frames, ignore_index=True)
+
+    staged = {
+        f"{latent_path}.compact": latent_path,
+        f"{catalog_path}.compact": catalog_path,
+    }
+    _write_atomic(f"{latent_path}.compact", lambda fp: np.save(fp, merged_latents))
+    _write_atomic(
+        f"{catalog_path}.compact", lambda fp: merged_frame.to_parquet(fp, index=False)
+    )
+    journal = json.dumps({"segments": names, "files": staged}, ensure_ascii=False)
+    _write_atomic(
+        os.path.join(directory, JOURNAL), lambda fp: fp.write(journal.encode())
+    )
+    recover(directory)
+    logger.info(
+        "Compacted %d segments into base artifacts (%d rows)",
+        len(names),
+        len(merged_frame),
+    )
+    return names
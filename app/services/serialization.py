@@ -0,0 +1,59 @@
+# app/services/serialization.py
+
+import logging
+import math
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from ..setting.config import RECOMMEND_JSON_RESPONSE
+
+logger = logging.getLogger(__name__)
+
+
+def finite(value):
+    """NaN/inf 실수를 None으로 바꿉니다 (pydantic JSON 직렬화와 같은 규칙)."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: finite(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [finite(v) for v in value]
+    return value
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    response_model 검증과 jsonable_encoder를 거치지 않고 content를 바로 인코딩하는 응답.
+    FastAPI 기본 경로와 같은 바이트를 만듭니다 (ensure_ascii=False, 공백 없는 구분자, NaN/inf → null).
+    """
+
+    def render(self, content) -> bytes:
+        try:
+            return super().render(content)
+        except ValueError:
+            # allow_nan=False — NaN/inf가 있을 때만 변환 후 다시 인코딩합니다.
+            return super().render(finite(content))
+
+
+def response_class(name: str = RECOMMEND_JSON_RESPONSE):
+    """
+    RECOMMEND_JSON_RESPONSE에 맞는 응답 클래스.
+    orjson은 NaN/inf를 null로 쓰고 공백 없이 UTF-8로 출력하므로 같은 바이트를 만들지만,
+    1e16 이상이나 1e-4 미만의 실수는 표기가 다릅니다 (예: 1e+16 → 1e16, 1e-05 → 0.00001).
+    /recommend의 지표는 소수 첫째 자리로 반올림되어 있어 이 범위에 해당하지 않습니다.
+    """
+    if name == "orjson":
+        try:
+            import orjson  # noqa: F401
+        except ImportError:
+            logger.warning(
+                "RECOMMEND_JSON_RESPONSE=orjson but orjson is not installed; using json"
+            )
+            return FastJSONResponse
+        return ORJSONResponse
+    if name != "json":
+        raise ValueError(f"Unknown RECOMMEND_JSON_RESPONSE: {name}")
+    return FastJSONResponse
+
+
+RecommendJSONResponse = response_class()
@@ -0,0 +1,283 @@
+# app/services/similarity.py
+
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 전체 스캔에서 restrict로 남긴 행이 이 비율보다 많으면 행을 모아(gather) 계산하는 대신
+# 전체 유사도를 계산한 뒤 남은 행의 값만 고릅니다 (1M x 64 기준 약 30%에서 비용이 같아짐).
+DENSE_SCAN_FRACTION = 0.3
+
+
+def normalize_rows(x: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (sklearn normalize와 동일하게 norm이 0인 행은 그대로 둡니다)."""
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.sqrt(np.einsum("ij,ij->i", x, x))
+    norms[norms == 0.0] = 1.0
+    return x / norms[:, np.newaxis]
+
+
+def select_top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    scores에서 상위 k개의 위치를 내림차순으로 반환합니다.
+    전체 정렬 대신 argpartition으로 k개만 고른 뒤 그 안에서만 정렬합니다.
+    동점은 `np.argsort(scores, kind="stable")[-k:][::-1]`과 같은 순서(인덱스가 큰 쪽 우선)를 따릅니다.
+    """
+    n = scores.shape[0]
+    k = min(int(k), n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        cand = np.argpartition(scores, n - k)[n - k :]
+        threshold = scores[cand].min()
+        above = cand[scores[cand] > threshold]
+        ties = np.flatnonzero(scores == threshold)[above.size - k :]
+        cand = np.concatenate([above, ties])
+    else:
+        cand = np.arange(n)
+    order = np.lexsort((cand, scores[cand]))[::-1]
+    return cand[order]
+
+
+def merge_top_k(hits: list, k: int) -> tuple:
+    """
+    여러 검색 결과 (row_ids, sims)를 합쳐 상위 k개를 내림차순으로 반환합니다 (수집 세그먼트 결과 병합).
+    row_ids는 모두 같은 행 번호 공간이어야 하며, 동점은 select_top_k처럼 행 번호가 큰 쪽이 먼저입니다.
+    """
+    row_ids = np.concatenate([ids for ids, _ in hits])
+    sims = np.concatenate([s for _, s in hits])
+    order = np.lexsort((row_ids, sims))[::-1][:k]
+    return row_ids[order], sims[order]
+
+
+class LatentIndex:
+    """
+    latent 벡터 저장소(LatentStore) 위의 코사인 유사도 검색 인덱스.
+    - 저장소의 벡터는 미리 정규화되어 있으며, 요청마다 한 번의 행렬곱으로 유사도를 계산합니다.
+      양자화 저장소에서는 근사 유사도로 후보를 고른 뒤 float32로 다시 순위를 매깁니다.
+    - mode="exact": 전체 카탈로그를 스캔합니다.
+    - mode="ivf": `cluster` 컬럼을 버킷 키로 사용하는 IVF 근사 검색.
+      클러스터 centroid와의 유사도로 상위 nprobe개 버킷만 스캔하며,
+      노이즈(cluster == -1) 행은 가장 가까운 centroid의 버킷에 배정합니다.
+    """
+
+    def __init__(
+        self,
+        store,
+        clusters: np.ndarray = None,
+        mode: str = "exact",
+        nprobe: int = 8,
+    ):
+        if mode not in ("exact", "ivf"):
+            raise ValueError(f"Unknown similarity mode: {mode}")
+        self.store = store
+        self.size = store.size
+        self.all_ids = np.arange(self.size)
+        self.nprobe = nprobe
+        self.mode = mode
+        if mode == "ivf":
+            if clusters is None or not (np.asarray(clusters) != -1).any():
+                logger.warning(
+                    "IVF mode requires cluster labels; falling back to exact"
+                )
+                self.mode = "exact"
+            else:
+                self._build_buckets(np.asarray(clusters))
+
+    def _build_buckets(self, clusters: np.ndarray, chunk_size: int = 65536):
+        labels = np.unique(clusters[clusters != -1])
+        member = clusters != -1
+        bucket_of = np.full(self.size, -1, dtype=np.int64)
+        bucket_of[member] = np.searchsorted(labels, clusters[member])
+
+        sums = np.zeros((labels.size, self.store.dim), dtype=np.float64)
+        member_ids = np.flatnonzero(member)
+        for start in range(0, member_ids.size, chunk_size):
+            ids = member_ids[start : start + chunk_size]
+            np.add.at(sums, bucket_of[ids], self.store.gather(ids))
+        self.centroids = normalize_rows(sums)
+
+        noise_ids = np.flatnonzero(~member)
+        for start in range(0, noise_ids.size, chunk_size):
+            ids = noise_ids[start : start + chunk_size]
+            bucket_of[ids] = np.argmax(
+                self.store.gather(ids) @ self.centroids.T, axis=1
+            )
+
+        order = np.argsort(bucket_of, kind="stable")
+        self.bucket_ids = order
+        self.bucket_offsets = np.searchsorted(
+            bucket_of[order], np.arange(labels.size + 1)
+        )
+        logger.info(
+            "LatentIndex IVF built: %d buckets, %d noise rows assigned",
+            labels.size,
+            noise_ids.size,
+        )
+
+    def _probe(self, query: np.ndarray) -> np.ndarray:
+        centroid_sims = (query[np.newaxis, :] @ self.centroids.T)[0]
+        buckets = select_top_k(centroid_sims, self.nprobe)
+        starts = self.bucket_offsets[buckets]
+        ends = self.bucket_offsets[buckets + 1]
+        return np.concatenate([self.bucket_ids[s:e] for s, e in zip(starts, ends)])
+
+    def scan(self, query: np.ndarray, restrict=None):
+        """
+        query(latent 벡터 1개)와 후보 행들의 1차 유사도를 계산합니다.
+        반환값: (row_ids, sims) — exact 모드에서는 전체 행, ivf 모드에서는 probe된 버킷의 행
+        restrict: 후보 행 번호(None이면 전체)를 받아 유사도를 계산할 행만 돌려주는 함수 (예: 예산 제약)
+        """
+        q = normalize_rows(np.asarray(query).reshape(1, -1))
+        if self.mode == "exact":
+            if restrict is None:
+                return self.all_ids, self.store.scores(q)[0]
+            row_ids = restrict(None)
+            return row_ids, self._scores(q, row_ids)[0]
+        row_ids = self._probe(q[0])
+        if restrict is not None:
+            row_ids = restrict(row_ids)
+        return row_ids, self.store.scores(q, row_ids)[0]
+
+    def _scores(self, queries: np.ndarray, rows: np.ndarray = None) -> np.ndarray:
+        """전체 카탈로그 중 rows(기본: 전체)에 대한 유사도 (DENSE_SCAN_FRACTION 참고)"""
+        if rows is not None and len(rows) > DENSE_SCAN_FRACTION * self.size:
+            return self.store.scores(queries)[:, rows]
+        return self.store.scores(queries, rows)
+
+    def top_k(self, query: np.ndarray, k: int, restrict=None):
+        """유사도 상위 k개의 (row_ids, sims)를 내림차순으로 반환합니다."""
+        row_ids, sims = self.scan(query, restrict)
+        q = normalize_rows(np.asarray(query).reshape(1, -1))[0]
+        top, top_sims = self.store.select(q, sims, k, rows=row_ids)
+        return row_ids[top], top_sims
+
+    def top_k_batch(
+        self, queries: np.ndarray, k: int, block_bytes: int = 64 << 20, restrict=None
+    ):
+        """
+        여러 query에 대한 top_k. exact 모드에서는 (n_queries x N) 유사도 행렬을
+        block_bytes 이하의 행 블록으로 나누어 계산해 메모리 사용량을 제한합니다.
+        restrict가 있으면 모든 query가 restrict(None)이 돌려준 행만 스캔합니다.
+        반환값: query 순서대로 (row_ids, sims) 리스트
+        """
+        queries = np.asarray(queries)
+        if self.mode != "exact":
+            return [self.top_k(q, k, restrict) for q in queries]
+
+        qn = normalize_rows(queries.reshape(len(queries), -1))
+        rows = None if restrict is None else restrict(None)
+        row_ids = self.all_ids if rows is None else rows
+        rows_per_block = max(1, block_bytes // (4 * max(self.size, 1)))
+        results = []
+        for start in range(0, len(qn), rows_per_block):
+            chunk = qn[start : start + rows_per_block]
+            block = self._scores(chunk, rows)
+            for q, sims in zip(chunk, block):
+                top, top_sims = self.store.select(q, sims, k, rows=rows)
+                results.append((row_ids[top], top_sims))
+        return results
+
+
+class PartitionedIndex:
+    """
+    업종(및 선택적으로 대상설비) 파티션별 검색 인덱스.
+    - 행 번호를 업종 코드 순(by_facility면 (업종 코드, 대상설비 코드) 순 정렬도 함께)으로 안정 정렬해 두므로
+      업종 파티션과 (업종, 대상설비) 파티션 모두 하나의 연속 구간으로 표현됩니다.
+    - 스캔 시 파티션 행만 저장소에서 모아 계산하므로 벡터 사본을 따로 두지 않습니다
+      (mmap 저장소에서는 해당 행의 페이지만 읽습니다).
+    - 파티션 안의 행은 원래 순서를 유지하므로 동점 처리는 전체 검색과 같습니다.
+      (업종, 대상설비) 파티션이 없어 업종 파티션으로 대체할 때도 업종 순 정렬을 쓰므로 industry 모드와 같습니다.
+    - 파티션 내 검색은 항상 exact 스캔입니다.
+    """
+
+    def __init__(
+        self,
+        store,
+        industry_codes: np.ndarray,
+        facility_codes: np.ndarray = None,
+    ):
+        industry_codes = np.asarray(industry_codes)
+        self.store = store
+        self.by_facility = facility_codes is not None
+        self.row_ids = np.argsort(industry_codes, kind="stable")
+        # (업종, 대상설비) 파티션용 정렬 (업종 구간의 경계는 row_ids와 같음)
+        self.facility_row_ids = None
+
+        self._ranges = {}
+        ind_sorted = industry_codes[self.row_ids]
+        bounds = np.flatnonzero(np.diff(ind_sorted)) + 1
+        for s, e in zip(np.r_[0, bounds], np.r_[bounds, ind_sorted.size]):
+            self._ranges[(int(ind_sorted[s]), None)] = (int(s), int(e))
+        if self.by_facility:
+            facility_codes = np.asarray(facility_codes)
+            order = np.lexsort((facility_codes, industry_codes))
+            self.facility_row_ids = order
+            fac_sorted = facility_codes[order]
+            bounds = np.flatnonzero(np.diff(ind_sorted) | np.diff(fac_sorted)) + 1
+            for s, e in zip(np.r_[0, bounds], np.r_[bounds, order.size]):
+                key = (int(ind_sorted[s]), int(fac_sorted[s]))
+                self._ranges[key] = (int(s), int(e))
+        logger.info(
+            "PartitionedIndex built: %d partitions (by_facility=%s)",
+            len(self._ranges),
+            self.by_facility,
+        )
+
+    def resolve(self, industry_code: int, facility_code: int = None):
+        """
+        질의에 사용할 파티션 키. (업종, 대상설비) 파티션이 없으면 업종 파티션으로,
+        업종 파티션도 없으면 None(후보 없음)을 반환합니다.
+        """
+        if self.by_facility and (industry_code, facility_code) in self._ranges:
+            return (industry_code, facility_code)
+        if (industry_code, None) in self._ranges:
+            return (industry_code, None)
+        return None
+
+    def partition_size(self, key) -> int:
+        if key is None:
+            return 0
+        s, e = self._ranges[key]
+        return e - s
+
+    def top_k_batch(
+        self,
+        queries: np.ndarray,
+        keys: list,
+        k: int,
+        block_bytes=64 << 20,
+        restrict=None,
+    ):
+        """
+        queries[i]를 keys[i] 파티션 안에서만 검색합니다 (같은 파티션 질의는 한 번의 행렬곱).
+        이 인덱스에 없는 파티션 키(다른 수집 세그먼트에서 resolve한 키)는 결과가 비어 있습니다.
+        restrict가 있으면 파티션 행을 restrict(part_ids)가 돌려준 행으로 줄인 뒤 스캔합니다.
+        반환값: query 순서대로 (row_ids, sims) 리스트 — row_ids는 카탈로그 전체 기준 행 번호
+        """
+        qn = normalize_rows(np.asarray(queries).reshape(len(keys), -1))
+        empty = (np.empty(0, dtype=self.row_ids.dtype), np.empty(0, dtype=np.float32))
+        results = [empty] * len(keys)
+
+        groups = {}
+        for i, key in enumerate(keys):
+            if key is not None:
+                groups.setdefault(key, []).append(i)
+        for key, members in groups.items():
+            if key not in self._ranges:
+                continue
+            s, e = self._ranges[key]
+            ordered = self.row_ids if key[1] is None else self.facility_row_ids
+            part_ids = ordered[s:e]
+            if restrict is not None:
+                part_ids = restrict(part_ids)
+            rows_per_block = max(1, block_bytes // (4 * max(len(part_ids), 1)))
+            for start in range(0, len(members), rows_per_block):
+                chunk = members[start : start + rows_per_block]
+                block = self.store.scores(qn[chunk], part_ids)
+                for i, sims in zip(chunk, block):
+                    top, top_sims = self.store.select(qn[i], sims, k, rows=part_ids)
+                    results[i] = (part_ids[top], top_sims)
+        return results
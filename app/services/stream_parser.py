@@ -0,0 +1,178 @@
+# app/services/stream_parser.py
+
+_WHITESPACE = " \t\r\n"
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+class CommentStreamParser:
+    """
+    스트리밍으로 들어오는 `{"top1": "...", "comparison": "..."}` JSON 응답을 점진적으로 파싱합니다.
+    feed(chunk)는 새로 디코딩된 (필드, 텍스트) 조각 목록을 반환합니다.
+    - 청크 경계에서 잘린 escape(`\\n`, `\\uXXXX`, 서로게이트 쌍)도 이어서 처리합니다.
+    - 첫 `{` 앞의 텍스트(예: ```json 코드 펜스)는 무시하고, 대상 필드가 아닌 값은 건너뜁니다.
+    - 최상위 객체가 닫히면 complete가 True가 됩니다.
+    """
+
+    def __init__(self, fields=("top1", "comparison")):
+        self.fields = tuple(fields)
+        self.values = {f: [] for f in self.fields}
+        self.complete = False
+        self._state = "start"
+        self._key = []
+        self._current = None
+        self._escape = False
+        self._unicode = None
+        self._high_surrogate = None
+        self._skip_depth = 0
+        self._skip_in_string = False
+        self._skip_escape = False
+
+    def result(self) -> dict:
+        """지금까지 파싱한 필드 값 (없는 필드는 빈 문자열)"""
+        return {f: "".join(parts) for f, parts in self.values.items()}
+
+    def feed(self, chunk: str) -> list:
+        events = []
+        for ch in chunk:
+            if self.complete:
+                break
+            state = self._state
+            if state == "start":
+                if ch == "{":
+                    self._state = "key_or_end"
+            elif state == "key_or_end":
+                if ch == '"':
+                    self._key = []
+                    self._state = "key"
+                elif ch == "}":
+                    self.complete = True
+            elif state == "key":
+                text = self._string_char(ch)
+                if text is None:
+                    self._key.append(self._flush_surrogate())
+                    self._state = "colon"
+                else:
+                    self._key.append(text)
+            elif state == "colon":
+                if ch == ":":
+                    self._state = "value"
+            elif state == "value":
+                if ch in _WHITESPACE:
+                    continue
+                key = "".join(self._key)
+                if ch == '"':
+                    self._current = key if key in self.values else None
+                    self._state = "string"
+                else:
+                    self._skip_depth = 0
+                    self._skip_in_string = False
+                    self._state = "skip"
+                    self._skip_char(ch)
+            elif state == "string":
+                text = self._string_char(ch)
+                if text is None:
+                    tail = self._flush_surrogate()
+                    if tail and self._current is not None:
+                        self.values[self._current].append(tail)
+                        events.append((self._current, tail))
+                    self._current = None
+                    self._state = "after_value"
+                elif text and self._current is not None:
+                    self.values[self._current].append(text)
+                    events.append((self._current, text))
+            elif state == "skip":
+                self._skip_char(ch)
+            elif state == "after_value":
+                self._after_value(ch)
+        return _merge(events)
+
+    def _after_value(self, ch: str):
+        if ch == ",":
+            self._state = "key_or_end"
+        elif ch == "}":
+            self.complete = True
+
+    def _skip_char(self, ch: str):
+        """문자열이 아닌 값(숫자, 객체, 배열 등)을 끝까지 건너뜁니다."""
+        if self._skip_in_string:
+            if self._skip_escape:
+                self._skip_escape = False
+            elif ch == "\\":
+                self._skip_escape = True
+            elif ch == '"':
+                self._skip_in_string = False
+            return
+        if ch == '"':
+            self._skip_in_string = True
+        elif ch in "{[":
+            self._skip_depth += 1
+        elif ch in "}]":
+            if self._skip_depth == 0:
+                self._state = "after_value"
+                self._after_value(ch)
+            else:
+                self._skip_depth -= 1
+        elif ch == "," and self._skip_depth == 0:
+            self._state = "key_or_end"
+
+    def _string_char(self, ch: str):
+        """
+        JSON 문자열 안의 문자 하나를 처리합니다.
+        반환값: 디코딩된 텍스트("" 가능), 문자열이 끝났으면 None
+        """
+        if self._unicode is not None:
+            self._unicode += ch
+            if len(self._unicode) < 4:
+                return ""
+            code = int(self._unicode, 16)
+            self._unicode = None
+            return self._code_unit(code)
+        if self._escape:
+            self._escape = False
+            if ch == "u":
+                self._unicode = ""
+                return ""
+            return self._flush_surrogate() + _ESCAPES.get(ch, ch)
+        if ch == "\\":
+            self._escape = True
+            return ""
+        if ch == '"':
+            return None
+        return self._flush_surrogate() + ch
+
+    def _code_unit(self, code: int) -> str:
+        if 0xD800 <= code < 0xDC00:
+            pending = self._flush_surrogate()
+            self._high_surrogate = code
+            return pending
+        if 0xDC00 <= code < 0xE000 and self._high_surrogate is not None:
+            high, self._high_surrogate = self._high_surrogate, None
+            return chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00))
+        return self._flush_surrogate() + chr(code)
+
+    def _flush_surrogate(self) -> str:
+        # 짝이 없는 high surrogate는 json.loads와 같이 그대로 둡니다.
+        if self._high_surrogate is None:
+            return ""
+        high, self._high_surrogate = self._high_surrogate, None
+        return chr(high)
+
+
+def _merge(events: list) -> list:
+    """같은 필드의 연속된 조각을 하나로 합칩니다."""
+    merged = []
+    for field, text in events:
+        if merged and merged[-1][0] == field:
+            merged[-1] = (field, merged[-1][1] + text)
+        else:
+            merged.append((field, text))
+    return merged
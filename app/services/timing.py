@@ -0,0 +1,134 @@
+# app/services/timing.py
+
+import contextvars
+import time
+from contextlib import contextmanager
+
+from ..setting.config import STAGE_TIMING
+from .metrics import REGISTRY, STAGE_BUCKETS, Counter, Histogram
+
+stage_seconds = REGISTRY.register(
+    Histogram(
+        "pipeline_stage_seconds",
+        "파이프라인 단계별 소요 시간 (초)",
+        labelnames=("pipeline", "stage"),
+        buckets=STAGE_BUCKETS,
+    )
+)
+stage_candidates = REGISTRY.register(
+    Counter(
+        "pipeline_stage_candidates_total",
+        "파이프라인 단계별로 남은 후보 수 누적",
+        labelnames=("pipeline", "stage"),
+    )
+)
+
+_current = contextvars.ContextVar("stage_trace", default=None)
+
+
+class StageTrace:
+    """요청 하나의 단계별 소요 시간(초)과 후보 수. export()는 프로세스 간에 넘길 수 있는 dict입니다."""
+
+    __slots__ = ("pipeline", "durations", "counts")
+
+    def __init__(self, pipeline: str):
+        self.pipeline = pipeline
+        self.durations = {}
+        self.counts = {}
+
+    def export(self) -> dict:
+        return {
+            "pipeline": self.pipeline,
+            "durations": dict(self.durations),
+            "counts": dict(self.counts),
+        }
+
+
+class _Stage:
+    __slots__ = ("trace", "name", "started")
+
+    def __init__(self, trace: StageTrace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        durations = self.trace.durations
+        # 같은 단계가 여러 번 실행되면 (배치, focus별 호출 등) 합산합니다.
+        durations[self.name] = (
+            durations.get(self.name, 0.0) + time.perf_counter() - self.started
+        )
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name: str):
+    """현재 추적 중인 요청의 name 단계 시간을 잽니다. 추적 중이 아니면 아무것도 하지 않습니다."""
+    trace = _current.get()
+    return _NO_STAGE if trace is None else _Stage(trace, name)
+
+
+def count(name: str, n: int):
+    """현재 추적 중인 요청의 name 단계 후보 수를 더합니다."""
+    trace = _current.get()
+    if trace is not None:
+        trace.counts[name] = trace.counts.get(name, 0) + n
+
+
+@contextmanager
+def traced(pipeline: str):
+    """
+    이 블록 안(같은 context의 하위 호출과 태스크 포함)의 stage()/count()를 한 요청으로 모읍니다.
+    STAGE_TIMING=0이면 None을 내보내고 아무것도 기록하지 않습니다.
+    """
+    if not STAGE_TIMING:
+        yield None
+        return
+    trace = StageTrace(pipeline)
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:
+            # 다 읽지 않은 async generator가 다른 context에서 닫힐 때 (GC 등)
+            pass
+
+
+def record(data: dict):
+    """export()한 추적 결과를 히스토그램/카운터에 반영합니다 (워커가 아닌 API 프로세스에서 호출)."""
+    if not data:
+        return
+    pipeline = data["pipeline"]
+    for name, seconds in data["durations"].items():
+        stage_seconds.observe(seconds, pipeline=pipeline, stage=name)
+    for name, n in data["counts"].items():
+        stage_candidates.inc(n, pipeline=pipeline, stage=name)
+
+
+def server_timing(data: dict, **extra) -> str:
+    """
+    Server-Timing 헤더 값 (ms 단위, 예: "vectorize;dur=0.41, encode;dur=1.20").
+    extra: 추적 밖에서 잰 구간 (이름=초)
+    """
+    durations = dict(data["durations"]) if data else {}
+    durations.update(extra)
+    return ", ".join(
+        f"{name};dur={seconds * 1000:.2f}" for name, seconds in durations.items()
+    )
@@ -0,0 +1,119 @@
+# app/services/vectorizer.py
+
+import numpy as np
+
+
+class FeatureVectorizer:
+    """
+    저장된 OneHotEncoder(ohe.pkl) + RobustScaler(scaler.pkl)를 NumPy 연산으로 컴파일한 벡터라이저.
+    - 모든 (업종, 대상설비) 조합의 one-hot 블록을 미리 계산해 두고 인덱스로 조회합니다.
+      알 수 없는 카테고리는 handle_unknown="ignore"와 동일하게 0 블록으로 처리합니다.
+    - 수치 입력은 RobustScaler의 center_/scale_ 배열로 (X - center) / scale 을 계산합니다.
+    결과는 기존 `np.hstack([ohe.transform(...), scaler.transform(...)]).astype("float32")`와
+    비트 단위로 동일합니다.
+    """
+
+    def __init__(self, categories, handle_unknown, dtype, center, scale):
+        if len(categories) != 2:
+            raise ValueError("FeatureVectorizer는 (업종, 대상설비) 2개 범주형 컬럼만 지원합니다.")
+        if handle_unknown not in ("ignore", "error"):
+            raise ValueError(f"지원하지 않는 handle_unknown: {handle_unknown}")
+        self.categories = [list(c) for c in categories]
+        self.handle_unknown = handle_unknown
+        self._index = [{v: i for i, v in enumerate(c)} for c in self.categories]
+        self.center = None if center is None else np.asarray(center, dtype=np.float64)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float64)
+
+        n_ind, n_fac = (len(c) for c in self.categories)
+        self.n_onehot = n_ind + n_fac
+        self.n_numeric = len(self.center if self.center is not None else self.scale)
+        self.n_features = self.n_onehot + self.n_numeric
+
+        # (n_ind + 1) x (n_fac + 1) 조합의 one-hot 블록; 마지막 인덱스는 "알 수 없음"(0 블록)
+        ind_idx, fac_idx = np.meshgrid(
+            np.arange(n_ind + 1), np.arange(n_fac + 1), indexing="ij"
+        )
+        table = np.zeros(((n_ind + 1) * (n_fac + 1), self.n_onehot), dtype=dtype)
+        rows = np.arange(table.shape[0])
+        known_ind = ind_idx.ravel() < n_ind
+        known_fac = fac_idx.ravel() < n_fac
+        table[rows[known_ind], ind_idx.ravel()[known_ind]] = 1
+        table[rows[known_fac], n_ind + fac_idx.ravel()[known_fac]] = 1
+        self._pair_table = table
+        self._n_fac_slots = n_fac + 1
+
+    @classmethod
+    def compile(cls, ohe, scaler):
+        """로드된 sklearn OneHotEncoder / RobustScaler에서 파라미터를 추출합니다."""
+        if getattr(ohe, "drop_idx_", None) is not None:
+            raise ValueError("drop이 설정된 OneHotEncoder는 지원하지 않습니다.")
+        if getattr(ohe, "_infrequent_enabled", False):
+            raise ValueError("infrequent 카테고리가 설정된 OneHotEncoder는 지원하지 않습니다.")
+        if getattr(ohe, "sparse_output", False):
+            raise ValueError("sparse_output=True OneHotEncoder는 지원하지 않습니다.")
+        return cls(
+            categories=ohe.categories_,
+            handle_unknown=ohe.handle_unknown,
+            dtype=ohe.dtype,
+            center=getattr(scaler, "center_", None),
+            scale=getattr(scaler, "scale_", None),
+        )
+
+    def _lookup(self, col: int, value):
+        idx = self._index[col].get(value)
+        if idx is None:
+            if self.handle_unknown == "error":
+                raise ValueError(
+                    f"Found unknown categories [{value!r}] in column {col} during transform"
+                )
+            return len(self.categories[col])
+        return idx
+
+    def transform(self, pairs, numeric) -> np.ndarray:
+        """
+        pairs: [(업종, 대상설비), ...] (n개)
+        numeric: (n, 4) 또는 (4,) 수치 입력 (numeric_cols 순서)
+        반환값: (n, n_features) float32 user_vec 행렬
+        """
+        rows = np.fromiter(
+            (
+                self._lookup(0, industry) * self._n_fac_slots
+                + self._lookup(1, facility)
+                for industry, facility in pairs
+            ),
+            dtype=np.intp,
+            count=len(pairs),
+        )
+        num = np.array(numeric, dtype=np.float64)
+        num = np.broadcast_to(num, (len(pairs), self.n_numeric)).copy()
+        if self.center is not None:
+            num -= self.center
+        if self.scale is not None:
+            num /= self.scale
+        return np.hstack([self._pair_table[rows], num]).astype("float32")
+
+
+def verify_against_sklearn(
+    vectorizer, ohe, scaler, categorical_cols, numeric_cols, seed=0
+):
+    """
+    모든 알려진 (업종, 대상설비) 조합과 알 수 없는 카테고리에 대해
+    sklearn 경로와 결과가 비트 단위로 동일한지 확인합니다.
+    """
+    import pandas as pd
+
+    industries, facilities = vectorizer.categories
+    pairs = [(i, f) for i in industries for f in facilities]
+    if vectorizer.handle_unknown == "ignore":
+        pairs += [("__unknown__", facilities[0]), (industries[0], "__unknown__")]
+    rng = np.random.default_rng(seed)
+    numeric = rng.normal(scale=100.0, size=(len(pairs), vectorizer.n_numeric))
+
+    expected = np.hstack(
+        [
+            ohe.transform(pd.DataFrame(pairs, columns=categorical_cols)),
+            scaler.transform(pd.DataFrame(numeric, columns=numeric_cols)),
+        ]
+    ).astype("float32")
+    actual = vectorizer.transform(pairs, numeric)
+    return expected.shape == actual.shape and expected.tobytes() == actual.tobytes()
@@ -18,3 +18,125 @@ CLUSTERING_DIR = os.getenv(
 
 # OpenAI API 키
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+# OpenAI 호환 API 주소 (비어 있으면 기본 주소, 로컬 테스트 서버 사용 시 예: http://127.0.0.1:9000/v1)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+# /comment에 사용할 채팅 모델
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+# /comment LLM 응답 캐시 (메모리 LRU 항목 수, 0이면 메모리 캐시 비활성화)
+COMMENT_CACHE_SIZE = int(os.getenv("COMMENT_CACHE_SIZE", "512"))
+# 캐시 항목 유효 기간 (초, 0이면 만료 없음)
+COMMENT_CACHE_TTL = float(os.getenv("COMMENT_CACHE_TTL", "604800"))
+# 재시작 후에도 유지되는 SQLite 캐시 파일 경로 (비어 있으면 디스크 캐시를 사용하지 않음)
+COMMENT_CACHE_PATH = os.getenv("COMMENT_CACHE_PATH", "")
+
+# LLM 호출 동시 실행 수와 초당 호출 수 제한 (0이면 제한 없음)
+COMMENT_MAX_CONCURRENCY = int(os.getenv("COMMENT_MAX_CONCURRENCY", "4"))
+COMMENT_RATE_LIMIT = float(os.getenv("COMMENT_RATE_LIMIT", "0"))
+# /comment/batch 관점별 제한 시간 (초, 초과한 관점은 errors로 반환)
+COMMENT_BATCH_TIMEOUT = float(os.getenv("COMMENT_BATCH_TIMEOUT", "60"))
+
+# LLM 클라이언트 연결 풀 크기 (전체 / keep-alive 유지)
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "10"))
+# LLM 연결/읽기 timeout (초, 읽기 timeout은 스트리밍 청크 사이 대기 시간에도 적용)
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "20"))
+# LLM 호출당 전체 제한 시간 (초, 재시도와 백오프 대기 포함)
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "30"))
+# 재시도 가능한 오류(연결 오류, 시간 초과, 429, 5xx)의 최대 재시도 횟수와 지수 백오프 기준/최대 대기 (초)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF", "0.5"))
+LLM_RETRY_BACKOFF_MAX = float(os.getenv("LLM_RETRY_BACKOFF_MAX", "4"))
+# 연속 실패가 LLM_BREAKER_THRESHOLD번이면 LLM_BREAKER_RESET초 동안 호출하지 않고 대체 응답 반환 (0이면 비활성화)
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+
+# 인코더 추론 백엔드 ("keras" | "numpy")
+# numpy: encoder_model.keras의 Dense 가중치를 추출해 NumPy 행렬곱으로 순전파
+ENCODER_BACKEND = os.getenv("ENCODER_BACKEND", "keras")
+# NumPy 인코더와 Keras 출력 간 허용 최대 절대 오차 (초과 시 Keras로 폴백)
+ENCODER_PARITY_ATOL = float(os.getenv("ENCODER_PARITY_ATOL", "1e-4"))
+# .keras 파일에서 NumPy 인코더를 만들 때 Keras 출력과 비교할지 여부 (0이면 TensorFlow를 import하지 않음)
+ENCODER_PARITY_CHECK = os.getenv("ENCODER_PARITY_CHECK", "1") == "1"
+
+# 단일 아티팩트 번들 경로 (python -m app.setting.startup <경로> 로 생성)
+# 설정하면 인코더 가중치, OHE/Scaler 파라미터, latent 벡터, 카탈로그를 번들 하나에서 메모리 매핑으로 읽습니다.
+ARTIFACT_BUNDLE = os.getenv("ARTIFACT_BUNDLE", "")
+# 아티팩트 변경을 확인해 새 모델 버전으로 교체하는 주기 (초, 0이면 POST /model/reload로만 교체)
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "0"))
+# 워커가 붙을 공유 메모리 모델 세그먼트 이름 (gunicorn.conf.py가 설정, 비어 있으면 워커마다 아티팩트를 읽음)
+# gunicorn 마스터가 아티팩트를 한 번 읽어 latent 벡터, 카탈로그 배열, 인코더 가중치, 벡터라이저 파라미터를
+# 공유 메모리에 올리고, 워커는 복사 없이 붙어서 사용합니다.
+SHARED_MODEL = os.getenv("SHARED_MODEL", "")
+
+# 증분 수집(POST /catalog/ingest)한 개선활동 세그먼트 저장 위치
+INGEST_DIR = os.getenv("INGEST_DIR", os.path.join(CLUSTERING_DIR, "segments"))
+# 수집 요청당 최대 행 수
+INGEST_MAX_ROWS = int(os.getenv("INGEST_MAX_ROWS", "10000"))
+# 세그먼트가 INGEST_COMPACT_SEGMENTS개 이상이면 기본 아티팩트에 합칩니다 (INGEST_COMPACT_INTERVAL초마다 확인, 0이면 자동 compaction 안 함)
+INGEST_COMPACT_SEGMENTS = int(os.getenv("INGEST_COMPACT_SEGMENTS", "8"))
+INGEST_COMPACT_INTERVAL = float(os.getenv("INGEST_COMPACT_INTERVAL", "600"))
+
+# latent 유사도 검색 모드 ("exact" | "ivf")
+# ivf: cluster 컬럼을 버킷으로 사용하는 근사 검색 (상위 IVF_NPROBE개 버킷만 스캔)
+SIMILARITY_MODE = os.getenv("SIMILARITY_MODE", "exact")
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
+# latent 벡터 저장소 ("memory" | "mmap")
+# mmap: 정규화된 float32 사본(LATENT_STORE_DIR/latent_vectors.normalized.npy)을 메모리 매핑해
+# 여러 워커가 페이지 캐시를 공유
+LATENT_STORE = os.getenv("LATENT_STORE", "memory")
+LATENT_STORE_DIR = os.getenv("LATENT_STORE_DIR", VEC_DIR)
+# 1차 유사도 계산용 양자화 ("none" | "float16" | "int8"), 상위 k * LATENT_RERANK_FACTOR개는 float32로 재계산
+LATENT_QUANTIZATION = os.getenv("LATENT_QUANTIZATION", "none")
+LATENT_RERANK_FACTOR = float(os.getenv("LATENT_RERANK_FACTOR", "2"))
+
+# 유사도 검색 범위 ("industry" | "industry_facility" | "global")
+# industry: 요청 업종 파티션 안에서만 검색, industry_facility: (업종, 대상설비) 파티션 우선,
+# global: 기존처럼 전체 카탈로그를 검색한 뒤 마지막에 업종 필터 적용
+SEARCH_PARTITION = os.getenv("SEARCH_PARTITION", "industry")
+
+# 엘보우(knee) 탐지에 사용할 유사도 곡선 상위 prefix 길이 (0이면 전체 곡선)
+KNEE_PREFIX = int(os.getenv("KNEE_PREFIX", "2000"))
+
+# 예산/목표 ROI 기간 제약 ("off" | "hard" | "tolerance"), 요청의 constraints 필드로 요청마다 바꿀 수 있음
+# hard: 투자비 ≤ 투자가능금액, 투자비회수기간 ≤ 목표 ROI 기간인 활동만 유사도 검색
+# tolerance: 상한에 (1 + CONSTRAINT_*_TOLERANCE)를 곱해 적용
+RECOMMEND_CONSTRAINTS = os.getenv("RECOMMEND_CONSTRAINTS", "off")
+CONSTRAINT_INVESTMENT_TOLERANCE = float(
+    os.getenv("CONSTRAINT_INVESTMENT_TOLERANCE", "0.2")
+)
+CONSTRAINT_ROI_TOLERANCE = float(os.getenv("CONSTRAINT_ROI_TOLERANCE", "0.2"))
+
+# /recommend 결과 캐시 (RECOMMEND_CACHE_SIZE=0이면 비활성화)
+RECOMMEND_CACHE_SIZE = int(os.getenv("RECOMMEND_CACHE_SIZE", "1024"))
+RECOMMEND_CACHE_TTL = float(os.getenv("RECOMMEND_CACHE_TTL", "600"))
+# 캐시 키 생성 시 투자비/배출량/ROI 기간을 양자화하는 단위
+RECOMMEND_CACHE_QUANTUM = float(os.getenv("RECOMMEND_CACHE_QUANTUM", "0.01"))
+
+# 추천 연산 실행 백엔드 ("thread" | "process")
+RECOMMEND_EXECUTOR = os.getenv("RECOMMEND_EXECUTOR", "thread")
+RECOMMEND_WORKERS = int(os.getenv("RECOMMEND_WORKERS", "4"))
+# 워커 수를 넘어 대기할 수 있는 최대 요청 수 (초과 시 429)
+RECOMMEND_MAX_QUEUE = int(os.getenv("RECOMMEND_MAX_QUEUE", "32"))
+# 요청별 추천 연산 제한 시간 (초, 초과 시 504)
+RECOMMEND_TIMEOUT = float(os.getenv("RECOMMEND_TIMEOUT", "30"))
+
+# 배치 유사도 계산 시 한 번에 만드는 (query x 카탈로그) 행렬 블록의 최대 크기 (bytes)
+SIMILARITY_BLOCK_BYTES = int(os.getenv("SIMILARITY_BLOCK_BYTES", str(64 << 20)))
+
+# /recommend/batch 요청당 최대 요청 수와 제한 시간 (초)
+RECOMMEND_BATCH_MAX_SIZE = int(os.getenv("RECOMMEND_BATCH_MAX_SIZE", "5000"))
+RECOMMEND_BATCH_TIMEOUT = float(os.getenv("RECOMMEND_BATCH_TIMEOUT", "300"))
+
+# /recommend 응답 JSON 인코더 ("json" | "orjson", orjson이 설치되어 있지 않으면 json 사용)
+RECOMMEND_JSON_RESPONSE = os.getenv("RECOMMEND_JSON_RESPONSE", "json")
+
+# 파이프라인 단계별 시간 측정 (/metrics 히스토그램, Server-Timing 헤더, 0이면 비활성화)
+STAGE_TIMING = os.getenv("STAGE_TIMING", "1") == "1"
+
+# 로그 레벨과 형식 ("json": request_id가 포함된 한 줄짜리 JSON, "text": 사람이 읽기 쉬운 한 줄 형식)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# 요청 payload(input_data) 로그를 남길 요청 비율 (0~1, request_id 기준 샘플링)
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
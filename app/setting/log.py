@@ -0,0 +1,158 @@
+# app/setting/log.py
+
+import atexit
+import contextvars
+import datetime
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import uuid
+import zlib
+
+from .config import LOG_FORMAT, LOG_LEVEL, LOG_PAYLOAD_SAMPLE_RATE
+
+# 현재 요청의 ID (RequestIdMiddleware가 설정, 추천 실행기가 워커로 전달)
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+
+# LogRecord 기본 속성 — 이 외의 속성(extra=...)만 JSON 필드로 내보냅니다.
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "asctime",
+    "request_id",
+    "taskName",
+}
+
+_listener = None
+
+
+class RequestIdFilter(logging.Filter):
+    """로그를 남긴 스레드의 request_id를 레코드에 기록합니다 (없으면 "-")."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get() or "-"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄짜리 JSON: ts, level, logger, msg, request_id, extra 필드, exc"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", "-")
+        if request_id != "-":
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 메시지 인자는 나중에 값이 바뀌지 않도록 호출 스레드에서 합치고,
+        # 포맷팅(JSON 직렬화, traceback)과 출력은 리스너 스레드에서 합니다.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT):
+    """
+    루트 로거에 큐 핸들러를 붙입니다 (프로세스당 한 번, 이후 호출은 무시).
+    요청 스레드는 레코드를 큐에 넣기만 하고, 별도 리스너 스레드가 포맷팅과 stderr 출력을 담당합니다.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(
+        JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT)
+    )
+    log_queue = queue.SimpleQueue()
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(handler)
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+    # 종료 시 큐에 남은 로그를 모두 출력합니다.
+    atexit.register(_listener.stop)
+
+
+def payload_sampled() -> bool:
+    """
+    이 요청의 payload 로그를 남길지 여부 (LOG_PAYLOAD_SAMPLE_RATE).
+    request_id 해시로 정하므로 같은 요청의 payload 로그는 모두 남거나 모두 생략됩니다.
+    """
+    rate = LOG_PAYLOAD_SAMPLE_RATE
+    if rate >= 1.0:
+        return True
+    if rate <= 0.0:
+        return False
+    request_id = request_id_var.get()
+    if request_id is None:
+        return random.random() < rate
+    return zlib.crc32(request_id.encode()) / 2**32 < rate
+
+
+def log_payload(logger: logging.Logger, message: str, payload):
+    """INFO가 켜져 있고 샘플링된 요청이면 payload를 extra 필드로 남깁니다."""
+    if logger.isEnabledFor(logging.INFO) and payload_sampled():
+        logger.info(message, extra={"payload": payload})
+
+
+class RequestIdMiddleware:
+    """
+    X-Request-ID 요청 헤더(없으면 새로 생성)를 request_id_var에 두고 응답 헤더로 돌려주는 ASGI 미들웨어.
+    스트리밍 응답도 같은 context에서 실행되므로 끝까지 같은 ID로 기록됩니다.
+    """
+
+    header = b"x-request-id"
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == self.header:
+                request_id = value.decode("latin-1")[:128]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        raw_id = request_id.encode("latin-1")
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((self.header, raw_id))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
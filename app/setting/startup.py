@@ -1,17 +1,439 @@
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import OneHotEncoder, RobustScaler
-from tensorflow.keras.models import load_model
-from .config import VEC_DIR, CLUSTERING_DIR
+from .config import (
+    VEC_DIR,
+    CLUSTERING_DIR,
+    ARTIFACT_BUNDLE,
+    SHARED_MODEL,
+    INGEST_DIR,
+    ENCODER_BACKEND,
+    ENCODER_PARITY_ATOL,
+    ENCODER_PARITY_CHECK,
+    SIMILARITY_MODE,
+    IVF_NPROBE,
+    SEARCH_PARTITION,
+    LATENT_STORE,
+    LATENT_STORE_DIR,
+    LATENT_QUANTIZATION,
+    LATENT_RERANK_FACTOR,
+)
+from ..services import segments
+from ..services.bundle import (
+    attach_shared,
+    attached_segment,
+    publish_shared,
+    read_bundle,
+    read_shared_meta,
+    release_shared,
+    unlink_shared,
+    write_bundle,
+)
+from ..services.encoder import NumpyEncoder, check_parity
+from ..services.catalog import ActivityCatalog, NUMERIC_COLUMNS, STRING_COLUMNS
+from ..services.constraints import ConstraintIndex
+from ..services.latent_store import LatentStore, measure_recall
+from ..services.registry import (
+    ModelBundle,
+    SegmentBundle,
+    model_registry,
+    version_of,
+)
+from ..services.similarity import LatentIndex, PartitionedIndex, normalize_rows
+from ..services.vectorizer import FeatureVectorizer, verify_against_sklearn
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 import joblib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# 준비 상태 (/ready) — 첫 번들이 활성화되면 ready
+ready = False
+load_error = None
+startup_seconds = None
+startup_timings = {}
+_load_lock = threading.Lock()
+# 이 프로세스(gunicorn 마스터)가 공유 메모리에 올린 모델 세그먼트
+_published = None
+# 번들(LatentIndex)별로 SEARCH_PARTITION과 다른 검색 범위 요청에 쓰는 파티션 인덱스
+# (번들이 교체되어 LatentIndex가 사라지면 함께 사라집니다)
+_partition_indexes = weakref.WeakKeyDictionary()
+_partition_lock = threading.Lock()
+
+
+@contextmanager
+def _timed(timings: dict, stage: str):
+    started = time.perf_counter()
+    yield
+    timings[stage] = round(time.perf_counter() - started, 3)
+
+
+def build_model(shared_name: str = SHARED_MODEL) -> ModelBundle:
+    """
+    아티팩트를 읽어 새 ModelBundle을 만듭니다 (활성 번들에는 영향을 주지 않습니다).
+    ARTIFACT_BUNDLE이 있으면 번들 하나에서 인코더 가중치/OHE·Scaler 파라미터/latent 벡터/카탈로그를
+    메모리 매핑으로 읽고, 없으면 VEC_DIR/CLUSTERING_DIR의 개별 파일을 읽습니다.
+    INGEST_DIR의 수집 세그먼트는 기본 latent 저장소/인덱스와 별도로 세그먼트마다 검색 리소스를 만들고,
+    카탈로그는 기본 카탈로그 뒤에 복사 없이 이어 붙입니다.
+    shared_name(SHARED_MODEL)이 있으면 파일 대신 마스터가 게시한 공유 메모리 세그먼트에 붙습니다
+    (수집 세그먼트는 게시할 때 이미 합쳐져 있습니다). 이 경우 번들이 교체되어 사라지면 매핑을 닫습니다.
+    """
+    started = time.perf_counter()
+    timings = {}
+    if shared_name:
+        with _timed(timings, "bundle"):
+            bundle = attach_shared(shared_name)
+        fingerprint = shared_fingerprint(bundle[1])
+    else:
+        # 중단된 compaction이 있으면 아티팩트를 읽기 전에 마저 끝냅니다.
+        segments.recover(INGEST_DIR)
+        fingerprint = artifact_fingerprint(artifact_paths())
+        with _timed(timings, "bundle"):
+            bundle = read_bundle(ARTIFACT_BUNDLE) if ARTIFACT_BUNDLE else None
+    with _timed(timings, "encoder"):
+        encoder, numpy_encoder = load_encoders(bundle)
+    with _timed(timings, "latent_store"):
+        latent_store = load_latent_store(bundle)
+    with _timed(timings, "catalog"):
+        catalog = load_catalog(bundle)
+    with _timed(timings, "index"):
+        latent_index, partition_index, constraint_index = build_indexes(
+            latent_store, catalog
+        )
+    segment_bundles = ()
+    if not shared_name:
+        with _timed(timings, "segments"):
+            catalog, segment_bundles = load_segments(catalog)
+    with _timed(timings, "features"):
+        (
+            ohe,
+            scaler,
+            vectorizer,
+            categorical_cols,
+            numeric_cols,
+        ) = load_feature_transforms(bundle)
+    model = ModelBundle(
+        version=version_of(fingerprint),
+        fingerprint=fingerprint,
+        encoder=encoder,
+        numpy_encoder=numpy_encoder,
+        latent_store=latent_store,
+        latent_index=latent_index,
+        partition_index=partition_index,
+        catalog=catalog,
+        ohe=ohe,
+        scaler=scaler,
+        vectorizer=vectorizer,
+        categorical_cols=categorical_cols,
+        numeric_cols=numeric_cols,
+        constraint_index=constraint_index,
+        segments=segment_bundles,
+        load_seconds=round(time.perf_counter() - started, 3),
+        timings=timings,
+    )
+    if shared_name:
+        weakref.finalize(model, release_shared, attached_segment(shared_name))
+    return model
 
 
 def load_resources():
-    global autoencoder, encoder, latent_vectors, df, ohe, scaler, categorical_cols, numeric_cols
-    autoencoder = load_model(f"{VEC_DIR}/autoencoder_model.keras")
-    encoder = load_model(f"{VEC_DIR}/encoder_model.keras")
-    latent_vectors = np.load(f"{VEC_DIR}/latent_vectors.npy")
-    df = pd.read_parquet(f"{CLUSTERING_DIR}/final_upscaled_with_clusters.parquet")
+    """
+    첫 ModelBundle을 프로세스당 한 번만 만들어 활성화합니다 (이미 활성 번들이 있으면 바로 반환).
+    """
+    global ready, load_error, startup_seconds, startup_timings
+    with _load_lock:
+        if model_registry.current() is not None:
+            return
+        try:
+            model = build_model()
+        except Exception as e:
+            load_error = e
+            raise
+        model_registry.activate(model)
+        startup_seconds = model.load_seconds
+        startup_timings = model.timings
+        load_error = None
+        ready = True
+        logger.info(
+            "Resources loaded in %.2fs (version=%s, bundle=%s, stages=%s)",
+            startup_seconds,
+            model.version,
+            ARTIFACT_BUNDLE or None,
+            startup_timings,
+        )
+
+
+def reload_resources(force: bool = False) -> bool:
+    """
+    아티팩트가 바뀌었으면(force=True면 항상) 새 번들을 만들어 원자적으로 교체합니다.
+    교체되면 True를 반환합니다. 진행 중인 요청은 이전 번들로 끝납니다.
+    """
+    return model_registry.reload(
+        build_model, fingerprint_fn=artifact_fingerprint, force=force
+    )
+
+
+def artifact_paths():
+    """추천에 사용하는 모델 아티팩트 경로 목록 (수집 세그먼트 포함)"""
+    if ARTIFACT_BUNDLE:
+        paths = [ARTIFACT_BUNDLE]
+        if ENCODER_BACKEND != "numpy":
+            paths.append(f"{VEC_DIR}/encoder_model.keras")
+    else:
+        paths = [
+            f"{VEC_DIR}/encoder_model.keras",
+            f"{VEC_DIR}/latent_vectors.npy",
+            f"{VEC_DIR}/ohe.pkl",
+            f"{VEC_DIR}/scaler.pkl",
+            f"{CLUSTERING_DIR}/final_upscaled_with_clusters.parquet",
+        ]
+    for name in segments.segment_names(INGEST_DIR):
+        paths.extend(segments.segment_paths(INGEST_DIR, name))
+    return paths
+
+
+def artifact_fingerprint(paths=None):
+    """
+    아티팩트 파일의 (경로, 수정 시각, 크기) 튜플 — 파일이 바뀌면 값이 달라집니다.
+    공유 메모리 모드(SHARED_MODEL)에서 paths를 생략하면 마스터가 게시한 번들의 값을 반환하므로,
+    워커는 마스터가 다시 게시(HUP)한 뒤에만 새 버전으로 바뀝니다.
+    """
+    if paths is None and SHARED_MODEL:
+        return shared_fingerprint(read_shared_meta(SHARED_MODEL))
+    fingerprint = []
+    for path in artifact_paths() if paths is None else paths:
+        try:
+            st = os.stat(path)
+            fingerprint.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            fingerprint.append((path, None, None))
+    return tuple(fingerprint)
+
+
+def shared_fingerprint(meta: dict) -> tuple:
+    """공유 메모리 번들 메타데이터에 저장된 fingerprint (JSON 리스트 → artifact_fingerprint와 같은 튜플)"""
+    return tuple(tuple(entry) for entry in meta["fingerprint"])
+
+
+def load_keras_encoder():
+    """Keras 인코더 로드 (TensorFlow는 이 시점에 처음 import됩니다)."""
+    from tensorflow.keras.models import load_model
+
+    return load_model(f"{VEC_DIR}/encoder_model.keras")
+
+
+def load_encoders(bundle=None):
+    """
+    (keras_encoder, numpy_encoder)를 반환합니다. 요청 경로에서 쓰이는 쪽만 로드합니다.
+    - ENCODER_BACKEND=keras: Keras 인코더만 로드
+    - ENCODER_BACKEND=numpy: 번들 또는 .keras 아카이브에서 가중치를 읽어 NumPy 인코더를 만듭니다.
+      번들은 패킹 시 Keras와의 일치 여부를 검증했으므로 TensorFlow를 import하지 않습니다.
+      .keras 파일에서 만든 경우 ENCODER_PARITY_CHECK=1이면 Keras 출력과 비교하고,
+      불일치하거나 실패하면 Keras로 폴백합니다.
+    """
+    if ENCODER_BACKEND != "numpy":
+        return load_keras_encoder(), None
+    if bundle is not None:
+        return None, bundle_encoder(*bundle)
+
+    try:
+        np_encoder = NumpyEncoder.from_keras_file(f"{VEC_DIR}/encoder_model.keras")
+    except Exception as e:
+        logger.warning("NumPy encoder unavailable, falling back to Keras: %s", e)
+        return load_keras_encoder(), None
+    if not ENCODER_PARITY_CHECK:
+        logger.info("NumPy encoder enabled (parity check skipped)")
+        return None, np_encoder
+
+    keras_encoder = load_keras_encoder()
+    try:
+        max_diff = check_parity(np_encoder, keras_encoder)
+    except Exception as e:
+        logger.warning("NumPy encoder unavailable, falling back to Keras: %s", e)
+        return keras_encoder, None
+    if max_diff > ENCODER_PARITY_ATOL:
+        logger.warning(
+            "NumPy encoder parity check failed (max_diff=%.2e > %.0e), "
+            "falling back to Keras",
+            max_diff,
+            ENCODER_PARITY_ATOL,
+        )
+        return keras_encoder, None
+    logger.info("NumPy encoder enabled (parity max_diff=%.2e)", max_diff)
+    return keras_encoder, np_encoder
+
+
+def bundle_encoder(arrays, meta):
+    """번들에 저장된 Dense 가중치로 NumPy 인코더를 만듭니다."""
+    layers = []
+    for i, activation in enumerate(meta["encoder_activations"]):
+        layers.append(
+            (arrays[f"encoder/{i}/kernel"], arrays[f"encoder/{i}/bias"], activation)
+        )
+    return NumpyEncoder(layers)
+
+
+def build_indexes(latent_store, catalog):
+    """
+    (LatentIndex, 파티션 인덱스, 예산/ROI 제약 인덱스) — SIMILARITY_MODE / SEARCH_PARTITION 설정으로 만듭니다.
+    제약 인덱스는 요청마다 constraints로 켤 수 있으므로 RECOMMEND_CONSTRAINTS와 관계없이 만듭니다.
+    """
+    latent_index = LatentIndex(
+        latent_store,
+        clusters=catalog.cluster,
+        mode=SIMILARITY_MODE,
+        nprobe=IVF_NPROBE,
+    )
+    partition_index = load_partition_index(latent_index, catalog, SEARCH_PARTITION)
+    return latent_index, partition_index, ConstraintIndex(catalog)
+
+
+def load_segments(catalog):
+    """
+    INGEST_DIR의 수집 세그먼트를 (만든 순서대로) 카탈로그 뒤에 이어 붙이고 세그먼트별 검색 리소스를 만듭니다.
+    기본 latent 저장소와 인덱스는 건드리지 않습니다. 반환값: (SegmentedCatalog 또는 catalog, SegmentBundle 튜플)
+    """
+    bundles = []
+    for name in segments.segment_names(INGEST_DIR):
+        frame, latents = segments.read_segment(INGEST_DIR, name)
+        offset = len(catalog)
+        catalog = catalog.append(frame)
+        bundles.append(build_segment(name, offset, catalog.parts[-1], latents))
+    if bundles:
+        logger.info(
+            "Ingested segments applied: %d segments, %d rows",
+            len(bundles),
+            sum(len(b.catalog) for b in bundles),
+        )
+    return catalog, tuple(bundles)
+
+
+def build_segment(name, offset, catalog, latents):
+    """
+    수집 세그먼트 하나(catalog: 세그먼트 행, latents: 정규화 전 인코더 출력)의 SegmentBundle.
+    비용은 세그먼트 행 수에 비례합니다. latent 벡터는 기본 저장소와 같은 양자화 설정의 메모리 저장소에 두고,
+    세그먼트는 작으므로 SIMILARITY_MODE와 관계없이 exact로 스캔합니다.
+    """
+    latent_store = LatentStore(
+        normalize_rows(latents), LATENT_QUANTIZATION, LATENT_RERANK_FACTOR
+    )
+    latent_index = LatentIndex(latent_store)
+    return SegmentBundle(
+        name=name,
+        offset=offset,
+        latent_store=latent_store,
+        latent_index=latent_index,
+        partition_index=load_partition_index(latent_index, catalog, SEARCH_PARTITION),
+        catalog=catalog,
+        constraint_index=ConstraintIndex(catalog),
+    )
+
+
+def partition_index_for(model, mode):
+    """
+    model(ModelBundle 또는 SegmentBundle)에서 검색 범위 mode에 쓸 파티션 인덱스 (global이면 None).
+    번들에 있는 인덱스와 모드가 다르면 번들마다 한 번만 만들어 재사용합니다 (수집 세그먼트 행은 제외한 기본 카탈로그 기준).
+    """
+    if mode == "global":
+        return None
+    index = model.partition_index
+    if index is not None and index.by_facility == (mode == "industry_facility"):
+        return index
+    with _partition_lock:
+        per_bundle = _partition_indexes.setdefault(model.latent_index, {})
+        if mode not in per_bundle:
+            per_bundle[mode] = load_partition_index(
+                model.latent_index, model.catalog.base, mode
+            )
+        return per_bundle[mode]
+
+
+def load_partition_index(latent_index, catalog, mode):
+    """SEARCH_PARTITION 설정에 맞는 업종(+대상설비) 파티션 인덱스를 만듭니다 (global이면 None)."""
+    if mode == "global":
+        return None
+    if mode not in ("industry", "industry_facility"):
+        raise ValueError(f"Unknown search partition: {mode}")
+    return PartitionedIndex(
+        latent_index.store,
+        catalog.codes["업종"],
+        catalog.codes["대상설비"] if mode == "industry_facility" else None,
+    )
+
+
+def load_latent_store(bundle=None):
+    """LATENT_STORE / LATENT_QUANTIZATION 설정으로 latent 벡터 저장소를 열고 메모리/recall을 기록합니다."""
+    if LATENT_STORE not in ("memory", "mmap"):
+        raise ValueError(f"Unknown latent store: {LATENT_STORE}")
+    if bundle is not None:
+        # 번들에는 이미 정규화된 벡터가 들어 있습니다.
+        vectors = bundle[0]["latent/vectors"]
+        # 공유 메모리 배열은 이미 메모리에 있으므로 파일 매핑일 때만 복사합니다.
+        if LATENT_STORE == "memory" and isinstance(vectors, np.memmap):
+            vectors = np.array(vectors)
+        store = LatentStore(vectors, LATENT_QUANTIZATION, LATENT_RERANK_FACTOR)
+    else:
+        store = LatentStore.open(
+            f"{VEC_DIR}/latent_vectors.npy",
+            mmap=LATENT_STORE == "mmap",
+            cache_dir=LATENT_STORE_DIR,
+            quantization=LATENT_QUANTIZATION,
+            rerank_factor=LATENT_RERANK_FACTOR,
+        )
+    report = store.memory_report()
+    logger.info(
+        "Latent store: %dx%d, mmap=%s, quantization=%s, resident=%d bytes (saved %d of %d)",
+        report["rows"],
+        report["dim"],
+        report["mmap"],
+        report["quantization"],
+        report["resident_bytes"],
+        report["saved_bytes"],
+        report["float32_bytes"],
+    )
+    # recall 측정은 전체 검색을 여러 번 하므로 로그가 남을 때만 계산합니다.
+    if store.quantized and logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Latent store recall@10 vs float32: %.4f", measure_recall(store, k=10)
+        )
+    return store
+
+
+def load_catalog(bundle=None):
+    """개선활동 카탈로그 (번들이 있으면 parquet을 읽지 않고 배열에서 바로 만듭니다)"""
+    if bundle is None:
+        df = pd.read_parquet(f"{CLUSTERING_DIR}/final_upscaled_with_clusters.parquet")
+        return ActivityCatalog.from_dataframe(df)
+    arrays, meta = bundle
+    return ActivityCatalog(
+        numeric={c: arrays[f"catalog/numeric/{c}"] for c in NUMERIC_COLUMNS},
+        codes={c: arrays[f"catalog/codes/{c}"] for c in STRING_COLUMNS},
+        categories=meta["catalog_categories"],
+        cluster=arrays["catalog/cluster"],
+    )
+
+
+def load_feature_transforms(bundle=None):
+    """
+    (ohe, scaler, vectorizer, categorical_cols, numeric_cols)를 반환합니다.
+    번들에서는 저장된 파라미터로 벡터라이저만 만들고 sklearn 객체는 로드하지 않습니다.
+    """
+    if bundle is not None:
+        arrays, meta = bundle
+        params = meta["vectorizer"]
+        compiled = FeatureVectorizer(
+            categories=params["categories"],
+            handle_unknown=params["handle_unknown"],
+            dtype=params["dtype"],
+            center=arrays.get("vectorizer/center"),
+            scale=arrays.get("vectorizer/scale"),
+        )
+        return None, None, compiled, meta["categorical_cols"], meta["numeric_cols"]
 
     ohe = joblib.load(f"{VEC_DIR}/ohe.pkl")  # ← 저장해둔 OHE 그대로 사용
     scaler = joblib.load(f"{VEC_DIR}/scaler.pkl")  # ← 저장해둔 Scaler 그대로 사용
@@ -26,6 +448,157 @@ def load_resources():
     else:
         numeric_cols = ["투자비", "절감액", "투자비회수기간", "온실가스감축량"]
 
+    vectorizer = load_vectorizer(ohe, scaler, categorical_cols, numeric_cols)
+    return ohe, scaler, vectorizer, categorical_cols, numeric_cols
+
+
+def load_vectorizer(ohe, scaler, categorical_cols, numeric_cols):
+    """OHE/Scaler를 NumPy 벡터라이저로 컴파일하고, sklearn 경로와 비트 단위로 일치하는지 검증합니다."""
+    try:
+        compiled = FeatureVectorizer.compile(ohe, scaler)
+        matches = verify_against_sklearn(
+            compiled, ohe, scaler, categorical_cols, numeric_cols
+        )
+    except Exception as e:
+        logger.warning(
+            "Feature vectorizer unavailable, using sklearn transforms: %s", e
+        )
+        return None
+    if not matches:
+        logger.warning(
+            "Feature vectorizer output differs from sklearn, using sklearn transforms"
+        )
+        return None
+    return compiled
+
+
+def bundle_arrays(
+    np_encoder, vectorizer, catalog, vectors, categorical_cols, numeric_cols
+):
+    """번들 형식의 (arrays, meta) — 정규화된 latent 벡터, 인코더 가중치, 카탈로그 컬럼, 벡터라이저 파라미터"""
+    arrays = {"latent/vectors": vectors}
+    for i, (kernel, bias, _) in enumerate(np_encoder.layers):
+        arrays[f"encoder/{i}/kernel"] = kernel
+        arrays[f"encoder/{i}/bias"] = bias
+    for c in NUMERIC_COLUMNS:
+        arrays[f"catalog/numeric/{c}"] = catalog.numeric[c]
+    for c in STRING_COLUMNS:
+        arrays[f"catalog/codes/{c}"] = catalog.codes[c]
+    arrays["catalog/cluster"] = catalog.cluster
+    if vectorizer.center is not None:
+        arrays["vectorizer/center"] = vectorizer.center
+    if vectorizer.scale is not None:
+        arrays["vectorizer/scale"] = vectorizer.scale
+
+    meta = {
+        "encoder_activations": [activation for _, _, activation in np_encoder.layers],
+        "catalog_categories": {
+            c: catalog.categories[c][:-1].tolist() for c in STRING_COLUMNS
+        },
+        "vectorizer": {
+            "categories": vectorizer.categories,
+            "handle_unknown": vectorizer.handle_unknown,
+            "dtype": vectorizer._pair_table.dtype.str,
+        },
+        "categorical_cols": categorical_cols,
+        "numeric_cols": numeric_cols,
+    }
+    return arrays, meta
+
+
+def pack_artifacts(path: str):
+    """
+    개별 아티팩트(.keras, latent_vectors.npy, ohe/scaler.pkl, parquet)를 읽어 단일 번들로 저장합니다.
+    NumPy 인코더와 벡터라이저는 원본(Keras, sklearn)과 일치하는지 검증한 뒤에만 저장합니다.
+    """
+    np_encoder = NumpyEncoder.from_keras_file(f"{VEC_DIR}/encoder_model.keras")
+    max_diff = check_parity(np_encoder, load_keras_encoder())
+    if max_diff > ENCODER_PARITY_ATOL:
+        raise ValueError(f"NumPy encoder parity check failed (max_diff={max_diff:.2e})")
+
+    _, _, vectorizer, categorical_cols, numeric_cols = load_feature_transforms()
+    if vectorizer is None:
+        raise ValueError("Feature vectorizer could not be compiled")
+    arrays, meta = bundle_arrays(
+        np_encoder,
+        vectorizer,
+        load_catalog(),
+        normalize_rows(np.load(f"{VEC_DIR}/latent_vectors.npy")),
+        categorical_cols,
+        numeric_cols,
+    )
+    meta["encoder_parity_max_diff"] = max_diff
+    write_bundle(path, arrays, meta)
+    logger.info("Artifact bundle written to %s", path)
+
+
+def export_shared():
+    """
+    publish_model()이 spawn한 프로세스에서 실행됩니다. 개별 파일(또는 ARTIFACT_BUNDLE)과 수집 세그먼트로
+    모델을 만들어 공유 메모리에 올릴 번들 형식 (arrays, meta)를 반환합니다.
+    """
+    model = build_model(shared_name="")
+    if model.numpy_encoder is None:
+        raise ValueError("공유 메모리 모드에는 NumPy 인코더가 필요합니다 (ENCODER_BACKEND=numpy).")
+    if model.vectorizer is None:
+        raise ValueError("Feature vectorizer could not be compiled")
+    # 수집 세그먼트는 게시하는 번들에 합칩니다 (워커는 세그먼트 파일을 읽지 않음).
+    vectors = [model.latent_store.vectors]
+    vectors += [segment.latent_store.vectors for segment in model.segments]
+    arrays, meta = bundle_arrays(
+        model.numpy_encoder,
+        model.vectorizer,
+        model.catalog,
+        np.concatenate(vectors) if model.segments else np.asarray(vectors[0]),
+        model.categorical_cols,
+        model.numeric_cols,
+    )
+    meta["fingerprint"] = model.fingerprint
+    return arrays, meta
+
+
+def publish_model(name: str = SHARED_MODEL):
+    """
+    아티팩트를 한 번 읽어 공유 메모리 세그먼트 name에 올립니다 (gunicorn 마스터에서 호출).
+    읽기는 spawn한 프로세스에서 하므로 TensorFlow/sklearn/parquet은 마스터에 로드되지 않고,
+    마스터에서 fork되는 워커도 이를 물려받지 않습니다. 이미 게시한 세그먼트가 있으면 교체합니다.
+    """
+    global _published
+    from .log import setup_logging
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=setup_logging,
+    ) as pool:
+        arrays, meta = pool.submit(export_shared).result()
+    if _published is not None:
+        unlink_shared(_published)
+    _published = publish_shared(name, arrays, meta)
+    logger.info(
+        "Shared model published to %s in %.2fs (version=%s, %d bytes)",
+        name,
+        time.perf_counter() - started,
+        version_of(shared_fingerprint(meta)),
+        _published.size,
+    )
+
+
+def unpublish_model():
+    """게시한 공유 메모리 세그먼트를 지웁니다 (gunicorn 마스터 종료 시)."""
+    global _published
+    if _published is not None:
+        unlink_shared(_published)
+        _published = None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .log import setup_logging
 
-# 서버 시작 시 load_resources()를 호출하도록 변경
-load_resources()
+    parser = argparse.ArgumentParser(description="추천 아티팩트 번들 생성")
+    parser.add_argument("output", help="번들 파일 경로 (예: app/data/artifacts.bundle)")
+    setup_logging(fmt="text")
+    pack_artifacts(parser.parse_args().output)
@@ -0,0 +1,360 @@
+# benchmarks/run.py
+"""
+추천 파이프라인 벤치마크.
+카탈로그 크기별로 합성 아티팩트(benchmarks/synthetic.py)를 만들고, 설정이 import 시점에 읽히므로
+크기마다 새 프로세스에서 recommend_improvements, recommend_by_focus, recommend_all,
+recommend_all 결과의 JSON 직렬화(serialize[...]), /recommend(TestClient, 추천 캐시 비활성화)를
+대상설비 수별로 측정합니다.
+
+    python -m benchmarks.run --sizes 1000,100000,1000000 --facilities 1,5,10
+    python -m benchmarks.run --baseline benchmarks/baseline.json   # 임계값을 넘으면 종료 코드 1
+
+ENCODER_BACKEND, SIMILARITY_MODE 같은 환경 변수는 그대로 워커 프로세스에 전달됩니다.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from .synthetic import MANIFEST, facility_names, generate, industry_names
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "benchmarks")
+# /recommend 엔드포인트와 같은 관점별 Top-K
+PER_K = 4
+# 결과에 함께 기록하는 설정 (같은 설정끼리만 비교해야 의미가 있습니다)
+CONFIG_KEYS = (
+    "ENCODER_BACKEND",
+    "SIMILARITY_MODE",
+    "IVF_NPROBE",
+    "LATENT_STORE",
+    "LATENT_QUANTIZATION",
+    "SEARCH_PARTITION",
+    "KNEE_PREFIX",
+    "RECOMMEND_EXECUTOR",
+    "RECOMMEND_WORKERS",
+)
+
+
+def case_key(case: dict) -> str:
+    return f"{case['name']}|rows={case['rows']}|facilities={case['facilities']}"
+
+
+def make_request(industry: str, facilities: list) -> dict:
+    return {
+        "industry": industry,
+        "targetFacilities": facilities,
+        "availableInvestment": 30.0,
+        "currentEmission": 100.0,
+        "targetEmission": 80.0,
+        "targetRoiPeriod": 2.0,
+    }
+
+
+def measure(name: str, rows: int, facilities: int, fn, repeat: int, warmup: int):
+    """fn을 warmup번 실행한 뒤 repeat번 측정합니다 (ms 단위 min/p50/p95/mean)."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples = np.asarray(samples)
+    return {
+        "name": name,
+        "rows": rows,
+        "facilities": facilities,
+        "repeat": repeat,
+        "min_ms": round(float(samples.min()), 4),
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p95_ms": round(float(np.percentile(samples, 95)), 4),
+        "mean_ms": round(float(samples.mean()), 4),
+    }
+
+
+def serializers() -> dict:
+    """
+    /recommend 응답 직렬화 방식별 함수 (추천 결과 dict → 응답 바이트).
+    pydantic: 이전의 response_model=Dict[str, List[Dict]] 경로 (검증 + JSON 모드 변환 + json.dumps)
+    """
+    from typing import Dict, List
+
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+
+    from app.services.serialization import response_class
+
+    adapter = TypeAdapter(Dict[str, List[Dict]])
+
+    def pydantic_path(result):
+        value = adapter.validate_python(result)
+        return JSONResponse(adapter.dump_python(value, mode="json")).body
+
+    fns = {"pydantic": pydantic_path}
+    for name in ("json", "orjson"):
+        cls = response_class(name)
+        if name == "json" or cls.__name__ == "ORJSONResponse":
+            fns[name] = lambda result, cls=cls: cls(result).body
+    return fns
+
+
+def run_worker(data_dir: str, facility_counts: list, repeat: int, warmup: int) -> dict:
+    """
+    (워커 프로세스) data_dir의 아티팩트로 모델을 로드해 측정합니다.
+    VEC_DIR/CLUSTERING_DIR은 부모 프로세스가 환경 변수로 지정합니다.
+    """
+    import logging
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.services import inference
+    from app.services.ranking import FOCUSES
+    from app.services.registry import model_registry
+    from app.setting import config
+    from app.setting.startup import load_resources
+
+    # 요청마다 남기는 INFO 로그가 측정을 지배하지 않도록 합니다.
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with open(os.path.join(data_dir, MANIFEST), encoding="utf-8") as f:
+        spec = json.load(f)["spec"]
+    rows = spec["rows"]
+    industry = industry_names(spec["industries"])[0]
+    pool = facility_names(spec["facilities"])
+
+    load_resources()
+    model = model_registry.current()
+    encoders = serializers()
+    cases = []
+    with TestClient(app) as client:
+        while client.get("/ready").status_code != 200:
+            time.sleep(0.1)
+        for n in facility_counts:
+            request = make_request(industry, [pool[i % len(pool)] for i in range(n)])
+
+            def improvements():
+                return inference.recommend_improvements(
+                    request, per_k=PER_K, model=model
+                )
+
+            def route():
+                client.post("/recommend", json=request).raise_for_status()
+
+            cases.append(
+                measure("recommend_improvements", rows, n, improvements, repeat, warmup)
+            )
+            cand_df = improvements()
+            for focus in FOCUSES:
+                cases.append(
+                    measure(
+                        f"recommend_by_focus[{focus}]",
+                        rows,
+                        n,
+                        lambda: inference.recommend_by_focus(cand_df, focus, PER_K),
+                        repeat,
+                        warmup,
+                    )
+                )
+            cases.append(
+                measure(
+                    "recommend_all",
+                    rows,
+                    n,
+                    lambda: inference.recommend_all(request, PER_K, model=model),
+                    repeat,
+                    warmup,
+                )
+            )
+            result = inference.recommend_all(request, PER_K, model=model)
+            for name, encode in encoders.items():
+                cases.append(
+                    measure(
+                        f"serialize[{name}]",
+                        rows,
+                        n,
+                        lambda: encode(result),
+                        repeat,
+                        warmup,
+                    )
+                )
+            cases.append(measure("route:/recommend", rows, n, route, repeat, warmup))
+
+    return {
+        "rows": rows,
+        "load_seconds": model.load_seconds,
+        "load_timings": model.timings,
+        "config": {key: getattr(config, key) for key in CONFIG_KEYS},
+        "cases": cases,
+    }
+
+
+def run_size(
+    rows: int, facility_counts: list, repeat: int, warmup: int, data_root: str
+) -> dict:
+    """합성 아티팩트를 준비하고 새 프로세스에서 측정합니다."""
+    data_dir = os.path.join(data_root, str(rows))
+    manifest = generate(data_dir, rows)
+    env = dict(
+        os.environ,
+        VEC_DIR=data_dir,
+        CLUSTERING_DIR=data_dir,
+        LATENT_STORE_DIR=data_dir,
+        ARTIFACT_BUNDLE="",
+        MODEL_RELOAD_INTERVAL="0",
+        # /recommend도 매번 계산하도록 결과 캐시를 끕니다.
+        RECOMMEND_CACHE_SIZE="0",
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "result.json")
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.run",
+                "--worker",
+                data_dir,
+                "--worker-output",
+                output,
+                "--facilities",
+                ",".join(map(str, facility_counts)),
+                "--repeat",
+                str(repeat),
+                "--warmup",
+                str(warmup),
+            ],
+            cwd=ROOT,
+            env=env,
+            check=True,
+        )
+        with open(output, encoding="utf-8") as f:
+            result = json.load(f)
+    result["generate_seconds"] = manifest.get("generate_seconds")
+    return result
+
+
+def load_thresholds(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def find_regressions(results: dict, baseline: dict, thresholds: dict) -> list:
+    """
+    baseline과 같은 케이스(이름/행 수/대상설비 수)끼리 thresholds["metric"]을 비교합니다.
+    현재 값이 baseline x 허용 비율을 넘고, 차이가 min_delta_ms 이상이면 회귀로 봅니다.
+    """
+    metric = thresholds.get("metric", "p50_ms")
+    default_ratio = thresholds.get("default_max_ratio", 1.25)
+    min_delta = thresholds.get("min_delta_ms", 0.5)
+    ratios = thresholds.get("cases", {})
+    before = {case_key(c): c for c in baseline.get("cases", [])}
+
+    regressions = []
+    for case in results["cases"]:
+        base = before.get(case_key(case))
+        if base is None:
+            continue
+        limit = ratios.get(case["name"].split("[")[0], default_ratio)
+        current, previous = case[metric], base[metric]
+        if current > previous * limit and current - previous >= min_delta:
+            regressions.append(
+                {
+                    "case": case_key(case),
+                    "metric": metric,
+                    "baseline": previous,
+                    "current": current,
+                    "ratio": round(current / previous, 3) if previous else None,
+                    "max_ratio": limit,
+                }
+            )
+    return regressions
+
+
+def print_table(cases: list):
+    print(f"{'case':<58} {'p50 ms':>10} {'p95 ms':>10}")
+    for case in cases:
+        print(f"{case_key(case):<58} {case['p50_ms']:>10.3f} {case['p95_ms']:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추천 파이프라인 벤치마크")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="카탈로그 행 수 목록")
+    parser.add_argument("--facilities", default="1,5,10", help="요청 대상설비 수 목록")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument(
+        "--data-dir",
+        default=os.path.join(BENCH_DIR, ".data"),
+        help="합성 아티팩트 저장 위치 (크기별로 재사용)",
+    )
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results.json"))
+    parser.add_argument("--baseline", help="비교할 이전 결과 파일")
+    parser.add_argument(
+        "--thresholds", default=os.path.join(BENCH_DIR, "thresholds.json")
+    )
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    facility_counts = [int(n) for n in args.facilities.split(",")]
+
+    if args.worker:
+        result = run_worker(args.worker, facility_counts, args.repeat, args.warmup)
+        with open(args.worker_output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        return 0
+
+    sizes = {}
+    cases = []
+    for rows in (int(n) for n in args.sizes.split(",")):
+        result = run_size(
+            rows, facility_counts, args.repeat, args.warmup, args.data_dir
+        )
+        cases.extend(result.pop("cases"))
+        sizes[str(rows)] = result
+
+    results = {
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "per_k": PER_K,
+        "repeat": args.repeat,
+        "warmup": args.warmup,
+        "sizes": sizes,
+        "cases": cases,
+    }
+    print_table(cases)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        thresholds = load_thresholds(args.thresholds)
+        results["baseline"] = args.baseline
+        results["thresholds"] = thresholds
+        results["regressions"] = find_regressions(results, baseline, thresholds)
+        for r in results["regressions"]:
+            print(
+                f"REGRESSION {r['case']}: {r['metric']} {r['baseline']} -> {r['current']} "
+                f"(x{r['ratio']}, max x{r['max_ratio']})"
+            )
+        status = 1 if results["regressions"] else 0
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"results written to {args.output}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
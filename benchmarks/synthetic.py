@@ -0,0 +1,147 @@
+# benchmarks/synthetic.py
+"""
+벤치마크용 합성 아티팩트 생성기.
+VEC_DIR/CLUSTERING_DIR과 같은 파일 구성(encoder_model.keras, latent_vectors.npy, ohe.pkl,
+scaler.pkl, final_upscaled_with_clusters.parquet)을 원하는 카탈로그 크기로 만듭니다.
+
+    python -m benchmarks.synthetic benchmarks/.data/100000 --rows 100000
+"""
+
+import argparse
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+CATEGORICAL_COLS = ["업종", "대상설비"]
+# 실제 scaler.pkl과 같은 컬럼 순서
+NUMERIC_COLS = ["투자비", "절감액", "온실가스감축량", "투자비회수기간"]
+IMPROVEMENT_TYPES = ["기타설비보완", "고효율기기교체", "운전방법개선", "폐열회수"]
+MANIFEST = "synthetic.json"
+
+
+def industry_names(n: int) -> list:
+    return [f"업종{i:02d}" for i in range(n)]
+
+
+def facility_names(n: int) -> list:
+    return [f"설비{i:02d}" for i in range(n)]
+
+
+def build_catalog(
+    rows: int, industries: int, facilities: int, seed: int
+) -> pd.DataFrame:
+    """업종/대상설비/cluster 컬럼을 가진 카탈로그 (약 30%는 노이즈 cluster -1)"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "개선활동명_요약": [f"활동 {i % 997}" for i in range(rows)],
+            "업종": rng.choice(industry_names(industries), rows),
+            "대상설비": rng.choice(facility_names(facilities), rows),
+            "개선구분": rng.choice(IMPROVEMENT_TYPES, rows),
+            "투자비": np.round(rng.lognormal(3.0, 1.0, rows), 1),
+            "절감액": np.round(rng.lognormal(2.5, 1.0, rows), 1),
+            "투자비회수기간": np.round(rng.lognormal(0.5, 0.6, rows), 1),
+            "온실가스감축량": np.round(rng.lognormal(2.5, 1.0, rows), 1),
+        }
+    )
+    clusters = rng.integers(0, max(1, rows // 20), rows)
+    df["cluster"] = np.where(rng.random(rows) < 0.3, -1, clusters)
+    return df
+
+
+def build_encoder(input_dim: int, latent_dim: int, seed: int):
+    """실제 인코더와 같은 Dense 구조 (input → 128 → 64 → latent)의 학습하지 않은 모델"""
+    import keras
+
+    keras.utils.set_random_seed(seed)
+    inputs = keras.Input(shape=(input_dim,), name="encoder_input")
+    x = keras.layers.Dense(128, activation="relu")(inputs)
+    x = keras.layers.Dense(64, activation="relu")(x)
+    outputs = keras.layers.Dense(latent_dim, name="latent_vector")(x)
+    return keras.Model(inputs, outputs, name="encoder")
+
+
+def generate(
+    out_dir: str,
+    rows: int,
+    industries: int = 13,
+    facilities: int = 23,
+    latent_dim: int = 64,
+    seed: int = 0,
+) -> dict:
+    """
+    out_dir에 합성 아티팩트를 만들고 manifest(dict)를 반환합니다.
+    같은 설정으로 이미 만든 디렉토리가 있으면 다시 만들지 않습니다.
+    """
+    from sklearn.preprocessing import OneHotEncoder, RobustScaler
+
+    spec = {
+        "rows": rows,
+        "industries": industries,
+        "facilities": facilities,
+        "latent_dim": latent_dim,
+        "seed": seed,
+    }
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("spec") == spec:
+            return manifest
+
+    started = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    df = build_catalog(rows, industries, facilities, seed)
+
+    ohe = OneHotEncoder(handle_unknown="ignore", sparse_output=False)
+    ohe.fit(df[CATEGORICAL_COLS])
+    scaler = RobustScaler()
+    scaler.fit(df[NUMERIC_COLS])
+    features = np.hstack(
+        [ohe.transform(df[CATEGORICAL_COLS]), scaler.transform(df[NUMERIC_COLS])]
+    ).astype("float32")
+
+    encoder = build_encoder(features.shape[1], latent_dim, seed)
+    latents = encoder.predict(features, batch_size=8192, verbose=0).astype("float32")
+
+    encoder.save(os.path.join(out_dir, "encoder_model.keras"))
+    np.save(os.path.join(out_dir, "latent_vectors.npy"), latents)
+    joblib.dump(ohe, os.path.join(out_dir, "ohe.pkl"))
+    joblib.dump(scaler, os.path.join(out_dir, "scaler.pkl"))
+    df.to_parquet(os.path.join(out_dir, "final_upscaled_with_clusters.parquet"))
+
+    manifest = {
+        "spec": spec,
+        "generate_seconds": round(time.perf_counter() - started, 3),
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="벤치마크용 합성 아티팩트 생성")
+    parser.add_argument("out_dir")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--industries", type=int, default=13)
+    parser.add_argument("--facilities", type=int, default=23)
+    parser.add_argument("--latent-dim", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(
+        json.dumps(
+            generate(
+                args.out_dir,
+                args.rows,
+                args.industries,
+                args.facilities,
+                args.latent_dim,
+                args.seed,
+            ),
+            ensure_ascii=False,
+        )
+    )
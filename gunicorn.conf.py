@@ -0,0 +1,51 @@
+# gunicorn.conf.py
+"""
+여러 uvicorn 워커로 서버를 실행하는 gunicorn 설정.
+마스터가 아티팩트를 한 번 읽어 공유 메모리(SHARED_MODEL)에 올리고, 워커는 복사 없이 붙어서 사용합니다.
+
+    gunicorn app.main:app -c gunicorn.conf.py
+    WEB_CONCURRENCY=8 gunicorn app.main:app -c gunicorn.conf.py
+    SHARED_MODEL= gunicorn app.main:app -c gunicorn.conf.py    # 공유하지 않고 워커마다 아티팩트를 읽음
+
+아티팩트 변경이나 CLI로 수집/compaction한 세그먼트는 `kill -HUP <마스터 pid>`로 반영합니다
+(마스터가 다시 게시한 뒤 워커를 새로 띄우고, 이전 워커는 진행 중인 요청을 마친 뒤 종료됩니다).
+"""
+
+import os
+
+# app 모듈을 import하기 전에 설정해야 마스터와 마스터에서 fork되는 워커의 설정에 반영됩니다.
+os.environ.setdefault("SHARED_MODEL", f"esg-model-{os.getpid()}")
+# 워커가 TensorFlow 없이 공유 메모리의 인코더 가중치로 추론하도록 NumPy 인코더를 기본으로 사용합니다.
+os.environ.setdefault("ENCODER_BACKEND", "numpy")
+
+from app.setting import startup  # noqa: E402
+from app.setting.config import SHARED_MODEL  # noqa: E402
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+# 워커는 마스터가 게시한 세그먼트에 붙으므로 앱을 마스터에 미리 로드하지 않습니다.
+preload_app = False
+
+
+def on_starting(server):
+    if SHARED_MODEL:
+        startup.publish_model(SHARED_MODEL)
+        server.log.info("Shared model published to %s", SHARED_MODEL)
+
+
+def on_reload(server):
+    if not SHARED_MODEL:
+        return
+    try:
+        startup.publish_model(SHARED_MODEL)
+        server.log.info("Shared model republished to %s", SHARED_MODEL)
+    except Exception:
+        # 실패하면 기존 세그먼트를 그대로 두므로 새 워커도 이전 버전으로 뜹니다.
+        server.log.exception("Shared model republish failed; keeping the previous one")
+
+
+def on_exit(server):
+    startup.unpublish_model()
@@ -0,0 +1,99 @@
+# tests/test_comment_cache.py
+"""
+CommentCache.get_or_generate의 중복 호출 합치기 (같은 키의 동시 요청은 LLM을 한 번만 호출).
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.comment_cache import CommentCache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_coalesces_concurrent_requests():
+    cache = CommentCache(maxsize=8)
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"comment": "ok"}
+
+    async def main():
+        return await asyncio.gather(
+            *(cache.get_or_generate("k", generate) for _ in range(3))
+        )
+
+    results = run(main())
+    assert [value for value, _ in results] == [{"comment": "ok"}] * 3
+    assert len(calls) == 1
+    assert cache.coalesced == 2
+    assert run(cache.get_or_generate("k", generate)) == ({"comment": "ok"}, "memory")
+
+
+def test_failure_is_shared_and_not_stored():
+    cache = CommentCache(maxsize=8)
+
+    async def generate():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("llm down")
+
+    async def main():
+        return await asyncio.gather(
+            cache.get_or_generate("k", generate),
+            cache.get_or_generate("k", generate),
+            return_exceptions=True,
+        )
+
+    results = run(main())
+    assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+    assert "k" not in cache._entries
+
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    # /comment/batch의 관점 호출이 wait_for 시간 초과로 취소돼도 같은 항목의 /comment 요청은 코멘트를 받아야 합니다.
+    cache = CommentCache(maxsize=8)
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"comment": "ok"}
+
+    async def main():
+        leader = asyncio.ensure_future(
+            asyncio.wait_for(cache.get_or_generate("k", generate), 0.01)
+        )
+        while "k" not in cache._inflight:
+            await asyncio.sleep(0)
+        follower = asyncio.ensure_future(cache.get_or_generate("k", generate))
+        return await asyncio.gather(leader, follower, return_exceptions=True)
+
+    leader, follower = run(main())
+    assert isinstance(leader, asyncio.TimeoutError)
+    assert follower == ({"comment": "ok"}, "miss")
+    assert len(calls) == 2
+    assert cache._entries["k"][1] == {"comment": "ok"}
+    assert not cache._inflight
+
+
+def test_cancelled_waiter_does_not_cancel_leader():
+    cache = CommentCache(maxsize=8)
+
+    async def generate():
+        await asyncio.sleep(0.05)
+        return {"comment": "ok"}
+
+    async def main():
+        leader = asyncio.ensure_future(cache.get_or_generate("k", generate))
+        while "k" not in cache._inflight:
+            await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(cache.get_or_generate("k", generate), 0.01)
+        return await leader
+
+    assert run(main()) == ({"comment": "ok"}, "miss")
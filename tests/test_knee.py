@@ -0,0 +1,63 @@
+# tests/test_knee.py
+"""
+inference.find_knee와 kneed.KneeLocator(convex, decreasing)의 결과 비교.
+fixtures/knee_curves.npz는 tools/record_knee_curves.py로 기록한 실제 검색 경로의 유사도 곡선입니다.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from app.services.inference import find_knee
+
+kneed = pytest.importorskip("kneed")
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def kneed_knee(y, S: float = 1.0):
+    ranks = np.arange(1, len(y) + 1)
+    knee = kneed.KneeLocator(ranks, y, S=S, curve="convex", direction="decreasing").knee
+    return None if knee is None else int(knee)
+
+
+def recorded_curves():
+    with np.load(os.path.join(FIXTURES, "knee_curves.npz")) as data:
+        return {name: data[name] for name in data.files}
+
+
+CURVES = recorded_curves()
+
+
+@pytest.mark.parametrize("name", sorted(CURVES))
+def test_matches_kneed_on_recorded_curves(name):
+    y = CURVES[name]
+    assert find_knee(y) == kneed_knee(y)
+
+
+@pytest.mark.parametrize("prefix", [50, 200, 1000])
+def test_matches_kneed_on_prefixes(prefix):
+    # 추천 경로는 곡선 앞쪽 KNEE_PREFIX개만 사용합니다.
+    for name, y in CURVES.items():
+        assert find_knee(y[:prefix]) == kneed_knee(y[:prefix]), name
+
+
+@pytest.mark.parametrize("S", [0.5, 2.0])
+def test_matches_kneed_with_sensitivity(S):
+    for name, y in CURVES.items():
+        assert find_knee(y, S=S) == kneed_knee(y, S=S), name
+
+
+@pytest.mark.parametrize(
+    "y",
+    [
+        np.array([0.9]),
+        np.array([0.9, 0.9, 0.9]),
+        np.array([0.9, 0.5]),
+        np.linspace(0.9, 0.1, 50),
+        np.array([1.0, 0.5, 0.3, 0.2, 0.15, 0.12, 0.1, 0.09, 0.085, 0.08]),
+    ],
+)
+def test_edge_curves(y):
+    assert find_knee(y) == kneed_knee(y)
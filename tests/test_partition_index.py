@@ -0,0 +1,47 @@
+# tests/test_partition_index.py
+"""
+PartitionedIndex의 동점 순서: 파티션 검색 결과는 같은 행을 전체 검색한 결과와 순서가 같아야 합니다.
+"""
+
+import numpy as np
+import pytest
+
+from app.services.latent_store import LatentStore
+from app.services.similarity import PartitionedIndex, normalize_rows, select_top_k
+
+# 업종 0에는 대상설비 1, 0이 섞여 있고 (업종 0, 대상설비 2) 파티션은 없습니다.
+INDUSTRY = np.array([0, 1, 0, 0, 1, 0, 0, 1])
+FACILITY = np.array([1, 0, 0, 1, 0, 0, 1, 0])
+
+
+def store_with_ties():
+    # 모든 행이 같은 벡터라 유사도가 전부 동점입니다.
+    vectors = normalize_rows(np.ones((INDUSTRY.size, 4), dtype=np.float32))
+    return LatentStore(vectors, "none")
+
+
+def reference(query, rows, k):
+    sims = (store_with_ties().vectors @ normalize_rows(query)[0])[rows]
+    return rows[select_top_k(sims, k)]
+
+
+@pytest.mark.parametrize("by_facility", [False, True])
+def test_industry_partition_ties_match_scan(by_facility):
+    index = PartitionedIndex(
+        store_with_ties(), INDUSTRY, FACILITY if by_facility else None
+    )
+    query = np.ones((1, 4), dtype=np.float32)
+    key = index.resolve(0, 2)
+    assert key == (0, None)
+    ((row_ids, _),) = index.top_k_batch(query, [key], 3)
+    np.testing.assert_array_equal(
+        row_ids, reference(query, np.flatnonzero(INDUSTRY == 0), 3)
+    )
+
+
+def test_facility_partition_ties_match_scan():
+    index = PartitionedIndex(store_with_ties(), INDUSTRY, FACILITY)
+    query = np.ones((1, 4), dtype=np.float32)
+    ((row_ids, _),) = index.top_k_batch(query, [index.resolve(0, 1)], 2)
+    rows = np.flatnonzero((INDUSTRY == 0) & (FACILITY == 1))
+    np.testing.assert_array_equal(row_ids, reference(query, rows, 2))
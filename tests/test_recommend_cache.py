@@ -0,0 +1,164 @@
+# tests/test_recommend_cache.py
+"""
+RecommendationCache.get_or_compute의 조회/저장, LRU 제거, 같은 키 동시 요청 합치기와 취소 처리.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.cache import RecommendationCache
+
+REQUEST = {
+    "industry": "철강",
+    "targetFacilities": ["보일러", "동력설비"],
+    "availableInvestment": 30.0,
+    "currentEmission": 100.0,
+    "targetEmission": 80.0,
+    "targetRoiPeriod": 2.0,
+}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def request(**changes):
+    return dict(REQUEST, **changes)
+
+
+class Compute:
+    """호출 횟수를 세는 compute (delay초 뒤 value 반환)"""
+
+    def __init__(self, value="result", delay: float = 0.0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+def test_miss_then_hit():
+    cache = RecommendationCache(maxsize=4)
+    compute = Compute()
+    assert run(cache.get_or_compute(REQUEST, 4, compute)) == "result"
+    # 대상설비 순서와 quantum 미만의 차이는 같은 키
+    same = request(targetFacilities=["동력설비", "보일러"], availableInvestment=30.001)
+    assert run(cache.get_or_compute(same, 4, compute)) == "result"
+    assert compute.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_includes_per_k_and_version():
+    cache = RecommendationCache(maxsize=4)
+    compute = Compute()
+    run(cache.get_or_compute(REQUEST, 4, compute, version="v1"))
+    run(cache.get_or_compute(REQUEST, 5, compute, version="v1"))
+    run(cache.get_or_compute(REQUEST, 4, compute, version="v2"))
+    assert compute.calls == 3
+
+
+def test_expired_entry_is_recomputed():
+    cache = RecommendationCache(maxsize=4, ttl=0.0)
+    compute = Compute()
+    run(cache.get_or_compute(REQUEST, 4, compute))
+    run(cache.get_or_compute(REQUEST, 4, compute))
+    assert compute.calls == 2
+
+
+def test_evicts_least_recently_used():
+    cache = RecommendationCache(maxsize=2)
+    compute = Compute()
+    a, b, c = (request(industry=name) for name in ("a", "b", "c"))
+    run(cache.get_or_compute(a, 4, compute))
+    run(cache.get_or_compute(b, 4, compute))
+    run(cache.get_or_compute(a, 4, compute))  # a가 가장 최근
+    run(cache.get_or_compute(c, 4, compute))  # b 제거
+    assert cache.evictions == 1
+    assert compute.calls == 3
+    run(cache.get_or_compute(a, 4, compute))
+    assert compute.calls == 3
+    run(cache.get_or_compute(b, 4, compute))
+    assert compute.calls == 4
+
+
+def test_disabled_cache_always_computes():
+    cache = RecommendationCache(maxsize=0)
+    compute = Compute()
+    run(cache.get_or_compute(REQUEST, 4, compute))
+    run(cache.get_or_compute(REQUEST, 4, compute))
+    assert compute.calls == 2
+    assert cache.stats()["size"] == 0
+
+
+def test_coalesces_concurrent_requests():
+    cache = RecommendationCache(maxsize=4)
+    compute = Compute(delay=0.01)
+
+    async def main():
+        return await asyncio.gather(
+            *(cache.get_or_compute(REQUEST, 4, compute) for _ in range(3))
+        )
+
+    assert run(main()) == ["result"] * 3
+    assert compute.calls == 1
+    assert (cache.misses, cache.coalesced) == (1, 2)
+
+
+def test_failure_is_shared_and_not_stored():
+    cache = RecommendationCache(maxsize=4)
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            cache.get_or_compute(REQUEST, 4, compute),
+            cache.get_or_compute(REQUEST, 4, compute),
+            return_exceptions=True,
+        )
+
+    assert [type(r) for r in run(main())] == [RuntimeError, RuntimeError]
+    assert cache.stats()["size"] == 0
+    assert not cache._inflight
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    cache = RecommendationCache(maxsize=4)
+    compute = Compute(delay=0.05)
+
+    async def main():
+        leader = asyncio.ensure_future(cache.get_or_compute(REQUEST, 4, compute))
+        while not cache._inflight:
+            await asyncio.sleep(0)
+        follower = asyncio.ensure_future(cache.get_or_compute(REQUEST, 4, compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert run(main()) == "result"
+    assert compute.calls == 2
+    assert cache.stats()["size"] == 1
+    assert not cache._inflight
+
+
+def test_cancelled_follower_does_not_cancel_leader():
+    cache = RecommendationCache(maxsize=4)
+    compute = Compute(delay=0.05)
+
+    async def main():
+        leader = asyncio.ensure_future(cache.get_or_compute(REQUEST, 4, compute))
+        while not cache._inflight:
+            await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(cache.get_or_compute(REQUEST, 4, compute), 0.01)
+        return await leader
+
+    assert run(main()) == "result"
+    assert compute.calls == 1
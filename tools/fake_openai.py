@@ -0,0 +1,137 @@
+# tools/fake_openai.py
+"""
+로컬 테스트용 OpenAI 호환 chat completions 서버.
+/comment, /comment/stream을 실제 API 없이 확인할 때 사용합니다.
+
+    python tools/fake_openai.py --port 9000 --latency 0.5 --token-delay 0.02
+    python tools/fake_openai.py --port 9000 --latency 1.2 --latency-dist lognormal --error-rate 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:9000/v1 OPENAI_API_KEY=test uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI(title="Fake OpenAI")
+
+# 명령행 인자로 바꿀 수 있는 응답 설정
+settings = {
+    "latency": 0.0,  # 첫 토큰(비스트리밍이면 전체 응답)까지 평균 지연 (초)
+    "latency_dist": "fixed",  # 지연 분포: fixed | uniform(0~2배) | exponential | lognormal
+    "latency_sigma": 0.5,  # lognormal 분포의 sigma (클수록 꼬리가 김)
+    "token_delay": 0.0,  # 스트리밍 청크 사이 지연 (초)
+    "chunk_chars": 4,  # 스트리밍 청크 하나의 글자 수
+    "error_rate": 0.0,  # error_status 오류로 응답할 확률
+    "error_status": 500,  # 오류 응답 상태 코드 (예: 429, 503)
+}
+
+LATENCY_DISTS = ("fixed", "uniform", "exponential", "lognormal")
+
+COMMENT = {
+    "top1": '**설비 특성과 중소기업의 현실적 상황**\n- 테스트 응답입니다. "따옴표"와 \\ 백슬래시를 포함합니다.\n\n'
+    "**투자 부담, 실행 가능성, 기대 효과**\n- 투자비 1.5 (백만원)\n\n"
+    "**조건 불충족 시에도 전략적 가치**\n- 설명",
+    "comparison": "- **Top 1**: 설명\n- **Top 2**: 설명\n- **Top 3**: 설명\n- **Top 4**: 설명\n\n전체 요약 문단입니다.",
+}
+
+
+def sample_latency() -> float:
+    """settings의 분포에서 뽑은 응답 지연 (평균이 latency가 되도록 맞춥니다)."""
+    mean = settings["latency"]
+    dist = settings["latency_dist"]
+    if mean <= 0 or dist == "fixed":
+        return max(mean, 0.0)
+    if dist == "uniform":
+        return random.uniform(0.0, 2 * mean)
+    if dist == "exponential":
+        return random.expovariate(1 / mean)
+    sigma = settings["latency_sigma"]
+    return random.lognormvariate(math.log(mean) - sigma**2 / 2, sigma)
+
+
+def _chunk(model: str, delta: dict, finish_reason=None) -> str:
+    payload = {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "fake")
+    if random.random() < settings["error_rate"]:
+        return JSONResponse(
+            status_code=settings["error_status"],
+            content={"error": {"message": "fake failure", "type": "server_error"}},
+        )
+
+    content = json.dumps(COMMENT, ensure_ascii=False)
+    await asyncio.sleep(sample_latency())
+
+    if not body.get("stream"):
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    async def events():
+        yield _chunk(model, {"role": "assistant", "content": ""})
+        size = max(1, settings["chunk_chars"])
+        for start in range(0, len(content), size):
+            yield _chunk(model, {"content": content[start : start + size]})
+            await asyncio.sleep(settings["token_delay"])
+        yield _chunk(model, {}, finish_reason="stop")
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="OpenAI 호환 테스트 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=settings["latency"])
+    parser.add_argument(
+        "--latency-dist", choices=LATENCY_DISTS, default=settings["latency_dist"]
+    )
+    parser.add_argument(
+        "--latency-sigma", type=float, default=settings["latency_sigma"]
+    )
+    parser.add_argument("--token-delay", type=float, default=settings["token_delay"])
+    parser.add_argument("--chunk-chars", type=int, default=settings["chunk_chars"])
+    parser.add_argument("--error-rate", type=float, default=settings["error_rate"])
+    parser.add_argument("--error-status", type=int, default=settings["error_status"])
+    args = parser.parse_args()
+    settings.update(
+        latency=args.latency,
+        latency_dist=args.latency_dist,
+        latency_sigma=args.latency_sigma,
+        error_status=args.error_status,
+        token_delay=args.token_delay,
+        chunk_chars=args.chunk_chars,
+        error_rate=args.error_rate,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
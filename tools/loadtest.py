@@ -0,0 +1,450 @@
+# tools/loadtest.py
+"""
+로컬 부하 테스트 도구.
+fake_openai.py(OpenAI 호환 테스트 서버)와 API 서버(uvicorn)를 띄운 뒤, 목표 RPS로 /recommend와 /comment 계열 요청을
+섞어 보내고 엔드포인트별 처리량, p50/p95/p99 지연 시간, 오류율을 보고합니다.
+
+    python tools/loadtest.py --rps 50 --duration 30 --mix recommend=6,comment=3,comment_stream=1
+    python tools/loadtest.py --llm-latency 1.5 --llm-latency-dist lognormal --llm-error-rate 0.05
+    python tools/loadtest.py --target http://127.0.0.1:8000 --rps 20   # 이미 실행 중인 서버 대상
+
+- 도착 간격이 응답과 무관한 open-loop 방식이며, 지연 시간은 예정된 전송 시각부터 잽니다
+  (서버가 밀리면 대기 시간까지 지연에 포함되어 이벤트 루프 블로킹이 숫자로 드러납니다).
+- probe: GET /ready를 일정 주기로 호출해 이벤트 루프 응답성을 따로 측정합니다.
+- 추천/코멘트 캐시 hit만 측정하지 않도록 기본으로 /recommend 수치를 요청마다 바꾸고 /comment는 cache=bypass로 호출합니다.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDPOINTS = ("recommend", "comment", "comment_stream", "comment_batch")
+
+RECOMMEND_BODY = {
+    "industry": "발전/에너지",
+    "targetFacilities": ["동력설비", "배관설비"],
+    "availableInvestment": 30.0,
+    "currentEmission": 100.0,
+    "targetEmission": 80.0,
+    "targetRoiPeriod": 2.0,
+}
+
+COMMENT_ITEM = {
+    "id": 1,
+    "type": "total_optimization",
+    "rank": 1,
+    "industry": "발전/에너지",
+    "improvementType": "기타설비보완",
+    "facility": "동력설비",
+    "activity": "공기압축기 토출압력 조정",
+    "emissionReduction": 12.5,
+    "costSaving": 3.2,
+    "roiPeriod": 0.8,
+    "investmentCost": 2.5,
+    "bookmark": False,
+}
+SOLUTION_TYPES = ("total_optimization", "emission_reduction", "cost_saving", "roi")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise SystemExit(
+                f"unknown endpoint in --mix: {name} (choose from {ENDPOINTS})"
+            )
+        mix[name] = float(weight or 1)
+    return {k: v for k, v in mix.items() if v > 0}
+
+
+class Stats:
+    """엔드포인트 하나의 지연 시간과 결과 집계."""
+
+    def __init__(self):
+        self.latencies = []
+        self.first_event = []
+        self.errors = {}
+        self.sent = 0
+
+    def ok(self, latency: float, first_event: float = None):
+        self.latencies.append(latency)
+        if first_event is not None:
+            self.first_event.append(first_event)
+
+    def fail(self, kind: str):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def report(self, duration: float) -> dict:
+        failed = sum(self.errors.values())
+        out = {
+            "sent": self.sent,
+            "ok": len(self.latencies),
+            "errors": dict(self.errors),
+            "error_rate": round(failed / self.sent, 4) if self.sent else 0.0,
+            "throughput_rps": round(len(self.latencies) / duration, 2),
+        }
+        out.update(_percentiles(self.latencies))
+        if self.first_event:
+            out["first_event"] = _percentiles(self.first_event)
+        return out
+
+
+def _percentiles(samples: list) -> dict:
+    if not samples:
+        return {}
+    ms = np.asarray(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "max_ms": round(float(ms.max()), 2),
+    }
+
+
+class LoadTest:
+    def __init__(self, target: str, args):
+        self.target = target.rstrip("/")
+        self.args = args
+        self.stats = {name: Stats() for name in ENDPOINTS + ("probe",)}
+        self.rng = random.Random(args.seed)
+
+    def recommend_body(self) -> dict:
+        body = dict(RECOMMEND_BODY)
+        if not self.args.fixed_payload:
+            # 요청마다 수치를 바꿔 추천 캐시 hit만 측정하지 않도록 합니다.
+            body["availableInvestment"] = round(self.rng.uniform(5, 100), 2)
+            body["targetRoiPeriod"] = round(self.rng.uniform(0.5, 5), 2)
+        return body
+
+    def comment_items(self, focus: str) -> list:
+        items = []
+        for rank in range(1, 5):
+            item = dict(COMMENT_ITEM, id=rank, rank=rank, type=focus)
+            item["investmentCost"] = round(self.rng.uniform(1, 50), 1)
+            items.append(item)
+        return items
+
+    async def _post(self, client, name: str, path: str, body: dict, scheduled: float):
+        stats = self.stats[name]
+        try:
+            response = await client.post(f"{self.target}{path}", json=body)
+        except httpx.HTTPError as e:
+            stats.fail(type(e).__name__)
+            return
+        if response.status_code == 200:
+            stats.ok(time.perf_counter() - scheduled)
+        else:
+            stats.fail(str(response.status_code))
+
+    async def _stream(self, client, path: str, body: dict, scheduled: float):
+        stats = self.stats["comment_stream"]
+        first_event = None
+        try:
+            async with client.stream("POST", f"{self.target}{path}", json=body) as r:
+                if r.status_code != 200:
+                    stats.fail(str(r.status_code))
+                    return
+                async for line in r.aiter_lines():
+                    if first_event is None and line.startswith("event: delta"):
+                        first_event = time.perf_counter() - scheduled
+                    elif line.startswith("event: error"):
+                        stats.fail("event:error")
+                        return
+        except httpx.HTTPError as e:
+            stats.fail(type(e).__name__)
+            return
+        stats.ok(time.perf_counter() - scheduled, first_event)
+
+    async def fire(self, client, name: str, scheduled: float):
+        self.stats[name].sent += 1
+        cache = f"?cache={self.args.comment_cache}"
+        if name == "recommend":
+            await self._post(
+                client, name, "/recommend", self.recommend_body(), scheduled
+            )
+        elif name == "comment":
+            focus = self.rng.choice(SOLUTION_TYPES)
+            body = {"llmParams": self.comment_items(focus)}
+            await self._post(client, name, f"/comment{cache}", body, scheduled)
+        elif name == "comment_stream":
+            focus = self.rng.choice(SOLUTION_TYPES)
+            body = {"llmParams": self.comment_items(focus)}
+            await self._stream(client, f"/comment/stream{cache}", body, scheduled)
+        elif name == "comment_batch":
+            solution = [i for f in SOLUTION_TYPES for i in self.comment_items(f)]
+            await self._post(
+                client,
+                name,
+                f"/comment/batch{cache}",
+                {"solution": solution},
+                scheduled,
+            )
+
+    async def probe(self, client, stop: asyncio.Event):
+        """GET /ready 응답 시간 (이벤트 루프가 막히면 이 값이 먼저 늘어납니다)."""
+        stats = self.stats["probe"]
+        interval = 1 / self.args.probe_rps
+        while not stop.is_set():
+            scheduled = time.perf_counter()
+            stats.sent += 1
+            try:
+                response = await client.get(f"{self.target}/ready")
+                if response.status_code == 200:
+                    stats.ok(time.perf_counter() - scheduled)
+                else:
+                    stats.fail(str(response.status_code))
+            except httpx.HTTPError as e:
+                stats.fail(type(e).__name__)
+            await asyncio.sleep(max(0.0, interval - (time.perf_counter() - scheduled)))
+
+    async def run(self) -> dict:
+        args = self.args
+        mix = parse_mix(args.mix)
+        names, weights = list(mix), list(mix.values())
+        limits = httpx.Limits(max_connections=args.max_connections)
+        async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+            stop = asyncio.Event()
+            probe = (
+                asyncio.create_task(self.probe(client, stop))
+                if args.probe_rps > 0
+                else None
+            )
+            tasks = set()
+            started = time.perf_counter()
+            interval = 1 / args.rps
+            i = 0
+            while True:
+                scheduled = started + i * interval
+                if scheduled - started >= args.duration:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                name = self.rng.choices(names, weights)[0]
+                task = asyncio.create_task(self.fire(client, name, scheduled))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                i += 1
+            sent_seconds = time.perf_counter() - started
+            await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - started
+            stop.set()
+            if probe is not None:
+                await probe
+            llm_stats = None
+            try:
+                response = await client.get(f"{self.target}/comment/llm/stats")
+                if response.status_code == 200:
+                    llm_stats = response.json()
+            except httpx.HTTPError:
+                pass
+
+        return {
+            "target": self.target,
+            "rps": args.rps,
+            "duration": args.duration,
+            "achieved_send_rps": round(i / sent_seconds, 2) if sent_seconds else 0.0,
+            "elapsed_seconds": round(elapsed, 2),
+            "mix": mix,
+            "endpoints": {
+                name: stats.report(elapsed)
+                for name, stats in self.stats.items()
+                if stats.sent
+            },
+            "llm": None
+            if llm_stats is None
+            else {
+                "calls": llm_stats.get("calls"),
+                "retries": llm_stats.get("retries"),
+                "breaker": llm_stats.get("breaker", {}).get("state"),
+            },
+        }
+
+
+def start_process(cmd: list, env: dict = None) -> subprocess.Popen:
+    return subprocess.Popen(
+        cmd,
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_until(url: str, timeout: float, process: subprocess.Popen = None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise SystemExit(f"process exited with {process.returncode}: {url}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"timed out waiting for {url}")
+
+
+def wait_until_port(port: int, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise SystemExit(f"timed out waiting for port {port}")
+
+
+def print_report(report: dict):
+    print(
+        f"target={report['target']} rps={report['rps']} (sent {report['achieved_send_rps']}/s) "
+        f"elapsed={report['elapsed_seconds']}s"
+    )
+    header = f"{'endpoint':<16}{'sent':>7}{'ok':>7}{'err%':>7}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+    print(header)
+    for name, r in report["endpoints"].items():
+        print(
+            f"{name:<16}{r['sent']:>7}{r['ok']:>7}{r['error_rate'] * 100:>6.1f}%{r['throughput_rps']:>8}"
+            f"{r.get('p50_ms', '-'):>9}{r.get('p95_ms', '-'):>9}{r.get('p99_ms', '-'):>9}{r.get('max_ms', '-'):>9}"
+        )
+        if r["errors"]:
+            print(f"{'':<16}errors: {r['errors']}")
+        if "first_event" in r:
+            fe = r["first_event"]
+            print(f"{'':<16}first delta p50={fe['p50_ms']} p99={fe['p99_ms']} ms")
+    if report["llm"]:
+        print(f"llm: {report['llm']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/recommend, /comment 부하 테스트")
+    parser.add_argument("--target", help="이미 실행 중인 API 서버 주소 (생략하면 직접 띄움)")
+    parser.add_argument("--rps", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument(
+        "--mix",
+        default="recommend=6,comment=3,comment_stream=1",
+        help=f"엔드포인트별 가중치 ({', '.join(ENDPOINTS)})",
+    )
+    parser.add_argument(
+        "--comment-cache", default="bypass", choices=("use", "bypass", "refresh")
+    )
+    parser.add_argument(
+        "--fixed-payload", action="store_true", help="/recommend 요청 수치를 고정 (캐시 hit 측정)"
+    )
+    parser.add_argument(
+        "--probe-rps", type=float, default=5.0, help="GET /ready 응답성 측정 주기 (0이면 끔)"
+    )
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    # 직접 띄우는 API 서버 설정
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn 워커 프로세스 수")
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    # 직접 띄우는 fake OpenAI 서버 설정 (tools/fake_openai.py)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument(
+        "--llm-latency-dist",
+        default="lognormal",
+        choices=("fixed", "uniform", "exponential", "lognormal"),
+    )
+    parser.add_argument("--llm-latency-sigma", type=float, default=0.5)
+    parser.add_argument("--llm-token-delay", type=float, default=0.01)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-error-status", type=int, default=500)
+    args = parser.parse_args()
+
+    processes = []
+    try:
+        target = args.target
+        if target is None:
+            llm_port = free_port()
+            processes.append(
+                start_process(
+                    [
+                        sys.executable,
+                        os.path.join(ROOT, "tools", "fake_openai.py"),
+                        "--port",
+                        str(llm_port),
+                        "--latency",
+                        str(args.llm_latency),
+                        "--latency-dist",
+                        args.llm_latency_dist,
+                        "--latency-sigma",
+                        str(args.llm_latency_sigma),
+                        "--token-delay",
+                        str(args.llm_token_delay),
+                        "--error-rate",
+                        str(args.llm_error_rate),
+                        "--error-status",
+                        str(args.llm_error_status),
+                    ]
+                )
+            )
+            port = args.port or free_port()
+            env = dict(
+                os.environ,
+                OPENAI_BASE_URL=f"http://127.0.0.1:{llm_port}/v1",
+                OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY") or "loadtest",
+            )
+            wait_until_port(llm_port, 30.0)
+            processes.append(
+                start_process(
+                    [
+                        sys.executable,
+                        "-m",
+                        "uvicorn",
+                        "app.main:app",
+                        "--host",
+                        "127.0.0.1",
+                        "--port",
+                        str(port),
+                        "--workers",
+                        str(args.workers),
+                        "--log-level",
+                        "warning",
+                    ],
+                    env=env,
+                )
+            )
+            target = f"http://127.0.0.1:{port}"
+            wait_until(f"{target}/ready", args.startup_timeout, processes[-1])
+
+        report = asyncio.run(LoadTest(target, args).run())
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# tools/record_knee_curves.py
+"""
+tests/test_knee.py가 KneeLocator와 비교하는 유사도 곡선을 기록합니다.
+아티팩트(VEC_DIR/CLUSTERING_DIR)의 업종 x 대상설비 질의를 무작위로 골라, 추천 경로와 같은 방식으로
+검색한 상위 KNEE_PREFIX개 유사도 곡선(내림차순)을 업종 파티션/전체 검색별로 저장합니다.
+
+    VEC_DIR=benchmarks/.data/100000 CLUSTERING_DIR=benchmarks/.data/100000 \\
+        python tools/record_knee_curves.py --output tests/fixtures/knee_curves.npz
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def record(pairs_per_mode: int, seed: int) -> dict:
+    sys.path.insert(0, ROOT)
+    from app.services import inference
+    from app.services.registry import model_registry
+    from app.setting import startup
+
+    startup.load_resources()
+    model = model_registry.current()
+    catalog = model.catalog
+    prefix, depth = inference.search_depth(model, 4)
+
+    rng = np.random.default_rng(seed)
+    industries = catalog.categories["업종"]
+    facilities = catalog.categories["대상설비"]
+    curves = {}
+    for partition in ("industry", "global"):
+        for i in range(pairs_per_mode):
+            pair = (rng.choice(industries), rng.choice(facilities))
+            numeric = [
+                float(rng.uniform(1, 300)),  # 투자가능금액
+                0.0,
+                float(rng.uniform(0.5, 6)),  # 목표 ROI 기간
+                float(rng.uniform(0, 200)),  # 감축 목표
+            ]
+            numeric[1] = numeric[0] / numeric[2]
+            latents = inference.encode(
+                model, inference.build_user_vectors(model, [pair], numeric)
+            )
+            ((_, sims),) = inference.search_neighbours(
+                model, [pair], latents, depth, partition
+            )
+            curves[f"{partition}_{i:03d}"] = np.asarray(sims[:prefix])
+    return curves
+
+
+def main():
+    parser = argparse.ArgumentParser(description="knee 비교 테스트용 유사도 곡선 기록")
+    parser.add_argument(
+        "--output", default=os.path.join(ROOT, "tests", "fixtures", "knee_curves.npz")
+    )
+    parser.add_argument("--pairs", type=int, default=50, help="검색 범위별 곡선 수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    curves = record(args.pairs, args.seed)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    np.savez_compressed(args.output, **curves)
+    print(f"{len(curves)} curves -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
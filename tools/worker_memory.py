@@ -0,0 +1,212 @@
+# tools/worker_memory.py
+"""
+gunicorn 워커별 메모리 비교 도구 (Linux /proc 필요).
+gunicorn.conf.py로 서버를 모드별로 띄우고, 모든 워커가 모델을 로드해 /recommend 요청을 처리한 뒤
+마스터와 워커의 RSS / PSS / USS(프로세스 전용)를 /proc/<pid>/smaps_rollup에서 읽어 비교합니다.
+
+    python tools/worker_memory.py --workers 4 --data-dir benchmarks/.data/1000000
+    python tools/worker_memory.py --modes shared,private --output worker_memory.json
+
+- shared: 마스터가 공유 메모리에 게시한 모델에 워커가 붙음 (ENCODER_BACKEND=numpy)
+- private: 워커마다 아티팩트를 읽음 (ENCODER_BACKEND=numpy)
+- private-keras: 워커마다 TensorFlow를 import하고 Keras 인코더를 로드 (기존 방식)
+
+RSS는 공유 페이지도 워커마다 셉니다. 실제 총 사용량은 PSS 합계(공유 페이지를 나눠 셈)로,
+워커를 하나 늘릴 때 드는 메모리는 USS로 보는 것이 정확합니다.
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = {
+    "shared": {"ENCODER_BACKEND": "numpy"},
+    "private": {"ENCODER_BACKEND": "numpy", "SHARED_MODEL": ""},
+    "private-keras": {"ENCODER_BACKEND": "keras", "SHARED_MODEL": ""},
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def memory(pid: int) -> dict:
+    """RSS / PSS / USS (MiB)"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    uss = fields["Private_Clean"] + fields["Private_Dirty"]
+    return {
+        "rss_mib": round(fields["Rss"] / 1024, 1),
+        "pss_mib": round(fields["Pss"] / 1024, 1),
+        "uss_mib": round(uss / 1024, 1),
+    }
+
+
+def _cmdline(pid: int) -> bytes:
+    with open(f"/proc/{pid}/cmdline", "rb") as f:
+        return f.read()
+
+
+def worker_pids(master: int) -> list:
+    """마스터에서 fork된 워커 (같은 명령줄) — resource_tracker 등 다른 자식 프로세스는 제외합니다."""
+    with open(f"/proc/{master}/task/{master}/children") as f:
+        pids = [int(p) for p in f.read().split()]
+    return [pid for pid in pids if _cmdline(pid) == _cmdline(master)]
+
+
+def recommend_body(data_dir: str) -> dict:
+    """카탈로그 첫 행의 업종/대상설비로 만든 /recommend 요청"""
+    import pandas as pd
+
+    row = pd.read_parquet(
+        os.path.join(data_dir, "final_upscaled_with_clusters.parquet"),
+        columns=["업종", "대상설비"],
+    ).iloc[0]
+    return {
+        "industry": row["업종"],
+        "targetFacilities": [row["대상설비"]],
+        "availableInvestment": 30.0,
+        "currentEmission": 100.0,
+        "targetEmission": 80.0,
+        "targetRoiPeriod": 2.0,
+    }
+
+
+def wait_ready(log_path: str, workers: int, process, timeout: float):
+    """모든 워커가 "Server ready"를 기록할 때까지 기다립니다."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(
+                f"gunicorn exited with {process.returncode} (log: {log_path})"
+            )
+        with open(log_path, encoding="utf-8", errors="replace") as f:
+            if f.read().count("Server ready") >= workers:
+                return
+        time.sleep(0.5)
+    raise SystemExit(f"timed out waiting for {workers} workers (log: {log_path})")
+
+
+def measure(mode: str, args, body: dict) -> dict:
+    port = free_port()
+    env = dict(
+        os.environ,
+        VEC_DIR=args.data_dir,
+        CLUSTERING_DIR=args.data_dir,
+        LOG_LEVEL="INFO",
+        **MODES[mode],
+    )
+    log = tempfile.NamedTemporaryFile(
+        prefix=f"worker_memory-{mode}-", suffix=".log", delete=False
+    )
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "app.main:app",
+            "-c",
+            os.path.join(ROOT, "gunicorn.conf.py"),
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(args.workers),
+        ],
+        cwd=ROOT,
+        env=env,
+        stdout=log,
+        stderr=log,
+    )
+    try:
+        started = time.perf_counter()
+        wait_ready(log.name, args.workers, process, args.startup_timeout)
+        ready_seconds = time.perf_counter() - started
+        for _ in range(args.requests):
+            # 요청마다 새 연결을 열어 여러 워커에 나뉘도록 합니다.
+            response = httpx.post(
+                f"http://127.0.0.1:{port}/recommend", json=body, timeout=60.0
+            )
+            response.raise_for_status()
+        time.sleep(1.0)
+        workers = [memory(pid) for pid in worker_pids(process.pid)]
+        master = memory(process.pid)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log.close()
+
+    def mean(key):
+        return round(sum(w[key] for w in workers) / len(workers), 1)
+
+    return {
+        "mode": mode,
+        "workers": len(workers),
+        "ready_seconds": round(ready_seconds, 1),
+        "master": master,
+        "worker_mean": {k: mean(k) for k in ("rss_mib", "pss_mib", "uss_mib")},
+        "total_pss_mib": round(
+            master["pss_mib"] + sum(w["pss_mib"] for w in workers), 1
+        ),
+        "log": log.name,
+    }
+
+
+def print_table(results: list):
+    header = (
+        f"{'mode':<15}{'workers':>8}{'ready_s':>9}{'master_rss':>12}"
+        f"{'worker_rss':>12}{'worker_pss':>12}{'worker_uss':>12}{'total_pss':>11}"
+    )
+    print(header)
+    for r in results:
+        w = r["worker_mean"]
+        print(
+            f"{r['mode']:<15}{r['workers']:>8}{r['ready_seconds']:>9}{r['master']['rss_mib']:>12}"
+            f"{w['rss_mib']:>12}{w['pss_mib']:>12}{w['uss_mib']:>12}{r['total_pss_mib']:>11}"
+        )
+    print("(MiB, worker_* = 워커 평균)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="gunicorn 워커별 메모리 비교 (공유 메모리 vs 워커별 로드)"
+    )
+    parser.add_argument("--data-dir", default=os.path.join(ROOT, "app", "data"))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--modes", default=",".join(MODES), help=f"비교할 모드 ({', '.join(MODES)})"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=20, help="측정 전 보낼 /recommend 요청 수"
+    )
+    parser.add_argument("--startup-timeout", type=float, default=600.0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    args.data_dir = os.path.abspath(args.data_dir)
+    body = recommend_body(args.data_dir)
+    results = [measure(mode, args, body) for mode in args.modes.split(",")]
+    print_table(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()